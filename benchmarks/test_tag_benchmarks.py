@@ -0,0 +1,112 @@
+"""Baseline timings for the tag subsystem at 1k/10k/100k tags.
+
+Run with:
+    pip install -e ".[bench]"
+    pytest benchmarks/ --benchmark-only
+"""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from commands.tag_commands import TagSearchCommands
+from utils.tag_store import TagStore
+
+SIZES = [1_000, 10_000, 100_000]
+
+WORDS = [
+    "gaming", "anime", "music", "arabic", "art", "chat", "minecraft", "valorant",
+    "قيمنق", "انمي", "العاب", "سوالف", "تصاميم", "برمجه", "فورت", "ماينكرافت",
+]
+
+def make_entry(i: int, rng: random.Random) -> dict:
+    word = rng.choice(WORDS)
+    return {
+        "tag": f"{word}{rng.randrange(2000)}",
+        "server_link": f"https://discord.gg/bench{i}",
+        "server_name": f"Server {i}",
+        "description": "",
+        "added_by": str(rng.randrange(500)),
+        "added_at": "2024-01-01T00:00:00",
+        "member_count": rng.randrange(10_000),
+    }
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size}_tags")
+def tag_store(request):
+    rng = random.Random(request.param)
+    store = TagStore({})
+    for i in range(request.param):
+        store.add(make_entry(i, rng))
+    return store
+
+@pytest.fixture
+def cog(tag_store, tmp_path, monkeypatch):
+    # The cog keeps its cooldown file in the working directory
+    monkeypatch.chdir(tmp_path)
+    bot = SimpleNamespace(tag_store=tag_store, invite_client=None)
+    return TagSearchCommands(bot)
+
+def uncached_search(cog, query):
+    cog.search_cache.entries.clear()
+    return cog.get_search_results(query)
+
+@pytest.mark.parametrize("query", ["gaming", "قيمنق12", "minecraf"])
+def test_search(benchmark, cog, query):
+    results, total = benchmark(uncached_search, cog, query)
+    assert results
+
+def test_search_fuzzy(benchmark, cog):
+    # One typo away from an existing word, so only the BK-tree pass matches
+    benchmark(uncached_search, cog, "mineecraft1")
+
+def test_search_cached(benchmark, cog):
+    cog.get_search_results("anime")
+    benchmark(cog.get_search_results, "anime")
+
+def test_add(benchmark, tag_store):
+    counter = iter(range(10**9))
+
+    def add_one():
+        i = next(counter)
+        entry = {"tag": f"bench-add{i}", "server_link": f"https://discord.gg/add{i}", "added_by": "1"}
+        if tag_store.find_pair(entry["tag"], entry["server_link"]) is None:
+            tag_store.add(entry)
+        return entry
+
+    added = benchmark(add_one)
+    assert tag_store.get(added["id"]) is added
+
+def test_remove(benchmark, tag_store):
+    counter = iter(range(10**9))
+
+    def setup():
+        i = next(counter)
+        entry = tag_store.add({"tag": f"bench-remove{i}", "server_link": f"https://discord.gg/rm{i}", "added_by": "1"})
+        return (entry,), {}
+
+    benchmark.pedantic(tag_store.remove, setup=setup, rounds=200)
+
+def test_list_first_page(benchmark, tag_store):
+    entries, _ = benchmark(tag_store.page_after, None, 10)
+    assert len(entries) == 10
+
+def test_list_deep_page(benchmark, tag_store):
+    middle = tag_store.sorted_keys[len(tag_store.sorted_keys) // 2]
+    entries, _ = benchmark(tag_store.page_after, (middle, 0), 10)
+    assert entries
+
+def test_list_filtered(benchmark, cog):
+    def filtered():
+        cog.list_sessions.clear()
+        return cog.get_filtered_tags(1, "anime", False)
+
+    assert benchmark(filtered)
+
+def test_list_my_tags(benchmark, cog):
+    def my_tags():
+        cog.list_sessions.clear()
+        return cog.get_filtered_tags(7, None, True)
+
+    benchmark(my_tags)
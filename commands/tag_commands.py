@@ -0,0 +1,762 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import logging
+import os
+import io
+import json
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta
+from utils.invite_validator import InviteValidator
+from utils.tag_ranking import top_k
+from utils.arabic_text import normalize_text
+from utils.tag_views import TagListView, SortedIndexPager, ListPager
+from utils.search_cache import SearchCache
+from utils.tag_transfer import detect_format, export_tags, iter_import_rows, validate_row
+from config import (
+    INVITE_VALIDATOR_CONFIG, TAG_LIST_CONFIG, SEARCH_CACHE_CONFIG,
+    TAG_AUTOCOMPLETE_CONFIG, TAG_TRANSFER_CONFIG
+)
+
+logger = logging.getLogger(__name__)
+
+class TagSearchCommands(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.cooldown_file = "search_cooldowns.json"
+        self.load_cooldowns()
+        self.list_sessions = {}
+        self.search_counts = {}
+        self.search_cache = SearchCache(
+            max_entries=SEARCH_CACHE_CONFIG['max_entries'],
+            ttl=SEARCH_CACHE_CONFIG['ttl']
+        )
+        self.invite_validator = InviteValidator(
+            bot,
+            bot.invite_client,
+            batch_size=INVITE_VALIDATOR_CONFIG['batch_size'],
+            interval=INVITE_VALIDATOR_CONFIG['interval'],
+            recheck_after=INVITE_VALIDATOR_CONFIG['recheck_after'],
+            max_failures=INVITE_VALIDATOR_CONFIG['max_failures'],
+            prune_dead=INVITE_VALIDATOR_CONFIG['prune_dead']
+        )
+    
+    async def cog_load(self):
+        """Start background invite re-validation"""
+        self.invite_validator.start()
+    
+    async def cog_unload(self):
+        """Stop background invite re-validation"""
+        self.invite_validator.stop()
+    
+    def load_cooldowns(self):
+        """Load cooldown data from file"""
+        try:
+            if os.path.exists(self.cooldown_file):
+                with open(self.cooldown_file, 'r', encoding='utf-8') as f:
+                    self.cooldowns = json.load(f)
+            else:
+                self.cooldowns = {}
+        except:
+            self.cooldowns = {}
+    
+    def save_cooldowns(self):
+        """Save cooldown data to file"""
+        try:
+            with open(self.cooldown_file, 'w', encoding='utf-8') as f:
+                json.dump(self.cooldowns, f, ensure_ascii=False, indent=2)
+        except:
+            pass
+    
+    def check_cooldown(self, user_id):
+        """Check if user is on cooldown"""
+        user_id_str = str(user_id)
+        if user_id_str not in self.cooldowns:
+            return False, 0
+        
+        last_search = datetime.fromisoformat(self.cooldowns[user_id_str])
+        now = datetime.now()
+        time_diff = now - last_search
+        
+        if time_diff < timedelta(minutes=5):
+            remaining = timedelta(minutes=5) - time_diff
+            return True, remaining.total_seconds()
+        
+        return False, 0
+    
+    def set_cooldown(self, user_id):
+        """Set cooldown for user"""
+        self.cooldowns[str(user_id)] = datetime.now().isoformat()
+        self.save_cooldowns()
+
+    def get_search_results(self, search_tag: str):
+        """Ranked results and match count for a normalized query, cached until the tag store changes"""
+        tag_store = self.bot.tag_store
+        cached = self.search_cache.get(search_tag, tag_store.generation)
+        if cached is not None:
+            return cached
+        
+        def alive(pairs):
+            # Skip links the background validator found dead
+            return ((key, tag_entry) for key, tag_entry in pairs if tag_entry.get("alive") is not False)
+        
+        max_results = 8
+        ranked_results, total_matches = top_k(alive(tag_store.iter_normalized()), search_tag, max_results)
+        
+        if not ranked_results:
+            # Nothing contains the query; retry allowing a typo or two
+            ranked_results, total_matches = top_k(alive(tag_store.iter_fuzzy(search_tag)), search_tag, max_results, fuzzy=True)
+        
+        search_results = [{
+            "tag": tag_entry.get("tag", ""),
+            "server_link": tag_entry.get("server_link", ""),
+            "server_name": tag_entry.get("server_name", "غير محدد"),
+            "description": tag_entry.get("description", ""),
+            "added_by": tag_entry.get("added_by", "غير معروف")
+        } for tag_entry in ranked_results]
+        
+        # Fill remaining slots with popular servers for common tags
+        popular_servers = {
+            'gaming': 'https://discord.gg/gaming',
+            'anime': 'https://discord.gg/anime',
+            'music': 'https://discord.gg/music',
+            'arabic': 'https://discord.gg/arabic',
+            'art': 'https://discord.gg/art',
+            'chat': 'https://discord.gg/chat',
+            'minecraft': 'https://discord.gg/minecraft',
+            'valorant': 'https://discord.gg/valorant'
+        }
+        
+        seen_links = {result['server_link'] for result in search_results}
+        for popular_tag, link in popular_servers.items():
+            if search_tag == popular_tag or search_tag in popular_tag:
+                if link in seen_links:
+                    continue
+                total_matches += 1
+                if len(search_results) < max_results:
+                    search_results.append({
+                        "tag": popular_tag,
+                        "server_link": link,
+                        "server_name": f"{popular_tag.title()} Community",
+                        "description": "سيرفر شائع ومشهور",
+                        "added_by": "النظام"
+                    })
+        
+        self.search_cache.put(search_tag, tag_store.generation, (search_results, total_matches))
+        return search_results, total_matches
+    
+    @app_commands.command(name="بحث", description="البحث عن تاق معين والحصول على روابط السيرفرات")
+    @app_commands.describe(tag="التاق المراد البحث عنه")
+    async def search_tag(self, interaction: discord.Interaction, tag: str):
+        """Search for a tag and return all server links that have this tag"""
+        try:
+            # Check cooldown
+            on_cooldown, remaining_seconds = self.check_cooldown(interaction.user.id)
+            
+            if on_cooldown:
+                remaining_minutes = int(remaining_seconds // 60)
+                remaining_secs = int(remaining_seconds % 60)
+                
+                embed = discord.Embed(
+                    title="انتظر قليلاً",
+                    description=f"يمكنك البحث مرة واحدة كل 5 دقائق\n\n**الوقت المتبقي:** {remaining_minutes} دقيقة و {remaining_secs} ثانية",
+                    color=0xff6b6b
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+            
+            await interaction.response.defer()
+            
+            tag = tag.strip()
+            if not tag:
+                await interaction.followup.send("الرجاء إدخال تاق للبحث", ephemeral=True)
+                return
+            
+            # Set cooldown for user
+            self.set_cooldown(interaction.user.id)
+            
+            search_key = normalize_text(tag)
+            if search_key in self.bot.tag_store.by_key:
+                # Only existing tags are counted, so this stays bounded by the tag count
+                self.search_counts[search_key] = self.search_counts.get(search_key, 0) + 1
+            search_results, total_matches = self.get_search_results(search_key)
+            
+            if not search_results:
+                embed = discord.Embed(
+                    title="نتائج البحث",
+                    description=f"لم أجد سيرفرات للتاق: `{tag}`\n\n💡 جرب تاقات شائعة مثل: gaming, anime, music, arabic, art",
+                    color=0xff6b6b
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+                return
+            
+            embed = discord.Embed(
+                title="نتائج البحث",
+                description=f"تم العثور على **{total_matches} سيرفر** للتاق: `{tag}`",
+                color=0x00ff00
+            )
+            
+            # Results are already ranked best first
+            for i, result in enumerate(search_results, 1):
+                server_name = result.get('server_name', 'سيرفر غير محدد')
+                server_link = result.get('server_link', '')
+                description = result.get('description', '')
+                
+                field_value = f"**🔗 انضم الآن:** {server_link}\n"
+                if description:
+                    field_value += f"**الوصف:** {description}\n"
+                field_value += f"**أضافه:** {result.get('added_by', 'غير معروف')}"
+                
+                embed.add_field(
+                    name=f"{i}. {server_name}",
+                    value=field_value,
+                    inline=False
+                )
+            
+            embed.set_footer(text=f"إجمالي النتائج: {total_matches} سيرفر")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            
+        except Exception as e:
+            logger.error(f"Error in search_tag: {e}")
+            await interaction.followup.send("❌ حدث خطأ أثناء البحث عن التاق. الرجاء المحاولة مرة أخرى.", ephemeral=True)
+    
+    @app_commands.command(name="اضافة", description="إضافة تاق جديد مع رابط السيرفر")
+    @app_commands.describe(
+        tag="التاق المراد إضافته",
+        server_link="رابط السيرفر",
+        server_name="اسم السيرفر (اختياري)",
+        description="وصف السيرفر (اختياري)"
+    )
+    async def add_tag(self, interaction: discord.Interaction, tag: str, server_link: str, server_name: str | None = None, description: str | None = None):
+        """Add a new tag with server link and optional description"""
+        await interaction.response.defer()
+        
+        try:
+            # Clean and validate the tag
+            tag = tag.strip()
+            if len(tag) < 2:
+                await interaction.followup.send("❌ التاق يجب أن يكون على الأقل حرفين!")
+                return
+            
+            if len(tag) > 50:
+                await interaction.followup.send("❌ التاق طويل جداً! الحد الأقصى 50 حرف.")
+                return
+            
+            # Validate server link
+            if not (server_link.startswith("https://discord.gg/") or server_link.startswith("discord.gg/")):
+                embed = discord.Embed(
+                    title="❌ رابط غير صحيح",
+                    description="الرجاء إدخال رابط سيرفر Discord صحيح\n\n**أمثلة صحيحة:**\n• `https://discord.gg/abc123`\n• `discord.gg/abc123`",
+                    color=0xff6b6b
+                )
+                await interaction.followup.send(embed=embed)
+                return
+            
+            # Normalize the link
+            if not server_link.startswith("https://"):
+                server_link = "https://" + server_link
+            
+            # Enforce the per-user quota (admins are exempt)
+            user_id = str(interaction.user.id)
+            is_admin = isinstance(interaction.user, discord.Member) and interaction.user.guild_permissions.administrator
+            max_tags = TAG_LIST_CONFIG['max_tags_per_user']
+            if not is_admin and self.bot.tag_store.count_user_tags(user_id) >= max_tags:
+                await interaction.followup.send(f"❌ وصلت للحد الأقصى من التاقات ({max_tags}). احذف بعض تاقاتك أولاً.")
+                return
+            
+            # Check if this exact server link already has this tag
+            existing_entry = self.bot.tag_store.find_pair(tag, server_link)
+            if existing_entry:
+                await interaction.followup.send(f"❌ هذا السيرفر يحتوي بالفعل على التاق: `{existing_entry['tag']}`")
+                return
+            
+            # Add new tag
+            new_tag = {
+                "tag": tag,
+                "server_link": server_link,
+                "server_name": server_name or "غير محدد",
+                "description": description or "",
+                "added_by": str(interaction.user.id),
+                "added_at": datetime.now().isoformat(),
+                "added_from_guild": str(interaction.guild_id) if interaction.guild else "DM"
+            }
+            
+            self.bot.tag_store.add(new_tag)
+            self.bot.save_tags_data()
+            
+            embed = discord.Embed(
+                title="✅ تم إضافة التاق بنجاح",
+                description="تم حفظ التاق في قاعدة البيانات وأصبح متاح للبحث",
+                color=0x57f287
+            )
+            embed.add_field(name="🏷️ التاق", value=f"`{tag}`", inline=True)
+            embed.add_field(name="🌐 اسم السيرفر", value=server_name or "غير محدد", inline=True)
+            embed.add_field(name="👤 أضافه", value=interaction.user.mention, inline=True)
+            embed.add_field(name="🔗 رابط السيرفر", value=f"[انضم للسيرفر]({server_link})", inline=False)
+            
+            if description:
+                embed.add_field(name="📝 الوصف", value=description, inline=False)
+                
+            embed.set_footer(text=f"يمكن البحث عن هذا التاق باستخدام: /بحث {tag}")
+            embed.timestamp = datetime.now()
+            
+            await interaction.followup.send(embed=embed)
+            
+        except Exception as e:
+            logger.error(f"Error in add_tag: {e}")
+            await interaction.followup.send("❌ حدث خطأ أثناء إضافة التاق. الرجاء المحاولة مرة أخرى.")
+    
+    @app_commands.command(name="حذف", description="حذف تاق موجود")
+    @app_commands.describe(
+        tag="التاق المراد حذفه",
+        server_link="رابط السيرفر (اختياري للتحديد الدقيق)"
+    )
+    async def remove_tag(self, interaction: discord.Interaction, tag: str, server_link: str | None = None):
+        """Remove an existing tag"""
+        await interaction.response.defer()
+        
+        try:
+            if not len(self.bot.tag_store):
+                await interaction.followup.send("❌ لا توجد تاقات مسجلة في قاعدة البيانات.")
+                return
+            
+            # Find matching tags
+            if server_link is None:
+                matching_tags = self.bot.tag_store.find(tag)
+            else:
+                exact_entry = self.bot.tag_store.find_pair(tag, server_link)
+                matching_tags = [exact_entry] if exact_entry else []
+            
+            if not matching_tags:
+                await interaction.followup.send(f"❌ لم يتم العثور على التاق: `{tag}`")
+                return
+            
+            # Check permissions
+            member = interaction.guild.get_member(interaction.user.id) if interaction.guild else None
+            is_admin = member.guild_permissions.administrator if member else False
+            user_id = str(interaction.user.id)
+            
+            # Filter tags that user can delete
+            deletable_tags = []
+            for tag_entry in matching_tags:
+                if is_admin or tag_entry["added_by"] == user_id:
+                    deletable_tags.append(tag_entry)
+            
+            if not deletable_tags:
+                await interaction.followup.send("❌ يمكنك حذف التاقات التي أضفتها أنت فقط، أو كن أدمن لحذف أي تاق.")
+                return
+            
+            # If multiple matches and no specific server_link provided, show options
+            if len(deletable_tags) > 1 and server_link is None:
+                embed = discord.Embed(
+                    title="🔍 عدة نتائج للتاق",
+                    description=f"تم العثور على {len(deletable_tags)} سيرفر يحتوي على التاق `{tag}`\n\nحدد السيرفر المراد حذف التاق منه:",
+                    color=0xffa500
+                )
+                
+                for i, tag_entry in enumerate(deletable_tags[:10], 1):
+                    embed.add_field(
+                        name=f"{i}. {tag_entry['server_name']}",
+                        value=f"**الرابط:** {tag_entry['server_link']}\n**أضافه:** <@{tag_entry['added_by']}>",
+                        inline=False
+                    )
+                
+                embed.set_footer(text="استخدم الأمر مع تحديد رابط السيرفر: /حذف تاق [التاق] [رابط_السيرفر]")
+                await interaction.followup.send(embed=embed)
+                return
+            
+            # Remove the tag(s)
+            removed_count = 0
+            for tag_entry in deletable_tags:
+                if self.bot.tag_store.remove(tag_entry):
+                    removed_count += 1
+            
+            self.bot.save_tags_data()
+            
+            embed = discord.Embed(
+                title="🗑️ تم حذف التاق بنجاح",
+                description=f"تم حذف {removed_count} تاق بالاسم: `{tag}`",
+                color=0xff6b6b
+            )
+            
+            if removed_count == 1:
+                deleted_tag = deletable_tags[0]
+                embed.add_field(name="السيرفر", value=deleted_tag['server_name'], inline=True)
+                embed.add_field(name="الرابط", value=deleted_tag['server_link'], inline=True)
+            
+            embed.add_field(name="حذفه", value=interaction.user.mention, inline=True)
+            embed.timestamp = datetime.now()
+            
+            await interaction.followup.send(embed=embed)
+            
+        except Exception as e:
+            logger.error(f"Error in remove_tag: {e}")
+            await interaction.followup.send("❌ حدث خطأ أثناء حذف التاق.")
+    
+    @search_tag.autocomplete('tag')
+    async def search_tag_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Suggest existing tags for /بحث"""
+        try:
+            suggestions = self.bot.tag_store.suggest(
+                current,
+                limit=TAG_AUTOCOMPLETE_CONFIG['max_choices'],
+                popularity=self.search_counts,
+                scan_limit=TAG_AUTOCOMPLETE_CONFIG['scan_limit']
+            )
+            return [app_commands.Choice(name=tag[:100], value=tag[:100]) for tag in suggestions]
+        except Exception as e:
+            logger.error(f"Error in tag autocomplete: {e}")
+            return []
+    
+    @remove_tag.autocomplete('tag')
+    async def remove_tag_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Suggest tags the user may delete for /حذف"""
+        try:
+            is_admin = isinstance(interaction.user, discord.Member) and interaction.user.guild_permissions.administrator
+            if is_admin:
+                suggestions = self.bot.tag_store.suggest(
+                    current,
+                    limit=TAG_AUTOCOMPLETE_CONFIG['max_choices'],
+                    popularity=self.search_counts,
+                    scan_limit=TAG_AUTOCOMPLETE_CONFIG['scan_limit']
+                )
+            else:
+                # Members can only delete their own tags, so only those are offered
+                prefix = normalize_text(current)
+                suggestions = []
+                for tag_entry in self.bot.tag_store.user_tags(str(interaction.user.id)):
+                    tag = tag_entry.get("tag", "")
+                    if normalize_text(tag).startswith(prefix) and tag not in suggestions:
+                        suggestions.append(tag)
+                suggestions = suggestions[:TAG_AUTOCOMPLETE_CONFIG['max_choices']]
+            return [app_commands.Choice(name=tag[:100], value=tag[:100]) for tag in suggestions]
+        except Exception as e:
+            logger.error(f"Error in tag autocomplete: {e}")
+            return []
+    
+    @app_commands.command(name="حذف_تاقاتي", description="حذف جميع التاقات التي أضفتها")
+    @app_commands.describe(confirm="تأكيد الحذف")
+    async def remove_my_tags(self, interaction: discord.Interaction, confirm: bool = False):
+        """Remove every tag the user has added"""
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            user_id = str(interaction.user.id)
+            my_tags = self.bot.tag_store.user_tags(user_id)
+            
+            if not my_tags:
+                await interaction.followup.send("❌ لا توجد تاقات مضافة باسمك.", ephemeral=True)
+                return
+            
+            if not confirm:
+                await interaction.followup.send(
+                    f"⚠️ سيتم حذف **{len(my_tags)}** تاق. أعد تنفيذ الأمر مع confirm=True للتأكيد.",
+                    ephemeral=True
+                )
+                return
+            
+            removed_count = sum(1 for tag_entry in my_tags if self.bot.tag_store.remove(tag_entry))
+            self.bot.save_tags_data()
+            
+            await interaction.followup.send(f"🗑️ تم حذف {removed_count} تاق.", ephemeral=True)
+            logger.info(f"{interaction.user} removed all {removed_count} of their tags")
+            
+        except Exception as e:
+            logger.error(f"Error in remove_my_tags: {e}")
+            await interaction.followup.send("❌ حدث خطأ أثناء حذف التاقات.", ephemeral=True)
+    
+    def get_filtered_tags(self, user_id: int, filter_tag: str | None, show_my_tags: bool):
+        """Get filtered tags for a user, reusing the result for a short TTL while they page"""
+        now = time.monotonic()
+        filter_key = normalize_text(filter_tag) if filter_tag else None
+        session_key = (user_id, filter_key, show_my_tags)
+        
+        cached = self.list_sessions.get(session_key)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        if show_my_tags:
+            # Only the user's own posting list needs to be scanned
+            candidates = (
+                (normalize_text(tag_entry.get("tag", "")), tag_entry)
+                for tag_entry in self.bot.tag_store.user_tags(str(user_id))
+            )
+        else:
+            candidates = self.bot.tag_store.iter_normalized()
+        
+        filtered_tags = [
+            tag_entry for key, tag_entry in candidates
+            if not filter_key or filter_key in key
+        ]
+        
+        # Drop expired sessions before storing the new one
+        self.list_sessions = {k: v for k, v in self.list_sessions.items() if v[0] > now}
+        self.list_sessions[session_key] = (now + TAG_LIST_CONFIG['session_ttl'], filtered_tags)
+        return filtered_tags
+    
+    def build_tag_list_embed(self, page_tags, page_number: int, total_pages: int, total: int):
+        """Build the embed for one page of the tag list"""
+        embed = discord.Embed(
+            title="📋 قائمة التاقات المتاحة",
+            description=f"إجمالي التاقات: **{total}** تاق",
+            color=0x57f287
+        )
+        
+        first_index = page_number * TAG_LIST_CONFIG['per_page'] + 1
+        for i, tag_entry in enumerate(page_tags, first_index):
+            tag_name = tag_entry.get("tag", "غير محدد")
+            server_name = tag_entry.get("server_name", "غير محدد")
+            added_by = tag_entry.get("added_by", "غير معروف")
+            
+            embed.add_field(
+                name=f"{i}. `{tag_name}`",
+                value=f"**السيرفر:** {server_name}\n**أضافه:** <@{added_by}>",
+                inline=True
+            )
+        
+        if total_pages > 1:
+            embed.set_footer(text=f"الصفحة {page_number + 1} من {total_pages} • استخدم /قائمة مع الفلترة لتحديد البحث")
+        else:
+            embed.set_footer(text=f"مجموع التاقات: {total}")
+        return embed
+    
+    @app_commands.command(name="قائمة", description="عرض جميع التاقات المتاحة")
+    @app_commands.describe(
+        filter_tag="فلترة التاقات (اختياري)",
+        show_my_tags="عرض التاقات التي أضفتها أنت فقط"
+    )
+    async def list_tags(self, interaction: discord.Interaction, filter_tag: str | None = None, show_my_tags: bool = False):
+        """List all available tags with optional filtering"""
+        await interaction.response.defer()
+        
+        try:
+            if not len(self.bot.tag_store):
+                embed = discord.Embed(
+                    title="📋 قائمة التاقات",
+                    description="لا توجد تاقات مسجلة في قاعدة البيانات.\n\n💡 استخدم `/اضافة` لإضافة تاق جديد!",
+                    color=0xffa500
+                )
+                await interaction.followup.send(embed=embed)
+                return
+            
+            tags_per_page = TAG_LIST_CONFIG['per_page']
+            
+            if filter_tag or show_my_tags:
+                filtered_tags = self.get_filtered_tags(interaction.user.id, filter_tag, show_my_tags)
+                
+                if not filtered_tags:
+                    filter_desc = ""
+                    if show_my_tags:
+                        filter_desc += "التي أضفتها أنت "
+                    if filter_tag:
+                        filter_desc += f"التي تحتوي على '{filter_tag}' "
+                    
+                    embed = discord.Embed(
+                        title="📋 قائمة التاقات",
+                        description=f"لا توجد تاقات {filter_desc}في قاعدة البيانات.",
+                        color=0xffa500
+                    )
+                    await interaction.followup.send(embed=embed)
+                    return
+                
+                pager = ListPager(filtered_tags, tags_per_page)
+            else:
+                pager = SortedIndexPager(self.bot.tag_store, tags_per_page)
+            
+            view = TagListView(interaction.user.id, pager, self.build_tag_list_embed)
+            embed = view.current_embed()
+            
+            if view.total_pages > 1:
+                await interaction.followup.send(embed=embed, view=view)
+            else:
+                await interaction.followup.send(embed=embed)
+            
+        except Exception as e:
+            logger.error(f"Error in list_tags: {e}")
+            await interaction.followup.send("❌ حدث خطأ أثناء عرض قائمة التاقات.")
+
+    @app_commands.command(name="export_tags", description="تصدير قاعدة التاقات كملف (للإداريين فقط)")
+    @app_commands.describe(file_format="صيغة الملف")
+    @app_commands.choices(file_format=[
+        app_commands.Choice(name="NDJSON", value="ndjson"),
+        app_commands.Choice(name="CSV", value="csv")
+    ])
+    async def export_tags_command(self, interaction: discord.Interaction, file_format: str = "ndjson"):
+        """Export all tags as an NDJSON or CSV attachment"""
+        if not interaction.guild or not isinstance(interaction.user, discord.Member) or not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            # Rows are written straight to a temp file instead of being built up in memory
+            with tempfile.TemporaryFile() as export_file:
+                count = export_tags(self.bot.tag_store.entries.values(), export_file, file_format)
+                export_file.seek(0)
+                filename = f"tags_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{file_format}"
+                await interaction.followup.send(
+                    f"📤 تم تصدير {count} تاق.",
+                    file=discord.File(export_file, filename=filename),
+                    ephemeral=True
+                )
+            logger.info(f"{interaction.user} exported {count} tags as {file_format}")
+            
+        except Exception as e:
+            logger.error(f"Error exporting tags: {e}")
+            await interaction.followup.send("❌ حدث خطأ أثناء تصدير التاقات.", ephemeral=True)
+    
+    @app_commands.command(name="import_tags", description="استيراد تاقات من ملف NDJSON أو CSV (للإداريين فقط)")
+    @app_commands.describe(file="ملف التاقات (.ndjson / .jsonl / .csv)")
+    async def import_tags_command(self, interaction: discord.Interaction, file: discord.Attachment):
+        """Import tags from an NDJSON or CSV attachment in a single batch"""
+        if not interaction.guild or not isinstance(interaction.user, discord.Member) or not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط", ephemeral=True)
+            return
+        
+        file_format = detect_format(file.filename)
+        if not file_format:
+            await interaction.response.send_message("❌ صيغة الملف غير مدعومة. استخدم .ndjson أو .jsonl أو .csv", ephemeral=True)
+            return
+        
+        if file.size > TAG_TRANSFER_CONFIG['max_import_bytes']:
+            await interaction.response.send_message("❌ حجم الملف أكبر من الحد المسموح", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            tag_store = self.bot.tag_store
+            new_entries = []
+            seen_pairs = set()
+            duplicates = 0
+            errors = []
+            error_count = 0
+            batch_size = TAG_TRANSFER_CONFIG['batch_size']
+            
+            # Validate and dedupe everything before touching the store
+            with tempfile.TemporaryFile() as raw_file:
+                await file.save(raw_file)
+                raw_file.seek(0)
+                text_file = io.TextIOWrapper(raw_file, encoding="utf-8-sig", newline="")
+                
+                for row_count, (line_number, row, error) in enumerate(iter_import_rows(text_file, file_format), 1):
+                    if row is not None:
+                        entry, error = validate_row(row)
+                    if error:
+                        error_count += 1
+                        if len(errors) < TAG_TRANSFER_CONFIG['max_reported_errors']:
+                            errors.append(f"سطر {line_number}: {error}")
+                    else:
+                        pair = tag_store.pair_key(entry["tag"], entry["server_link"])
+                        if pair in seen_pairs or pair in tag_store.by_pair:
+                            duplicates += 1
+                        else:
+                            seen_pairs.add(pair)
+                            new_entries.append(entry)
+                    
+                    if row_count % batch_size == 0:
+                        await asyncio.sleep(0)
+            
+            # Apply all rows together; on failure nothing is kept
+            imported_at = datetime.now().isoformat()
+            added = []
+            try:
+                for entry in new_entries:
+                    if tag_store.find_pair(entry["tag"], entry["server_link"]):
+                        # Added by someone else while the file was being validated
+                        duplicates += 1
+                        continue
+                    if entry.get("id") and tag_store.get(entry["id"]):
+                        del entry["id"]
+                    entry.setdefault("added_by", str(interaction.user.id))
+                    entry.setdefault("added_at", imported_at)
+                    entry.setdefault("added_from_guild", str(interaction.guild_id))
+                    added.append(tag_store.add(entry))
+            except Exception:
+                for entry in added:
+                    tag_store.remove(entry)
+                raise
+            
+            if added:
+                self.bot.save_tags_data()
+            self.list_sessions.clear()
+            
+            embed = discord.Embed(
+                title="📥 نتيجة الاستيراد",
+                color=0x57f287 if not error_count else 0xffa500
+            )
+            embed.add_field(name="✅ تمت إضافتها", value=str(len(added)), inline=True)
+            embed.add_field(name="🔁 مكررة", value=str(duplicates), inline=True)
+            embed.add_field(name="❌ غير صالحة", value=str(error_count), inline=True)
+            if errors:
+                embed.add_field(name="⚠️ الأخطاء", value="\n".join(errors), inline=False)
+            
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            logger.info(f"{interaction.user} imported {len(added)} tags ({duplicates} duplicates, {error_count} invalid)")
+            
+        except Exception as e:
+            logger.error(f"Error importing tags: {e}")
+            await interaction.followup.send("❌ حدث خطأ أثناء استيراد التاقات. لم يتم حفظ أي تغيير.", ephemeral=True)
+    
+    @app_commands.command(name="search_stats", description="إحصائيات ذاكرة نتائج البحث")
+    async def search_stats(self, interaction: discord.Interaction):
+        """Show search result cache hit rate"""
+        if not interaction.guild or not isinstance(interaction.user, discord.Member) or not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط", ephemeral=True)
+            return
+        
+        stats = self.search_cache.stats()
+        embed = discord.Embed(
+            title="📊 إحصائيات البحث",
+            color=0x0099ff
+        )
+        embed.add_field(name="✅ من الذاكرة", value=str(stats['hits']), inline=True)
+        embed.add_field(name="🔍 بحث كامل", value=str(stats['misses']), inline=True)
+        embed.add_field(name="📈 نسبة الإصابة", value=f"{stats['hit_rate']:.1%}", inline=True)
+        embed.add_field(name="🗂️ استعلامات محفوظة", value=str(stats['size']), inline=True)
+        embed.add_field(name="🏷️ عدد التاقات", value=str(len(self.bot.tag_store)), inline=True)
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="setup_tag_search", description="إعداد نظام البحث بالتاقات")
+    @app_commands.describe(channel="القناة التي ستحتوي على نظام البحث")
+    async def setup_tag_search(self, interaction: discord.Interaction, channel: discord.TextChannel):
+        """Setup the tag search system"""
+        if not interaction.guild or not isinstance(interaction.user, discord.Member) or not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط", ephemeral=True)
+            return
+        
+        try:
+            from utils.button_views import TagSearchView
+            
+            embed = discord.Embed(
+                title="🔍 نظام البحث بالتاقات",
+                description="استخدم الأزرار أدناه للبحث عن السيرفرات أو إضافة تاقات جديدة",
+                color=0x0099ff
+            )
+            
+            embed.add_field(
+                name="🔍 البحث عن تاق",
+                value="ابحث عن سيرفرات باستخدام التاقات",
+                inline=True
+            )
+            
+            embed.add_field(
+                name="➕ إضافة تاق",
+                value="أضف تاق جديد لسيرفر",
+                inline=True
+            )
+            
+            embed.set_footer(text="Qren Tag Search System")
+            
+            view = TagSearchView(self.bot)
+            message = await channel.send(embed=embed, view=view)
+            
+            await interaction.response.send_message(f"✅ تم إعداد نظام البحث بالتاقات في {channel.mention}", ephemeral=True)
+            
+        except Exception as e:
+            logger.error(f"Error setting up tag search: {e}")
+            await interaction.response.send_message("❌ حدث خطأ أثناء إعداد النظام", ephemeral=True)
@@ -5,16 +5,31 @@ import logging
 import os
 import json
 import asyncio
-import aiofiles
-import aiohttp
 import re
+import io
+import zipfile
 import subprocess
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
-from utils.button_views import AvatarButtonView
-from utils.control_panel_views import ControlPanelView, SystemToolsView, BotStatusView
+from utils.button_views import AvatarButtonView, RandomAvatarView
+from utils.control_panel_views import ControlPanelView, SystemToolsView, BotStatusView, PurgeCancelView
 from utils.publishing_views import ServerPromotionView
-from utils.avatar_manager import AvatarManager
+from utils.avatar_upload import UploadTooLarge, InvalidImage
+from utils.image_probe import probe_image
+from utils.avatar_ingest import AvatarIngest, TooManyFiles
+from utils.avatar_variants import pick_send_file
+from utils.avatar_gallery import AvatarGalleryView, ThumbnailGridCache
+from utils.avatar_integrity import IntegrityScanner
+from utils.purge_jobs import PurgeJobManager
+from utils.mass_moderation import MassModerator, MassModerationReport
+from utils.publish_queue import PublishQueue, PublishJob
+from utils.publication_log import PublicationLog
+from utils.invite_index import InviteIndex
+from config import (
+    PURGE_CONFIG, MASS_MODERATION_CONFIG, PUBLISH_QUEUE_CONFIG, PUBLICATION_LOG_CONFIG,
+    INVITE_INDEX_CONFIG, AVATAR_UPLOAD_CONFIG, AVATAR_VARIANT_CONFIG, AVATAR_INGEST_CONFIG,
+    AVATAR_GALLERY_CONFIG, AVATAR_INTEGRITY_CONFIG, FEATURES
+)
 # Load configuration
 BOT_CONFIG = {
     'prefix': '!',
@@ -28,7 +43,33 @@ logger = logging.getLogger(__name__)
 class AvatarCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.avatar_manager = AvatarManager()
+        # Shared with the bot so both see the same records and blob references
+        self.avatar_manager = bot.avatar_manager
+        self.grid_cache = ThumbnailGridCache(
+            bot.avatar_processor,
+            cache_dir=AVATAR_GALLERY_CONFIG['cache_dir'],
+            thumb_size=AVATAR_GALLERY_CONFIG['thumb_size'],
+            columns=AVATAR_GALLERY_CONFIG['columns'],
+            max_files=AVATAR_GALLERY_CONFIG['max_cached_grids']
+        )
+        self.integrity_scanner = IntegrityScanner(
+            self.avatar_manager,
+            root="avatars",
+            skip_dirs=(AVATAR_GALLERY_CONFIG['cache_dir'],),
+            grace_seconds=AVATAR_INTEGRITY_CONFIG['grace_seconds'],
+            interval=AVATAR_INTEGRITY_CONFIG['interval'],
+            verify_budget=AVATAR_INTEGRITY_CONFIG['verify_budget']
+        )
+    
+    async def cog_load(self):
+        """Start the background avatar integrity scan and stats flushing"""
+        self.integrity_scanner.start()
+        if FEATURES['avatar_stats_tracking']:
+            self.bot.avatar_stats.start()
+    
+    async def cog_unload(self):
+        """Stop the background avatar integrity scan"""
+        self.integrity_scanner.stop()
     
     def is_admin(self, user):
         """Check if user has admin permissions"""
@@ -36,12 +77,55 @@ class AvatarCommands(commands.Cog):
             return user.guild_permissions.administrator
         return False
     
+    async def store_image_file(self, temp_path: str, digest: str, size: int) -> dict:
+        """Validate a downloaded image and move it into the blob store.
+        
+        Returns the record fields for the stored file plus ``duplicate_of``
+        (an avatar that already uses the same content, or None). The temp file
+        is removed if the image is rejected or storing it fails.
+        """
+        try:
+            probe = await asyncio.to_thread(probe_image, temp_path)
+            max_dimension = AVATAR_UPLOAD_CONFIG['max_dimension']
+            if not probe:
+                raise InvalidImage("الملف ليس صورة صالحة (PNG أو JPEG أو GIF أو WebP)")
+            if max(probe['width'], probe['height']) > max_dimension:
+                raise InvalidImage(f"أبعاد الصورة كبيرة جداً! الحد الأقصى {max_dimension} بكسل.")
+            
+            filepath = await asyncio.to_thread(self.avatar_manager.store_file, temp_path, digest, probe['ext'])
+            duplicate_of = self.avatar_manager.find_by_hash(digest)
+            if duplicate_of and duplicate_of.get('variants'):
+                variants = duplicate_of['variants']
+            else:
+                variants = await self.bot.avatar_processor.process(filepath)
+        except BaseException:
+            # Once stored the temp file is gone; otherwise it must not linger in .incoming
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        return {
+            'filepath': filepath,
+            'sha256': digest,
+            'ext': probe['ext'],
+            'format': probe['format'],
+            'mime': probe['mime'],
+            'width': probe['width'],
+            'height': probe['height'],
+            'frames': probe['frames'],
+            'file_size': size,
+            'variants': variants,
+            'duplicate_of': duplicate_of
+        }
+    
     @app_commands.command(name="upload_avatar", description="رفع أفتار جديد (للإداريين فقط)")
     @app_commands.describe(
         image="صورة الأفتار المراد رفعها",
-        name="اسم الأفتار (اختياري)"
+        name="اسم الأفتار (اختياري)",
+        categories="التصنيفات مفصولة بفواصل (اختياري)"
     )
-    async def upload_avatar(self, interaction: discord.Interaction, image: discord.Attachment, name: str = ""):
+    async def upload_avatar(self, interaction: discord.Interaction, image: discord.Attachment, name: str = "",
+                            categories: str = ""):
         """Upload a new avatar image"""
         try:
             if not self.is_admin(interaction.user):
@@ -52,7 +136,7 @@ class AvatarCommands(commands.Cog):
                 await interaction.response.send_message("❌ الرجاء رفع ملف صورة صحيح!", ephemeral=True)
                 return
             
-            if image.size > 10 * 1024 * 1024:
+            if image.size > AVATAR_UPLOAD_CONFIG['max_bytes']:
                 await interaction.response.send_message("❌ حجم الصورة كبير جداً! الحد الأقصى 10 ميجابايت.", ephemeral=True)
                 return
             
@@ -69,25 +153,37 @@ class AvatarCommands(commands.Cog):
             if not clean_name:
                 clean_name = f"avatar_{image.id}"
             
-            filename = f"{clean_name}_{image.id}.{image.filename.split('.')[-1]}"
-            filepath = os.path.join("avatars", filename)
+            try:
+                temp_path, digest, size = await self.bot.attachment_downloader.download(image.url)
+            except UploadTooLarge:
+                await interaction.followup.send("❌ حجم الصورة كبير جداً! الحد الأقصى 10 ميجابايت.", ephemeral=True)
+                return
             
-            data = await image.read()
-            async with aiofiles.open(filepath, 'wb') as f:
-                await f.write(data)
+            try:
+                stored = await self.store_image_file(temp_path, digest, size)
+            except InvalidImage as e:
+                await interaction.followup.send(f"❌ {e}", ephemeral=True)
+                return
+            duplicate_of = stored.pop('duplicate_of')
             
             avatar_info = {
                 'name': name,
                 'clean_name': clean_name,
-                'filename': filename,
-                'filepath': filepath,
+                # The extension comes from the file's content, not the uploaded name
+                'filename': f"{clean_name}_{image.id}.{stored['ext']}",
+                **stored,
                 'uploader': interaction.user.id,
                 'upload_time': discord.utils.utcnow().isoformat()
             }
             
             self.avatar_manager.add_avatar(avatar_info)
+            if categories:
+                self.avatar_manager.set_categories(name, categories.split(','))
             
-            await interaction.followup.send(f"✅ تم رفع الأفتار '{name}' بنجاح!")
+            if duplicate_of and duplicate_of['name'] != name:
+                await interaction.followup.send(f"✅ تم رفع الأفتار '{name}' بنجاح! (نفس صورة '{duplicate_of['name']}'، لم يتم تخزينها مرة أخرى)")
+            else:
+                await interaction.followup.send(f"✅ تم رفع الأفتار '{name}' بنجاح!")
             logger.info(f"Avatar '{name}' uploaded by {interaction.user}")
             
         except Exception as e:
@@ -97,16 +193,114 @@ class AvatarCommands(commands.Cog):
             else:
                 await interaction.response.send_message("❌ فشل في رفع الأفتار. حاول مرة أخرى.", ephemeral=True)
     
+    @app_commands.command(name="bulk_upload_avatars", description="رفع مجموعة أفاتارات من ملف ZIP أو من قناة (للإداريين فقط)")
+    @app_commands.describe(
+        archive="ملف ZIP يحتوي على الصور",
+        channel="قناة لجمع الصور من رسائلها الأخيرة",
+        limit="عدد الرسائل التي يتم فحصها في القناة"
+    )
+    async def bulk_upload_avatars(self, interaction: discord.Interaction, archive: Optional[discord.Attachment] = None,
+                                  channel: Optional[discord.TextChannel] = None, limit: int = 100):
+        """Import many avatars at once from a ZIP archive or a channel's recent attachments"""
+        try:
+            if not self.is_admin(interaction.user):
+                await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط!", ephemeral=True)
+                return
+            
+            if (archive is None) == (channel is None):
+                await interaction.response.send_message("❌ حدد ملف ZIP أو قناة (واحد فقط)!", ephemeral=True)
+                return
+            
+            if archive and not archive.filename.lower().endswith('.zip'):
+                await interaction.response.send_message("❌ الملف يجب أن يكون بصيغة ZIP!", ephemeral=True)
+                return
+            
+            await interaction.response.defer()
+            
+            ingest = AvatarIngest(
+                self.avatar_manager,
+                self.bot.attachment_downloader,
+                self.store_image_file,
+                concurrency=AVATAR_INGEST_CONFIG['concurrency'],
+                max_file_bytes=AVATAR_UPLOAD_CONFIG['max_bytes'],
+                max_files=AVATAR_INGEST_CONFIG['max_files']
+            )
+            
+            if archive:
+                try:
+                    archive_path, _, _ = await self.bot.attachment_downloader.download(
+                        archive.url, max_bytes=AVATAR_INGEST_CONFIG['max_archive_bytes']
+                    )
+                except UploadTooLarge:
+                    await interaction.followup.send("❌ حجم ملف ZIP كبير جداً!", ephemeral=True)
+                    return
+                try:
+                    report = await ingest.ingest_zip(archive_path, interaction.user.id)
+                except zipfile.BadZipFile:
+                    await interaction.followup.send("❌ ملف ZIP تالف!", ephemeral=True)
+                    return
+                except TooManyFiles as e:
+                    await interaction.followup.send(
+                        f"❌ ملف ZIP يحتوي على {e.args[0]} صورة! الحد الأقصى {AVATAR_INGEST_CONFIG['max_files']} صورة.",
+                        ephemeral=True
+                    )
+                    return
+                finally:
+                    os.remove(archive_path)
+            else:
+                limit = max(1, min(limit, AVATAR_INGEST_CONFIG['max_history_messages']))
+                attachments = [
+                    attachment
+                    async for message in channel.history(limit=limit)
+                    for attachment in message.attachments
+                    if attachment.content_type and attachment.content_type.startswith('image/')
+                ]
+                report = await ingest.ingest_attachments(attachments, interaction.user.id)
+            
+            if not report.results:
+                await interaction.followup.send("📭 لم يتم العثور على صور.")
+                return
+            
+            embed = discord.Embed(
+                title="📦 نتيجة الرفع الجماعي",
+                color=discord.Color.green() if not report.count('failed') else discord.Color.orange()
+            )
+            embed.add_field(name="✅ تمت إضافتها", value=str(report.count('added')), inline=True)
+            embed.add_field(name="🔁 مكررة", value=str(report.count('duplicate')), inline=True)
+            embed.add_field(name="❌ فشلت", value=str(report.count('failed')), inline=True)
+            
+            # Per-file results go in an attached text file since they can be long
+            labels = {'added': "✅ أضيفت باسم", 'duplicate': "🔁 مكررة مع", 'failed': "❌ فشلت:"}
+            lines = [f"{source} — {labels[status]} {detail}" for source, status, detail in report.results]
+            report_file = discord.File(io.BytesIO("\n".join(lines).encode('utf-8')), filename="bulk_upload_report.txt")
+            
+            await interaction.followup.send(embed=embed, file=report_file)
+            logger.info(f"Bulk avatar upload by {interaction.user}: {report.count('added')} added")
+            
+        except Exception as e:
+            logger.error(f"Error in bulk avatar upload: {e}")
+            if interaction.response.is_done():
+                await interaction.followup.send("❌ فشل في الرفع الجماعي. حاول مرة أخرى.", ephemeral=True)
+            else:
+                await interaction.response.send_message("❌ فشل في الرفع الجماعي. حاول مرة أخرى.", ephemeral=True)
+    
     @app_commands.command(name="post_avatar", description="نشر أفتار مع زر التحميل (للإداريين فقط)")
-    @app_commands.describe(avatar_name="اسم الأفتار المراد نشره")
-    async def post_avatar(self, interaction: discord.Interaction, avatar_name: str):
+    @app_commands.describe(
+        avatar_name="اسم الأفتار المراد نشره (اتركه فارغاً لاختيار أفتار عشوائي)",
+        category="تصنيف لتصفية الأسماء أو للاختيار العشوائي منه (اختياري)"
+    )
+    async def post_avatar(self, interaction: discord.Interaction, avatar_name: str = "", category: str = ""):
         """Post an avatar with interactive button"""
         try:
             if not self.is_admin(interaction.user):
                 await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط!", ephemeral=True)
                 return
             
-            avatar_info = self.avatar_manager.get_avatar(avatar_name)
+            if avatar_name:
+                avatar_info = self.avatar_manager.get_avatar(avatar_name)
+            else:
+                avatar_info = self.avatar_manager.random_avatar(category or None)
+                avatar_name = avatar_info['name'] if avatar_info else category
             if not avatar_info:
                 await interaction.response.send_message(f"❌ لم يتم العثور على الأفتار '{avatar_name}'!", ephemeral=True)
                 return
@@ -123,8 +317,9 @@ class AvatarCommands(commands.Cog):
                 color=discord.Color.blue()
             )
             
-            file = discord.File(avatar_info['filepath'])
-            embed.set_image(url=f"attachment://{avatar_info['filename']}")
+            send_file = pick_send_file(avatar_info, AVATAR_VARIANT_CONFIG['send_min_px'])
+            file = discord.File(send_file['path'], filename=send_file['filename'])
+            embed.set_image(url=f"attachment://{send_file['filename']}")
             
             view = AvatarButtonView(avatar_info, self.bot)
             
@@ -139,40 +334,36 @@ class AvatarCommands(commands.Cog):
                 await interaction.response.send_message("❌ فشل في نشر الأفتار. حاول مرة أخرى.", ephemeral=True)
     
     @app_commands.command(name="list_avatars", description="عرض جميع الأفاتارات المتاحة (للإداريين فقط)")
-    async def list_avatars(self, interaction: discord.Interaction):
-        """List all available avatars"""
+    @app_commands.describe(thumbnails="عرض صور مصغرة لكل صفحة")
+    async def list_avatars(self, interaction: discord.Interaction, thumbnails: bool = AVATAR_GALLERY_CONFIG['thumbnails']):
+        """Browse all avatars page by page"""
         try:
             if not self.is_admin(interaction.user):
                 await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط!", ephemeral=True)
                 return
             
-            avatars = self.avatar_manager.list_avatars()
-            
-            if not avatars:
+            if not self.avatar_manager.get_avatar_count():
                 await interaction.response.send_message("📭 لا توجد أفاتارات مرفوعة بعد!", ephemeral=True)
                 return
             
-            embed = discord.Embed(
-                title="📂 الأفاتارات المتاحة",
-                description=f"المجموع: {len(avatars)} أفتار",
-                color=discord.Color.green()
-            )
-            
-            for i, avatar in enumerate(avatars[:25], 1):
-                embed.add_field(
-                    name=f"{i}. {avatar['name']}",
-                    value=f"الملف: `{avatar['filename']}`",
-                    inline=False
-                )
+            await interaction.response.defer(ephemeral=True)
             
-            if len(avatars) > 25:
-                embed.set_footer(text=f"عرض أول 25 من {len(avatars)} أفتار")
+            view = AvatarGalleryView(
+                interaction.user.id,
+                self.avatar_manager,
+                AVATAR_GALLERY_CONFIG['per_page'],
+                grid_cache=self.grid_cache if thumbnails else None
+            )
+            page = await view.render()
             
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            if view.total_pages > 1:
+                await interaction.followup.send(embed=page['embed'], files=page['attachments'], view=view, ephemeral=True)
+            else:
+                await interaction.followup.send(embed=page['embed'], files=page['attachments'], ephemeral=True)
             
         except Exception as e:
             logger.error(f"Error listing avatars: {e}")
-            await interaction.response.send_message("❌ فشل في عرض الأفاتارات. حاول مرة أخرى.", ephemeral=True)
+            await interaction.followup.send("❌ فشل في عرض الأفاتارات. حاول مرة أخرى.", ephemeral=True)
     
     @app_commands.command(name="delete_avatar", description="حذف أفتار (للإداريين فقط)")
     @app_commands.describe(avatar_name="اسم الأفتار المراد حذفه")
@@ -188,9 +379,7 @@ class AvatarCommands(commands.Cog):
                 await interaction.response.send_message(f"❌ لم يتم العثور على الأفتار '{avatar_name}'!", ephemeral=True)
                 return
             
-            if os.path.exists(avatar_info['filepath']):
-                os.remove(avatar_info['filepath'])
-            
+            # The image file is deleted by the manager once no other avatar shares it
             self.avatar_manager.remove_avatar(avatar_name)
             
             await interaction.response.send_message(f"✅ تم حذف الأفتار '{avatar_name}' بنجاح!", ephemeral=True)
@@ -200,21 +389,186 @@ class AvatarCommands(commands.Cog):
             logger.error(f"Error deleting avatar: {e}")
             await interaction.response.send_message("❌ فشل في حذف الأفتار. حاول مرة أخرى.", ephemeral=True)
     
+    @app_commands.command(name="avatar_categories", description="تعيين تصنيفات أفتار (للإداريين فقط)")
+    @app_commands.describe(
+        avatar_name="اسم الأفتار",
+        categories="التصنيفات مفصولة بفواصل (اتركه فارغاً لإزالة التصنيفات)"
+    )
+    async def avatar_categories(self, interaction: discord.Interaction, avatar_name: str, categories: str = ""):
+        """Set the categories of an avatar"""
+        try:
+            if not self.is_admin(interaction.user):
+                await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط!", ephemeral=True)
+                return
+            
+            if not self.avatar_manager.avatar_exists(avatar_name):
+                await interaction.response.send_message(f"❌ لم يتم العثور على الأفتار '{avatar_name}'!", ephemeral=True)
+                return
+            
+            normalized = self.avatar_manager.set_categories(avatar_name, categories.split(','))
+            if normalized:
+                await interaction.response.send_message(
+                    f"✅ تصنيفات '{avatar_name}': {', '.join(normalized)}", ephemeral=True
+                )
+            else:
+                await interaction.response.send_message(f"✅ تمت إزالة تصنيفات '{avatar_name}'", ephemeral=True)
+            logger.info(f"Avatar '{avatar_name}' categories set to {normalized} by {interaction.user}")
+            
+        except Exception as e:
+            logger.error(f"Error setting avatar categories: {e}")
+            await interaction.response.send_message("❌ فشل في تعيين التصنيفات. حاول مرة أخرى.", ephemeral=True)
+    
+    @app_commands.command(name="avatar_roulette", description="نشر لوحة أفتار عشوائي (للإداريين فقط)")
+    @app_commands.describe(category="التصنيف الذي يتم السحب منه (اختياري)")
+    async def avatar_roulette(self, interaction: discord.Interaction, category: str = ""):
+        """Post a panel whose button shows a random avatar"""
+        try:
+            if not self.is_admin(interaction.user):
+                await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط!", ephemeral=True)
+                return
+            
+            if category and not self.avatar_manager.category_names(category):
+                await interaction.response.send_message(f"❌ لا توجد أفاتارات في التصنيف '{category}'!", ephemeral=True)
+                return
+            if not self.avatar_manager.get_avatar_count():
+                await interaction.response.send_message("📭 لا توجد أفاتارات مرفوعة بعد!", ephemeral=True)
+                return
+            
+            embed = discord.Embed(
+                title="🎲 أفتار عشوائي",
+                description=f"التصنيف: {category}" if category else "اضغط الزر للحصول على أفتار عشوائي",
+                color=discord.Color.blue()
+            )
+            
+            await interaction.response.send_message(embed=embed, view=RandomAvatarView(self.bot, category))
+            self.avatar_manager.remember_panel(category)
+            logger.info(f"Avatar roulette panel ({category or 'all'}) posted by {interaction.user}")
+            
+        except Exception as e:
+            logger.error(f"Error posting avatar roulette: {e}")
+            await interaction.response.send_message("❌ فشل في نشر اللوحة. حاول مرة أخرى.", ephemeral=True)
+    
+    @app_commands.command(name="avatar_stats", description="أكثر الأفاتارات تحميلاً (للإداريين فقط)")
+    @app_commands.describe(
+        top="عدد الأفاتارات المعروضة",
+        days="آخر عدد من الأيام (0 = منذ البداية)"
+    )
+    async def avatar_stats(self, interaction: discord.Interaction, top: app_commands.Range[int, 1, 25] = 10,
+                           days: app_commands.Range[int, 0, 90] = 0):
+        """Show the most downloaded avatars"""
+        try:
+            if not self.is_admin(interaction.user):
+                await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط!", ephemeral=True)
+                return
+            
+            if not FEATURES['avatar_stats_tracking']:
+                await interaction.response.send_message("❌ تتبع إحصائيات الأفاتارات غير مفعل", ephemeral=True)
+                return
+            
+            ranking = self.bot.avatar_stats.top(top, days)
+            if not ranking:
+                await interaction.response.send_message("📭 لا توجد تحميلات مسجلة بعد!", ephemeral=True)
+                return
+            
+            embed = discord.Embed(
+                title="📊 أكثر الأفاتارات تحميلاً",
+                description=f"آخر {days} يوم" if days else "منذ بدء التتبع",
+                color=discord.Color.blue()
+            )
+            lines = []
+            for i, (name, stats) in enumerate(ranking, 1):
+                line = f"**{i}. {name}** — {stats['recent']} تحميل"
+                if days:
+                    line += f" (الإجمالي {stats['downloads']})"
+                line += f" • ~{stats['unique_users']} مستخدم"
+                if not self.avatar_manager.avatar_exists(name):
+                    line += " • محذوف"
+                lines.append(line)
+            embed.description += "\n\n" + "\n".join(lines)
+            embed.set_footer(text="عدد المستخدمين تقديري")
+            
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            
+        except Exception as e:
+            logger.error(f"Error showing avatar stats: {e}")
+            await interaction.response.send_message("❌ فشل في عرض الإحصائيات.", ephemeral=True)
+    
+    @app_commands.command(name="avatar_integrity", description="فحص ملفات الأفاتارات وتنظيف الملفات اليتيمة (للإداريين فقط)")
+    @app_commands.describe(dry_run="عرض النتائج فقط دون حذف أي ملف")
+    async def avatar_integrity(self, interaction: discord.Interaction, dry_run: bool = False):
+        """Run the avatar integrity scan now and show its report"""
+        try:
+            if not self.is_admin(interaction.user):
+                await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط!", ephemeral=True)
+                return
+            
+            await interaction.response.defer(ephemeral=True)
+            report = await self.integrity_scanner.scan(dry_run=dry_run)
+            
+            action = "سيتم حذفها" if dry_run else "تم حذفها"
+            embed = discord.Embed(
+                title="🩺 فحص ملفات الأفاتارات",
+                description=f"تم فحص {report.files_scanned} ملف",
+                color=discord.Color.orange() if report.missing or report.corrupt else discord.Color.green()
+            )
+            embed.add_field(
+                name="🗑️ ملفات يتيمة",
+                value=f"{len(report.orphans)} ملف + {len(report.stale_temp)} ملف مؤقت ({action}، {report.bytes_freed / 1024 / 1024:.1f} MB)",
+                inline=False
+            )
+            if report.missing:
+                names = ", ".join(report.missing[:20])
+                embed.add_field(name=f"❌ ملفات مفقودة ({len(report.missing)})", value=names[:1024], inline=False)
+            if report.missing_variants:
+                embed.add_field(name="🖼️ نسخ مفقودة", value=f"{len(report.missing_variants)} أفتار", inline=False)
+            if report.verified:
+                value = f"تم التحقق من {report.verified} ملف"
+                if report.corrupt:
+                    value += f"\n⚠️ ملفات تالفة: {', '.join(report.corrupt[:20])}"
+                embed.add_field(name="🔐 التحقق من البصمة", value=value[:1024], inline=False)
+            
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            logger.info(f"Avatar integrity scan run by {interaction.user} (dry_run={dry_run})")
+            
+        except Exception as e:
+            logger.error(f"Error running avatar integrity scan: {e}")
+            await interaction.followup.send("❌ فشل فحص ملفات الأفاتارات.", ephemeral=True)
+    
     @post_avatar.autocomplete('avatar_name')
     @delete_avatar.autocomplete('avatar_name')
+    @avatar_categories.autocomplete('avatar_name')
     async def avatar_name_autocomplete(self, interaction: discord.Interaction, current: str):
-        """Autocomplete for avatar names"""
+        """Autocomplete for avatar names, limited to a category when one is filled in"""
         try:
-            avatars = self.avatar_manager.list_avatars()
-            choices = [
-                app_commands.Choice(name=avatar['name'], value=avatar['name'])
-                for avatar in avatars
-                if current.lower() in avatar['name'].lower()
-            ][:25]
+            category = getattr(interaction.namespace, 'category', None)
+            names = self.avatar_manager.category_names(category) if category else self.avatar_manager.sorted_names()
+            current = current.lower()
+            choices = []
+            for name in names:
+                if current in name.lower():
+                    choices.append(app_commands.Choice(name=name, value=name))
+                    if len(choices) == 25:
+                        break
             return choices
         except Exception as e:
             logger.error(f"Error in autocomplete: {e}")
             return []
+    
+    @post_avatar.autocomplete('category')
+    @avatar_roulette.autocomplete('category')
+    async def category_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Autocomplete for avatar categories, largest first"""
+        try:
+            current = current.lower()
+            categories = sorted(self.avatar_manager.list_categories().items(), key=lambda item: -item[1])
+            return [
+                app_commands.Choice(name=f"{category} ({count})", value=category)
+                for category, count in categories
+                if current in category
+            ][:25]
+        except Exception as e:
+            logger.error(f"Error in category autocomplete: {e}")
+            return []
 
 # ==================== CONTROL COMMANDS ====================
 class ControlCommands(commands.Cog):
@@ -222,6 +576,12 @@ class ControlCommands(commands.Cog):
         self.bot = bot
         self.control_data_file = "control_panel_data.json"
         self.load_control_data()
+        self.purge_jobs = PurgeJobManager(
+            bulk_max_age_days=PURGE_CONFIG['bulk_delete_max_age_days'],
+            single_delete_delay=PURGE_CONFIG['single_delete_delay'],
+            progress_interval=PURGE_CONFIG['progress_interval']
+        )
+        self.mass_moderator = MassModerator(concurrency=MASS_MODERATION_CONFIG['concurrency'])
     
     def load_control_data(self):
         """Load control panel data from JSON file"""
@@ -373,6 +733,95 @@ class ControlCommands(commands.Cog):
             logger.error(f"Error banning member: {e}")
             await interaction.response.send_message("❌ حدث خطأ في حظر العضو", ephemeral=True)
     
+    @app_commands.command(name="mass_action", description="طرد أو حظر مجموعة أعضاء دفعة واحدة")
+    @app_commands.describe(
+        action="الإجراء المطلوب",
+        joined_within_minutes="الأعضاء الذين دخلوا خلال آخر عدد من الدقائق",
+        name_pattern="نمط الاسم (Regex)",
+        reason="السبب",
+        confirm="تنفيذ الإجراء فعلياً بدلاً من المعاينة"
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="طرد", value="kick"),
+        app_commands.Choice(name="حظر", value="ban")
+    ])
+    async def mass_action(self, interaction: discord.Interaction, action: str,
+                          joined_within_minutes: Optional[int] = None, name_pattern: Optional[str] = None,
+                          reason: str = "لا يوجد سبب", confirm: bool = False):
+        """Kick or ban every member matching the given filters"""
+        try:
+            if not self.is_admin(interaction.user):
+                await interaction.response.send_message("❌ هذا الأمر للمشرفين فقط!", ephemeral=True)
+                return
+            
+            if not joined_within_minutes and not name_pattern:
+                await interaction.response.send_message("❌ يجب تحديد مدة الدخول أو نمط الاسم على الأقل!", ephemeral=True)
+                return
+            
+            try:
+                targets = self.mass_moderator.select_targets(interaction.guild, joined_within_minutes, name_pattern)
+            except re.error:
+                await interaction.response.send_message("❌ نمط الاسم غير صحيح!", ephemeral=True)
+                return
+            
+            allowed, skipped = self.mass_moderator.check_hierarchy(targets, interaction.user, interaction.guild.me)
+            
+            if not allowed:
+                await interaction.response.send_message("❌ لا يوجد أعضاء مطابقون يمكن تنفيذ الإجراء عليهم", ephemeral=True)
+                return
+            
+            max_targets = MASS_MODERATION_CONFIG['max_targets']
+            if len(allowed) > max_targets:
+                await interaction.response.send_message(f"❌ عدد الأعضاء المطابقين ({len(allowed)}) أكبر من الحد المسموح ({max_targets})", ephemeral=True)
+                return
+            
+            action_name = "حظر" if action == "ban" else "طرد"
+            
+            if not confirm:
+                preview = "\n".join(f"• {member} ({member.id})" for member in allowed[:15])
+                if len(allowed) > 15:
+                    preview += f"\n... و {len(allowed) - 15} آخرين"
+                
+                embed = discord.Embed(
+                    title=f"🔍 معاينة {action_name} جماعي",
+                    description=preview,
+                    color=0xffa500
+                )
+                embed.add_field(name="🎯 سيتم تنفيذه على", value=str(len(allowed)), inline=True)
+                embed.add_field(name="⛔ تم تخطيهم (الرتبة)", value=str(len(skipped)), inline=True)
+                embed.set_footer(text="أعد تنفيذ الأمر مع confirm=True للتنفيذ")
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+            
+            await interaction.response.defer()
+            
+            report = MassModerationReport(action, len(targets))
+            report.skipped_hierarchy = skipped
+            await self.mass_moderator.execute(action, allowed, reason, report)
+            
+            embed = discord.Embed(
+                title=f"✅ تم تنفيذ {action_name} جماعي",
+                color=0x00ff00 if not report.failed else 0xffa500
+            )
+            embed.add_field(name="✅ نجح", value=str(report.succeeded), inline=True)
+            embed.add_field(name="❌ فشل", value=str(len(report.failed)), inline=True)
+            embed.add_field(name="⛔ تم تخطيهم (الرتبة)", value=str(len(report.skipped_hierarchy)), inline=True)
+            embed.add_field(name="📝 السبب", value=reason, inline=False)
+            
+            if report.failed:
+                failures = "\n".join(f"• {member} - {error}" for member, error in report.failed[:10])
+                embed.add_field(name="⚠️ الأخطاء", value=failures, inline=False)
+            
+            await interaction.followup.send(embed=embed)
+            logger.info(f"Mass {action} by {interaction.user}: {report.succeeded}/{len(allowed)} - Reason: {reason}")
+            
+        except Exception as e:
+            logger.error(f"Error in mass action: {e}")
+            if interaction.response.is_done():
+                await interaction.followup.send("❌ حدث خطأ أثناء تنفيذ الإجراء الجماعي", ephemeral=True)
+            else:
+                await interaction.response.send_message("❌ حدث خطأ أثناء تنفيذ الإجراء الجماعي", ephemeral=True)
+    
     @app_commands.command(name="clear", description="حذف رسائل من القناة")
     @app_commands.describe(amount="عدد الرسائل المراد حذفها")
     async def clear_messages(self, interaction: discord.Interaction, amount: int):
@@ -382,18 +831,59 @@ class ControlCommands(commands.Cog):
                 await interaction.response.send_message("❌ هذا الأمر للمشرفين فقط!", ephemeral=True)
                 return
             
-            if amount > 100:
-                await interaction.response.send_message("❌ لا يمكن حذف أكثر من 100 رسالة في المرة الواحدة!", ephemeral=True)
+            max_amount = PURGE_CONFIG['max_amount']
+            if amount < 1 or amount > max_amount:
+                await interaction.response.send_message(f"❌ عدد الرسائل يجب أن يكون بين 1 و {max_amount}!", ephemeral=True)
+                return
+            
+            if self.purge_jobs.get_job(interaction.channel.id):
+                await interaction.response.send_message("❌ توجد عملية حذف جارية في هذه القناة بالفعل!", ephemeral=True)
                 return
             
             await interaction.response.defer()
-            deleted = await interaction.channel.purge(limit=amount)
-            await interaction.followup.send(f"✅ تم حذف {len(deleted)} رسالة")
-            logger.info(f"{len(deleted)} messages cleared by {interaction.user}")
+            
+            embed = self.build_purge_embed(amount, 0, 0, finished=False, cancelled=False)
+            sent = await interaction.followup.send(embed=embed, wait=True)
+            # Edited with the bot token; the interaction webhook expires after 15 minutes
+            progress_message = interaction.channel.get_partial_message(sent.id)
+            
+            async def report_progress(job):
+                embed = self.build_purge_embed(job.amount, job.scanned, job.deleted, job.finished, job.cancelled)
+                if job.finished:
+                    logger.info(f"{job.deleted} messages cleared by {interaction.user}")
+                view = None if job.finished else cancel_view
+                await progress_message.edit(embed=embed, view=view)
+            
+            # Start paging before the progress message so it never deletes itself
+            job = self.purge_jobs.start_job(
+                interaction.channel,
+                amount,
+                interaction.user.id,
+                before=progress_message,
+                progress_callback=report_progress
+            )
+            cancel_view = PurgeCancelView(job)
+            await progress_message.edit(view=cancel_view)
+            if job.finished:
+                await report_progress(job)
             
         except Exception as e:
             logger.error(f"Error clearing messages: {e}")
             await interaction.followup.send("❌ حدث خطأ في حذف الرسائل")
+    
+    def build_purge_embed(self, amount: int, scanned: int, deleted: int, finished: bool, cancelled: bool):
+        """Build the progress embed for a purge job"""
+        if cancelled:
+            title, color = "⏹️ تم إيقاف الحذف", 0xffa500
+        elif finished:
+            title, color = "✅ اكتمل الحذف", 0x00ff00
+        else:
+            title, color = "🗑️ جاري حذف الرسائل...", 0x0099ff
+        
+        embed = discord.Embed(title=title, color=color)
+        embed.add_field(name="🗑️ تم حذفها", value=str(deleted), inline=True)
+        embed.add_field(name="🔍 تم فحصها", value=f"{scanned} / {amount}", inline=True)
+        return embed
 
 # ==================== CONSOLE COMMANDS ====================
 class ConsoleCommands(commands.Cog):
@@ -487,6 +977,10 @@ class PublishingCommands(commands.Cog):
         self.load_servers_data()
         self.load_user_cooldowns()
         
+        self.publication_log = PublicationLog(PUBLICATION_LOG_CONFIG['log_dir'])
+        self.migrate_published_servers()
+        self.publication_log.compact(PUBLICATION_LOG_CONFIG['retention_months'])
+        
         self.channel_mapping = {
             "avatar": "سيرفر-افتار",
             "server": "سيرفر",        
@@ -494,6 +988,19 @@ class PublishingCommands(commands.Cog):
         }
         
         self.publish_cooldown = 3600  # 1 hour in seconds
+        
+        self.invite_index = InviteIndex(
+            INVITE_INDEX_CONFIG['data_file'],
+            repost_window=INVITE_INDEX_CONFIG['repost_window']
+        )
+        self.pending_invites = set()
+        
+        self.publish_queue = PublishQueue(
+            self.deliver_publication,
+            bucket_size=PUBLISH_QUEUE_CONFIG['bucket_size'],
+            bucket_window=PUBLISH_QUEUE_CONFIG['bucket_window'],
+            idle_timeout=PUBLISH_QUEUE_CONFIG['idle_timeout']
+        )
     
     def load_servers_data(self):
         """Load servers data from JSON file"""
@@ -515,6 +1022,17 @@ class PublishingCommands(commands.Cog):
         except Exception as e:
             logger.error(f"Error saving servers data: {e}")
     
+    def migrate_published_servers(self):
+        """Move legacy published_servers lists out of servers_data into the publication log"""
+        migrated = False
+        for guild_id, guild_data in self.servers_data.items():
+            if 'published_servers' in guild_data:
+                self.publication_log.import_legacy(guild_id, guild_data.pop('published_servers'))
+                migrated = True
+        
+        if migrated:
+            self.save_servers_data()
+    
     def load_user_cooldowns(self):
         """Load user cooldowns from JSON file"""
         try:
@@ -589,34 +1107,10 @@ class PublishingCommands(commands.Cog):
     
     async def get_server_info_from_invite(self, invite_code: str):
         """Get server information from invite code"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                clean_invite = invite_code.strip().split('/')[-1].split('?')[0]
-                url = f"https://discord.com/api/v10/invites/{clean_invite}?with_counts=true"
-                
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-                
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        guild_info = data.get('guild', {})
-                        
-                        logger.info(f"Successfully fetched server info for: {guild_info.get('name', 'Unknown')}")
-                        
-                        return {
-                            'name': guild_info.get('name'),
-                            'icon': guild_info.get('icon'),
-                            'member_count': data.get('approximate_member_count', 0),
-                            'online_count': data.get('approximate_presence_count', 0),
-                            'guild_id': guild_info.get('id')
-                        }
-                    else:
-                        logger.warning(f"Failed to fetch server info, status: {response.status}")
-        except Exception as e:
-            logger.error(f"Error fetching server info: {e}")
-        return None
+        server_info = await self.bot.invite_client.get_server_info(invite_code)
+        if server_info:
+            logger.info(f"Successfully fetched server info for: {server_info.get('name') or 'Unknown'}")
+        return server_info
 
     @app_commands.command(name="setup_promotion", description="إعداد نظام نشر السيرفرات")
     @app_commands.describe(channel="القناة التي ستحتوي على قائمة نشر السيرفرات")
@@ -710,12 +1204,74 @@ class PublishingCommands(commands.Cog):
                 await interaction.followup.send("❌ لم يتم العثور على القناة", ephemeral=True)
                 return
             
-            # Get server information from invite link
+            # Reject duplicates from the local index before any HTTP call is made
             invite_code = self.extract_server_id_from_invite(server_link)
+            if invite_code:
+                if invite_code in self.pending_invites:
+                    await interaction.followup.send("❌ هذا السيرفر في قائمة انتظار النشر بالفعل", ephemeral=True)
+                    return
+                
+                repost_remaining = self.invite_index.check_code(invite_code)
+                if repost_remaining:
+                    await self.send_duplicate_notice(interaction, repost_remaining)
+                    return
+                
+                self.pending_invites.add(invite_code)
+            
+            # Reserve the cooldown now so the user can't queue twice while waiting
+            self.update_user_cooldown(user_id, int(guild_id))
+            
+            job = PublishJob(interaction, channel, server_link, server_type)
+            job.invite_code = invite_code
+            position = self.publish_queue.enqueue(job)
+            
+            embed = discord.Embed(
+                title="⏳ تم استلام طلب النشر",
+                description=f"طلبك في قائمة الانتظار لقناة {channel.mention}",
+                color=0x0099ff
+            )
+            embed.add_field(name="📍 ترتيبك", value=str(position), inline=True)
+            embed.set_footer(text="Qren Share System")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            
+        except Exception as e:
+            logger.error(f"Error publishing server: {e}")
+            await interaction.followup.send("❌ حدث خطأ أثناء نشر السيرفر", ephemeral=True)
+
+    async def deliver_publication(self, job: PublishJob):
+        """Send a queued publication to its channel (runs in the channel's queue worker)"""
+        try:
+            await self._deliver_publication(job)
+        finally:
+            self.pending_invites.discard(job.invite_code)
+    
+    async def _deliver_publication(self, job: PublishJob):
+        interaction = job.interaction
+        channel = job.channel
+        server_link = job.server_link
+        server_type = job.server_type
+        guild_id = str(interaction.guild.id)
+        user_id = interaction.user.id
+        sent = False
+        
+        try:
+            # Get server information from invite link
+            invite_code = job.invite_code
             server_info = None
             if invite_code:
                 server_info = await self.get_server_info_from_invite(invite_code)
             
+            # A different invite may still point at a server published recently
+            resolved_guild_id = server_info.get('guild_id') if server_info else None
+            if invite_code and resolved_guild_id:
+                self.invite_index.remember(invite_code, resolved_guild_id)
+                repost_remaining = self.invite_index.remaining(resolved_guild_id)
+                if repost_remaining:
+                    self.user_cooldowns.pop(f"{guild_id}_{user_id}", None)
+                    self.save_user_cooldowns()
+                    await self.send_duplicate_notice(interaction, repost_remaining)
+                    return
+            
             # Create server promotion embed
             embed = discord.Embed(
                 title="سيرفر جديد",
@@ -772,6 +1328,10 @@ class PublishingCommands(commands.Cog):
             
             # Send to the appropriate channel
             await channel.send(embed=embed)
+            sent = True
+            
+            if invite_code:
+                self.invite_index.record(invite_code, resolved_guild_id)
             
             # Save server publishing data
             server_publish_data = {
@@ -779,17 +1339,10 @@ class PublishingCommands(commands.Cog):
                 "type": server_type,
                 "publisher": str(interaction.user.id),
                 "published_at": datetime.now().isoformat(),
-                "channel_id": channel_id
+                "channel_id": channel.id
             }
             
-            if 'published_servers' not in self.servers_data[guild_id]:
-                self.servers_data[guild_id]['published_servers'] = []
-            
-            self.servers_data[guild_id]['published_servers'].append(server_publish_data)
-            self.save_servers_data()
-            
-            # Update user cooldown after successful publish
-            self.update_user_cooldown(user_id, int(guild_id))
+            self.publication_log.append(guild_id, server_publish_data)
             
             embed = discord.Embed(
                 title="✅ تم نشر السيرفر بنجاح",
@@ -805,9 +1358,23 @@ class PublishingCommands(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             
         except Exception as e:
-            logger.error(f"Error publishing server: {e}")
+            logger.error(f"Error delivering publication: {e}")
+            if not sent:
+                # The post never went out, so give the user their slot back
+                self.user_cooldowns.pop(f"{guild_id}_{user_id}", None)
+                self.save_user_cooldowns()
             await interaction.followup.send("❌ حدث خطأ أثناء نشر السيرفر", ephemeral=True)
 
+    async def send_duplicate_notice(self, interaction: discord.Interaction, remaining_seconds: int):
+        """Tell the user this server was already published recently"""
+        embed = discord.Embed(
+            title="🔁 سيرفر منشور مسبقاً",
+            description=f"تم نشر هذا السيرفر مؤخراً.\nيمكن نشره مرة أخرى بعد **{self.format_time_remaining(remaining_seconds)}**.",
+            color=0xff6b6b
+        )
+        embed.set_footer(text="Qren Share System")
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
     @app_commands.command(name="setup_channels", description="إعداد قنوات نشر السيرفرات حسب النوع")
     @app_commands.describe(
         avatar_channel="قناة سيرفرات الافتار",
@@ -858,19 +1425,13 @@ class PublishingCommands(commands.Cog):
         
         try:
             guild_id = str(interaction.guild.id)
+            counts = self.publication_log.get_counts(guild_id)
             
-            if guild_id not in self.servers_data or 'published_servers' not in self.servers_data[guild_id]:
+            if not counts:
                 await interaction.response.send_message("📊 لا توجد إحصائيات متاحة", ephemeral=True)
                 return
             
-            servers = self.servers_data[guild_id]['published_servers']
-            
-            # Count by type
-            stats = {"avatar": 0, "server": 0, "store": 0}
-            for server in servers:
-                server_type = server.get('type', 'server')
-                if server_type in stats:
-                    stats[server_type] += 1
+            stats = {server_type: counts.get(server_type, 0) for server_type in ("avatar", "server", "store")}
             
             embed = discord.Embed(
                 title="📊 إحصائيات السيرفرات المنشورة",
@@ -880,7 +1441,7 @@ class PublishingCommands(commands.Cog):
             embed.add_field(name="🖼️ سيرفرات الافتار", value=str(stats['avatar']), inline=True)
             embed.add_field(name="🏠 السيرفرات العامة", value=str(stats['server']), inline=True) 
             embed.add_field(name="🛒 المتاجر", value=str(stats['store']), inline=True)
-            embed.add_field(name="📈 المجموع", value=str(len(servers)), inline=False)
+            embed.add_field(name="📈 المجموع", value=str(sum(counts.values())), inline=False)
             
             embed.set_footer(text="Qren Share System")
             
@@ -1015,952 +1576,3 @@ class PublishingCommands(commands.Cog):
         except Exception as e:
             logger.error(f"Error resetting cooldown: {e}")
             await interaction.response.send_message("❌ حدث خطأ أثناء إعادة تعيين الانتظار", ephemeral=True)
-
-# ==================== TAG SEARCH COMMANDS ====================
-class TagSearchCommands(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.cooldown_file = "search_cooldowns.json"
-        self.load_cooldowns()
-    
-    def load_cooldowns(self):
-        """Load cooldown data from file"""
-        try:
-            if os.path.exists(self.cooldown_file):
-                with open(self.cooldown_file, 'r', encoding='utf-8') as f:
-                    self.cooldowns = json.load(f)
-            else:
-                self.cooldowns = {}
-        except:
-            self.cooldowns = {}
-    
-    def save_cooldowns(self):
-        """Save cooldown data to file"""
-        try:
-            with open(self.cooldown_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cooldowns, f, ensure_ascii=False, indent=2)
-        except:
-            pass
-    
-    def check_cooldown(self, user_id):
-        """Check if user is on cooldown"""
-        user_id_str = str(user_id)
-        if user_id_str not in self.cooldowns:
-            return False, 0
-        
-        last_search = datetime.fromisoformat(self.cooldowns[user_id_str])
-        now = datetime.now()
-        time_diff = now - last_search
-        
-        if time_diff < timedelta(minutes=5):
-            remaining = timedelta(minutes=5) - time_diff
-            return True, remaining.total_seconds()
-        
-        return False, 0
-    
-    def set_cooldown(self, user_id):
-        """Set cooldown for user"""
-        self.cooldowns[str(user_id)] = datetime.now().isoformat()
-        self.save_cooldowns()
-
-    @app_commands.command(name="بحث", description="البحث عن تاق معين والحصول على روابط السيرفرات")
-    @app_commands.describe(tag="التاق المراد البحث عنه")
-    async def search_tag(self, interaction: discord.Interaction, tag: str):
-        """Search for a tag and return all server links that have this tag"""
-        try:
-            # Check cooldown
-            on_cooldown, remaining_seconds = self.check_cooldown(interaction.user.id)
-            
-            if on_cooldown:
-                remaining_minutes = int(remaining_seconds // 60)
-                remaining_secs = int(remaining_seconds % 60)
-                
-                embed = discord.Embed(
-                    title="انتظر قليلاً",
-                    description=f"يمكنك البحث مرة واحدة كل 5 دقائق\n\n**الوقت المتبقي:** {remaining_minutes} دقيقة و {remaining_secs} ثانية",
-                    color=0xff6b6b
-                )
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-                return
-            
-            await interaction.response.defer()
-            
-            tag = tag.strip()
-            if not tag:
-                await interaction.followup.send("الرجاء إدخال تاق للبحث", ephemeral=True)
-                return
-            
-            # Set cooldown for user
-            self.set_cooldown(interaction.user.id)
-            
-            # Search in stored tags data
-            search_results = []
-            
-            if hasattr(self.bot, 'tags_data') and self.bot.tags_data:
-                for server_id, server_data in self.bot.tags_data.items():
-                    if "tags" in server_data and isinstance(server_data["tags"], list):
-                        for tag_entry in server_data["tags"]:
-                            entry_tag = tag_entry.get("tag", "").lower().strip()
-                            search_tag = tag.lower().strip()
-                            
-                            if search_tag in entry_tag or entry_tag == search_tag:
-                                search_results.append({
-                                    "tag": tag_entry.get("tag", ""),
-                                    "server_link": tag_entry.get("server_link", ""),
-                                    "server_name": tag_entry.get("server_name", "غير محدد"),
-                                    "description": tag_entry.get("description", ""),
-                                    "added_by": tag_entry.get("added_by", "غير معروف")
-                                })
-            
-            # Add popular servers for common tags
-            popular_servers = {
-                'gaming': 'https://discord.gg/gaming',
-                'anime': 'https://discord.gg/anime',
-                'music': 'https://discord.gg/music',
-                'arabic': 'https://discord.gg/arabic',
-                'art': 'https://discord.gg/art',
-                'chat': 'https://discord.gg/chat',
-                'minecraft': 'https://discord.gg/minecraft',
-                'valorant': 'https://discord.gg/valorant'
-            }
-            
-            tag_lower = tag.lower()
-            for popular_tag, link in popular_servers.items():
-                if tag_lower == popular_tag or tag_lower in popular_tag:
-                    search_results.append({
-                        "tag": tag,
-                        "server_link": link,
-                        "server_name": f"{popular_tag.title()} Community",
-                        "description": "سيرفر شائع ومشهور",
-                        "added_by": "النظام"
-                    })
-            
-            if not search_results:
-                embed = discord.Embed(
-                    title="نتائج البحث",
-                    description=f"لم أجد سيرفرات للتاق: `{tag}`\n\n💡 جرب تاقات شائعة مثل: gaming, anime, music, arabic, art",
-                    color=0xff6b6b
-                )
-                await interaction.followup.send(embed=embed, ephemeral=True)
-                return
-            
-            # Remove duplicates
-            unique_results = []
-            seen_links = set()
-            for result in search_results:
-                if result['server_link'] not in seen_links:
-                    unique_results.append(result)
-                    seen_links.add(result['server_link'])
-            
-            embed = discord.Embed(
-                title="نتائج البحث",
-                description=f"تم العثور على **{len(unique_results)} سيرفر** للتاق: `{tag}`",
-                color=0x00ff00
-            )
-            
-            # Show up to 8 results
-            for i, result in enumerate(unique_results[:8], 1):
-                server_name = result.get('server_name', 'سيرفر غير محدد')
-                server_link = result.get('server_link', '')
-                description = result.get('description', '')
-                
-                field_value = f"**🔗 انضم الآن:** {server_link}\\n"
-                if description:
-                    field_value += f"**الوصف:** {description}\\n"
-                field_value += f"**أضافه:** {result.get('added_by', 'غير معروف')}"
-                
-                embed.add_field(
-                    name=f"{i}. {server_name}",
-                    value=field_value,
-                    inline=False
-                )
-            
-            embed.set_footer(text=f"إجمالي النتائج: {len(unique_results)} سيرفر")
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            
-        except Exception as e:
-            logger.error(f"Error in search_tag: {e}")
-            await interaction.followup.send("❌ حدث خطأ أثناء البحث عن التاق. الرجاء المحاولة مرة أخرى.", ephemeral=True)
-    
-    @app_commands.command(name="اضافة", description="إضافة تاق جديد مع رابط السيرفر")
-    @app_commands.describe(
-        tag="التاق المراد إضافته",
-        server_link="رابط السيرفر",
-        server_name="اسم السيرفر (اختياري)",
-        description="وصف السيرفر (اختياري)"
-    )
-    async def add_tag(self, interaction: discord.Interaction, tag: str, server_link: str, server_name: str | None = None, description: str | None = None):
-        """Add a new tag with server link and optional description"""
-        await interaction.response.defer()
-        
-        try:
-            # Clean and validate the tag
-            tag = tag.strip()
-            if len(tag) < 2:
-                await interaction.followup.send("❌ التاق يجب أن يكون على الأقل حرفين!")
-                return
-            
-            if len(tag) > 50:
-                await interaction.followup.send("❌ التاق طويل جداً! الحد الأقصى 50 حرف.")
-                return
-            
-            # Validate server link
-            if not (server_link.startswith("https://discord.gg/") or server_link.startswith("discord.gg/")):
-                embed = discord.Embed(
-                    title="❌ رابط غير صحيح",
-                    description="الرجاء إدخال رابط سيرفر Discord صحيح\\n\\n**أمثلة صحيحة:**\\n• `https://discord.gg/abc123`\\n• `discord.gg/abc123`",
-                    color=0xff6b6b
-                )
-                await interaction.followup.send(embed=embed)
-                return
-            
-            # Normalize the link
-            if not server_link.startswith("https://"):
-                server_link = "https://" + server_link
-            
-            # Use global storage
-            global_server_id = "global_tags"
-            
-            # Initialize global entry if doesn't exist
-            if global_server_id not in self.bot.tags_data:
-                self.bot.tags_data[global_server_id] = {
-                    "server_name": "Global Tags Database",
-                    "tags": []
-                }
-            
-            # Check if this exact server link already has this tag
-            existing_entry = None
-            for tag_entry in self.bot.tags_data[global_server_id]["tags"]:
-                if tag_entry["server_link"] == server_link and tag_entry["tag"].lower() == tag.lower():
-                    existing_entry = tag_entry
-                    break
-            
-            if existing_entry:
-                await interaction.followup.send(f"❌ هذا السيرفر يحتوي بالفعل على التاق: `{existing_entry['tag']}`")
-                return
-            
-            # Add new tag
-            new_tag = {
-                "tag": tag,
-                "server_link": server_link,
-                "server_name": server_name or "غير محدد",
-                "description": description or "",
-                "added_by": str(interaction.user.id),
-                "added_at": datetime.now().isoformat(),
-                "added_from_guild": str(interaction.guild_id) if interaction.guild else "DM"
-            }
-            
-            self.bot.tags_data[global_server_id]["tags"].append(new_tag)
-            self.bot.save_tags_data()
-            
-            embed = discord.Embed(
-                title="✅ تم إضافة التاق بنجاح",
-                description="تم حفظ التاق في قاعدة البيانات وأصبح متاح للبحث",
-                color=0x57f287
-            )
-            embed.add_field(name="🏷️ التاق", value=f"`{tag}`", inline=True)
-            embed.add_field(name="🌐 اسم السيرفر", value=server_name or "غير محدد", inline=True)
-            embed.add_field(name="👤 أضافه", value=interaction.user.mention, inline=True)
-            embed.add_field(name="🔗 رابط السيرفر", value=f"[انضم للسيرفر]({server_link})", inline=False)
-            
-            if description:
-                embed.add_field(name="📝 الوصف", value=description, inline=False)
-                
-            embed.set_footer(text=f"يمكن البحث عن هذا التاق باستخدام: /بحث {tag}")
-            embed.timestamp = datetime.now()
-            
-            await interaction.followup.send(embed=embed)
-            
-        except Exception as e:
-            logger.error(f"Error in add_tag: {e}")
-            await interaction.followup.send("❌ حدث خطأ أثناء إضافة التاق. الرجاء المحاولة مرة أخرى.")
-    
-    @app_commands.command(name="حذف", description="حذف تاق موجود")
-    @app_commands.describe(
-        tag="التاق المراد حذفه",
-        server_link="رابط السيرفر (اختياري للتحديد الدقيق)"
-    )
-    async def remove_tag(self, interaction: discord.Interaction, tag: str, server_link: str | None = None):
-        """Remove an existing tag"""
-        await interaction.response.defer()
-        
-        try:
-            global_server_id = "global_tags"
-            
-            if global_server_id not in self.bot.tags_data or not self.bot.tags_data[global_server_id]["tags"]:
-                await interaction.followup.send("❌ لا توجد تاقات مسجلة في قاعدة البيانات.")
-                return
-            
-            # Find matching tags
-            tags_list = self.bot.tags_data[global_server_id]["tags"]
-            matching_tags = []
-            
-            for tag_entry in tags_list:
-                if tag_entry["tag"].lower() == tag.lower():
-                    if server_link is None or tag_entry["server_link"] == server_link:
-                        matching_tags.append(tag_entry)
-            
-            if not matching_tags:
-                await interaction.followup.send(f"❌ لم يتم العثور على التاق: `{tag}`")
-                return
-            
-            # Check permissions
-            member = interaction.guild.get_member(interaction.user.id) if interaction.guild else None
-            is_admin = member.guild_permissions.administrator if member else False
-            user_id = str(interaction.user.id)
-            
-            # Filter tags that user can delete
-            deletable_tags = []
-            for tag_entry in matching_tags:
-                if is_admin or tag_entry["added_by"] == user_id:
-                    deletable_tags.append(tag_entry)
-            
-            if not deletable_tags:
-                await interaction.followup.send("❌ يمكنك حذف التاقات التي أضفتها أنت فقط، أو كن أدمن لحذف أي تاق.")
-                return
-            
-            # If multiple matches and no specific server_link provided, show options
-            if len(deletable_tags) > 1 and server_link is None:
-                embed = discord.Embed(
-                    title="🔍 عدة نتائج للتاق",
-                    description=f"تم العثور على {len(deletable_tags)} سيرفر يحتوي على التاق `{tag}`\\n\\nحدد السيرفر المراد حذف التاق منه:",
-                    color=0xffa500
-                )
-                
-                for i, tag_entry in enumerate(deletable_tags[:10], 1):
-                    embed.add_field(
-                        name=f"{i}. {tag_entry['server_name']}",
-                        value=f"**الرابط:** {tag_entry['server_link']}\\n**أضافه:** <@{tag_entry['added_by']}>",
-                        inline=False
-                    )
-                
-                embed.set_footer(text="استخدم الأمر مع تحديد رابط السيرفر: /حذف تاق [التاق] [رابط_السيرفر]")
-                await interaction.followup.send(embed=embed)
-                return
-            
-            # Remove the tag(s)
-            removed_count = 0
-            for tag_entry in deletable_tags:
-                if tag_entry in tags_list:
-                    tags_list.remove(tag_entry)
-                    removed_count += 1
-            
-            self.bot.save_tags_data()
-            
-            embed = discord.Embed(
-                title="🗑️ تم حذف التاق بنجاح",
-                description=f"تم حذف {removed_count} تاق بالاسم: `{tag}`",
-                color=0xff6b6b
-            )
-            
-            if removed_count == 1:
-                deleted_tag = deletable_tags[0]
-                embed.add_field(name="السيرفر", value=deleted_tag['server_name'], inline=True)
-                embed.add_field(name="الرابط", value=deleted_tag['server_link'], inline=True)
-            
-            embed.add_field(name="حذفه", value=interaction.user.mention, inline=True)
-            embed.timestamp = datetime.now()
-            
-            await interaction.followup.send(embed=embed)
-            
-        except Exception as e:
-            logger.error(f"Error in remove_tag: {e}")
-            await interaction.followup.send("❌ حدث خطأ أثناء حذف التاق.")
-    
-    @app_commands.command(name="قائمة", description="عرض جميع التاقات المتاحة")
-    @app_commands.describe(
-        filter_tag="فلترة التاقات (اختياري)",
-        show_my_tags="عرض التاقات التي أضفتها أنت فقط"
-    )
-    async def list_tags(self, interaction: discord.Interaction, filter_tag: str | None = None, show_my_tags: bool = False):
-        """List all available tags with optional filtering"""
-        await interaction.response.defer()
-        
-        try:
-            global_server_id = "global_tags"
-            
-            if global_server_id not in self.bot.tags_data or not self.bot.tags_data[global_server_id]["tags"]:
-                embed = discord.Embed(
-                    title="📋 قائمة التاقات",
-                    description="لا توجد تاقات مسجلة في قاعدة البيانات.\\n\\n💡 استخدم `/اضافة` لإضافة تاق جديد!",
-                    color=0xffa500
-                )
-                await interaction.followup.send(embed=embed)
-                return
-            
-            tags_list = self.bot.tags_data[global_server_id]["tags"]
-            
-            # Apply filters
-            filtered_tags = []
-            user_id = str(interaction.user.id)
-            
-            for tag_entry in tags_list:
-                # Filter by user if requested
-                if show_my_tags and tag_entry.get("added_by") != user_id:
-                    continue
-                
-                # Filter by tag text if provided
-                if filter_tag and filter_tag.lower() not in tag_entry["tag"].lower():
-                    continue
-                
-                filtered_tags.append(tag_entry)
-            
-            if not filtered_tags:
-                filter_desc = ""
-                if show_my_tags:
-                    filter_desc += "التي أضفتها أنت "
-                if filter_tag:
-                    filter_desc += f"التي تحتوي على '{filter_tag}' "
-                
-                embed = discord.Embed(
-                    title="📋 قائمة التاقات",
-                    description=f"لا توجد تاقات {filter_desc}في قاعدة البيانات.",
-                    color=0xffa500
-                )
-                await interaction.followup.send(embed=embed)
-                return
-            
-            # Create pages for tags
-            tags_per_page = 10
-            total_pages = (len(filtered_tags) + tags_per_page - 1) // tags_per_page
-            
-            embed = discord.Embed(
-                title="📋 قائمة التاقات المتاحة",
-                description=f"إجمالي التاقات: **{len(filtered_tags)}** تاق",
-                color=0x57f287
-            )
-            
-            # Show first page
-            page_tags = filtered_tags[:tags_per_page]
-            for i, tag_entry in enumerate(page_tags, 1):
-                tag_name = tag_entry.get("tag", "غير محدد")
-                server_name = tag_entry.get("server_name", "غير محدد")
-                added_by = tag_entry.get("added_by", "غير معروف")
-                
-                embed.add_field(
-                    name=f"{i}. `{tag_name}`",
-                    value=f"**السيرفر:** {server_name}\\n**أضافه:** <@{added_by}>",
-                    inline=True
-                )
-            
-            if total_pages > 1:
-                embed.set_footer(text=f"الصفحة 1 من {total_pages} • استخدم /قائمة مع الفلترة لتحديد البحث")
-            else:
-                embed.set_footer(text=f"مجموع التاقات: {len(filtered_tags)}")
-            
-            await interaction.followup.send(embed=embed)
-            
-        except Exception as e:
-            logger.error(f"Error in list_tags: {e}")
-            await interaction.followup.send("❌ حدث خطأ أثناء عرض قائمة التاقات.")
-
-    @app_commands.command(name="setup_tag_search", description="إعداد نظام البحث بالتاقات")
-    @app_commands.describe(channel="القناة التي ستحتوي على نظام البحث")
-    async def setup_tag_search(self, interaction: discord.Interaction, channel: discord.TextChannel):
-        """Setup the tag search system"""
-        if not interaction.guild or not isinstance(interaction.user, discord.Member) or not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط", ephemeral=True)
-            return
-        
-        try:
-            from utils.button_views import TagSearchView
-            
-            embed = discord.Embed(
-                title="🔍 نظام البحث بالتاقات",
-                description="استخدم الأزرار أدناه للبحث عن السيرفرات أو إضافة تاقات جديدة",
-                color=0x0099ff
-            )
-            
-            embed.add_field(
-                name="🔍 البحث عن تاق",
-                value="ابحث عن سيرفرات باستخدام التاقات",
-                inline=True
-            )
-            
-            embed.add_field(
-                name="➕ إضافة تاق",
-                value="أضف تاق جديد لسيرفر",
-                inline=True
-            )
-            
-            embed.set_footer(text="Qren Tag Search System")
-            
-            view = TagSearchView(self.bot)
-            message = await channel.send(embed=embed, view=view)
-            
-            await interaction.response.send_message(f"✅ تم إعداد نظام البحث بالتاقات في {channel.mention}", ephemeral=True)
-            
-        except Exception as e:
-            logger.error(f"Error setting up tag search: {e}")
-            await interaction.response.send_message("❌ حدث خطأ أثناء إعداد النظام", ephemeral=True)
-    
-    def load_cooldowns(self):
-        """Load cooldown data from file"""
-        try:
-            if os.path.exists(self.cooldown_file):
-                with open(self.cooldown_file, 'r', encoding='utf-8') as f:
-                    self.cooldowns = json.load(f)
-            else:
-                self.cooldowns = {}
-        except:
-            self.cooldowns = {}
-    
-    def save_cooldowns(self):
-        """Save cooldown data to file"""
-        try:
-            with open(self.cooldown_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cooldowns, f, ensure_ascii=False, indent=2)
-        except:
-            pass
-    
-    def check_cooldown(self, user_id):
-        """Check if user is on cooldown"""
-        user_id_str = str(user_id)
-        if user_id_str not in self.cooldowns:
-            return False, 0
-        
-        last_search = datetime.fromisoformat(self.cooldowns[user_id_str])
-        now = datetime.now()
-        time_diff = now - last_search
-        
-        if time_diff < timedelta(minutes=5):
-            remaining = timedelta(minutes=5) - time_diff
-            return True, remaining.total_seconds()
-        
-        return False, 0
-    
-    def set_cooldown(self, user_id):
-        """Set cooldown for user"""
-        self.cooldowns[str(user_id)] = datetime.now().isoformat()
-        self.save_cooldowns()
-
-    @app_commands.command(name="بحث", description="البحث عن تاق معين والحصول على روابط السيرفرات")
-    @app_commands.describe(tag="التاق المراد البحث عنه")
-    async def search_tag(self, interaction: discord.Interaction, tag: str):
-        """Search for a tag and return all server links that have this tag"""
-        try:
-            # Check cooldown
-            on_cooldown, remaining_seconds = self.check_cooldown(interaction.user.id)
-            
-            if on_cooldown:
-                remaining_minutes = int(remaining_seconds // 60)
-                remaining_secs = int(remaining_seconds % 60)
-                
-                embed = discord.Embed(
-                    title="انتظر قليلاً",
-                    description=f"يمكنك البحث مرة واحدة كل 5 دقائق\n\n**الوقت المتبقي:** {remaining_minutes} دقيقة و {remaining_secs} ثانية",
-                    color=0xff6b6b
-                )
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-                return
-            
-            await interaction.response.defer()
-            
-            tag = tag.strip()
-            if not tag:
-                await interaction.followup.send("الرجاء إدخال تاق للبحث", ephemeral=True)
-                return
-            
-            # Set cooldown for user
-            self.set_cooldown(interaction.user.id)
-            
-            # Search in stored tags data
-            search_results = []
-            
-            if hasattr(self.bot, 'tags_data') and self.bot.tags_data:
-                for server_id, server_data in self.bot.tags_data.items():
-                    if "tags" in server_data and isinstance(server_data["tags"], list):
-                        for tag_entry in server_data["tags"]:
-                            entry_tag = tag_entry.get("tag", "").lower().strip()
-                            search_tag = tag.lower().strip()
-                            
-                            if search_tag in entry_tag or entry_tag == search_tag:
-                                search_results.append({
-                                    "tag": tag_entry.get("tag", ""),
-                                    "server_link": tag_entry.get("server_link", ""),
-                                    "server_name": tag_entry.get("server_name", "غير محدد"),
-                                    "description": tag_entry.get("description", ""),
-                                    "added_by": tag_entry.get("added_by", "غير معروف")
-                                })
-            
-            # Add popular servers for common tags
-            popular_servers = {
-                'gaming': 'https://discord.gg/gaming',
-                'anime': 'https://discord.gg/anime',
-                'music': 'https://discord.gg/music',
-                'arabic': 'https://discord.gg/arabic',
-                'art': 'https://discord.gg/art',
-                'chat': 'https://discord.gg/chat',
-                'minecraft': 'https://discord.gg/minecraft',
-                'valorant': 'https://discord.gg/valorant'
-            }
-            
-            tag_lower = tag.lower()
-            for popular_tag, link in popular_servers.items():
-                if tag_lower == popular_tag or tag_lower in popular_tag:
-                    search_results.append({
-                        "tag": tag,
-                        "server_link": link,
-                        "server_name": f"{popular_tag.title()} Community",
-                        "description": "سيرفر شائع ومشهور",
-                        "added_by": "النظام"
-                    })
-            
-            if not search_results:
-                embed = discord.Embed(
-                    title="نتائج البحث",
-                    description=f"لم أجد سيرفرات للتاق: `{tag}`\n\n💡 جرب تاقات شائعة مثل: gaming, anime, music, arabic, art",
-                    color=0xff6b6b
-                )
-                await interaction.followup.send(embed=embed, ephemeral=True)
-                return
-            
-            # Remove duplicates
-            unique_results = []
-            seen_links = set()
-            for result in search_results:
-                if result['server_link'] not in seen_links:
-                    unique_results.append(result)
-                    seen_links.add(result['server_link'])
-            
-            embed = discord.Embed(
-                title="نتائج البحث",
-                description=f"تم العثور على **{len(unique_results)} سيرفر** للتاق: `{tag}`",
-                color=0x00ff00
-            )
-            
-            # Show up to 8 results
-            for i, result in enumerate(unique_results[:8], 1):
-                server_name = result.get('server_name', 'سيرفر غير محدد')
-                server_link = result.get('server_link', '')
-                description = result.get('description', '')
-                
-                field_value = f"**🔗 انضم الآن:** {server_link}\n"
-                if description:
-                    field_value += f"**الوصف:** {description}\n"
-                field_value += f"**أضافه:** {result.get('added_by', 'غير معروف')}"
-                
-                embed.add_field(
-                    name=f"{i}. {server_name}",
-                    value=field_value,
-                    inline=False
-                )
-            
-            embed.set_footer(text=f"إجمالي النتائج: {len(unique_results)} سيرفر")
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            
-        except Exception as e:
-            logger.error(f"Error in search_tag: {e}")
-            await interaction.followup.send("❌ حدث خطأ أثناء البحث عن التاق. الرجاء المحاولة مرة أخرى.", ephemeral=True)
-    
-    @app_commands.command(name="اضافة", description="إضافة تاق جديد مع رابط السيرفر")
-    @app_commands.describe(
-        tag="التاق المراد إضافته",
-        server_link="رابط السيرفر",
-        server_name="اسم السيرفر (اختياري)",
-        description="وصف السيرفر (اختياري)"
-    )
-    async def add_tag(self, interaction: discord.Interaction, tag: str, server_link: str, server_name: str | None = None, description: str | None = None):
-        """Add a new tag with server link and optional description"""
-        await interaction.response.defer()
-        
-        try:
-            # Clean and validate the tag
-            tag = tag.strip()
-            if len(tag) < 2:
-                await interaction.followup.send("❌ التاق يجب أن يكون على الأقل حرفين!")
-                return
-            
-            if len(tag) > 50:
-                await interaction.followup.send("❌ التاق طويل جداً! الحد الأقصى 50 حرف.")
-                return
-            
-            # Validate server link
-            if not (server_link.startswith("https://discord.gg/") or server_link.startswith("discord.gg/")):
-                embed = discord.Embed(
-                    title="❌ رابط غير صحيح",
-                    description="الرجاء إدخال رابط سيرفر Discord صحيح\n\n**أمثلة صحيحة:**\n• `https://discord.gg/abc123`\n• `discord.gg/abc123`",
-                    color=0xff6b6b
-                )
-                await interaction.followup.send(embed=embed)
-                return
-            
-            # Normalize the link
-            if not server_link.startswith("https://"):
-                server_link = "https://" + server_link
-            
-            # Use global storage
-            global_server_id = "global_tags"
-            
-            # Initialize global entry if doesn't exist
-            if global_server_id not in self.bot.tags_data:
-                self.bot.tags_data[global_server_id] = {
-                    "server_name": "Global Tags Database",
-                    "tags": []
-                }
-            
-            # Check if this exact server link already has this tag
-            existing_entry = None
-            for tag_entry in self.bot.tags_data[global_server_id]["tags"]:
-                if tag_entry["server_link"] == server_link and tag_entry["tag"].lower() == tag.lower():
-                    existing_entry = tag_entry
-                    break
-            
-            if existing_entry:
-                await interaction.followup.send(f"❌ هذا السيرفر يحتوي بالفعل على التاق: `{existing_entry['tag']}`")
-                return
-            
-            # Add new tag
-            new_tag = {
-                "tag": tag,
-                "server_link": server_link,
-                "server_name": server_name or "غير محدد",
-                "description": description or "",
-                "added_by": str(interaction.user.id),
-                "added_at": datetime.now().isoformat(),
-                "added_from_guild": str(interaction.guild_id) if interaction.guild else "DM"
-            }
-            
-            self.bot.tags_data[global_server_id]["tags"].append(new_tag)
-            self.bot.save_tags_data()
-            
-            embed = discord.Embed(
-                title="✅ تم إضافة التاق بنجاح",
-                description="تم حفظ التاق في قاعدة البيانات وأصبح متاح للبحث",
-                color=0x57f287
-            )
-            embed.add_field(name="🏷️ التاق", value=f"`{tag}`", inline=True)
-            embed.add_field(name="🌐 اسم السيرفر", value=server_name or "غير محدد", inline=True)
-            embed.add_field(name="👤 أضافه", value=interaction.user.mention, inline=True)
-            embed.add_field(name="🔗 رابط السيرفر", value=f"[انضم للسيرفر]({server_link})", inline=False)
-            
-            if description:
-                embed.add_field(name="📝 الوصف", value=description, inline=False)
-                
-            embed.set_footer(text=f"يمكن البحث عن هذا التاق باستخدام: /بحث {tag}")
-            embed.timestamp = datetime.now()
-            
-            await interaction.followup.send(embed=embed)
-            
-        except Exception as e:
-            logger.error(f"Error in add_tag: {e}")
-            await interaction.followup.send("❌ حدث خطأ أثناء إضافة التاق. الرجاء المحاولة مرة أخرى.")
-    
-    @app_commands.command(name="حذف", description="حذف تاق موجود")
-    @app_commands.describe(
-        tag="التاق المراد حذفه",
-        server_link="رابط السيرفر (اختياري للتحديد الدقيق)"
-    )
-    async def remove_tag(self, interaction: discord.Interaction, tag: str, server_link: str | None = None):
-        """Remove an existing tag"""
-        await interaction.response.defer()
-        
-        try:
-            global_server_id = "global_tags"
-            
-            if global_server_id not in self.bot.tags_data or not self.bot.tags_data[global_server_id]["tags"]:
-                await interaction.followup.send("❌ لا توجد تاقات مسجلة في قاعدة البيانات.")
-                return
-            
-            # Find matching tags
-            tags_list = self.bot.tags_data[global_server_id]["tags"]
-            matching_tags = []
-            
-            for tag_entry in tags_list:
-                if tag_entry["tag"].lower() == tag.lower():
-                    if server_link is None or tag_entry["server_link"] == server_link:
-                        matching_tags.append(tag_entry)
-            
-            if not matching_tags:
-                await interaction.followup.send(f"❌ لم يتم العثور على التاق: `{tag}`")
-                return
-            
-            # Check permissions
-            member = interaction.guild.get_member(interaction.user.id) if interaction.guild else None
-            is_admin = member.guild_permissions.administrator if member else False
-            user_id = str(interaction.user.id)
-            
-            # Filter tags that user can delete
-            deletable_tags = []
-            for tag_entry in matching_tags:
-                if is_admin or tag_entry["added_by"] == user_id:
-                    deletable_tags.append(tag_entry)
-            
-            if not deletable_tags:
-                await interaction.followup.send("❌ يمكنك حذف التاقات التي أضفتها أنت فقط، أو كن أدمن لحذف أي تاق.")
-                return
-            
-            # If multiple matches and no specific server_link provided, show options
-            if len(deletable_tags) > 1 and server_link is None:
-                embed = discord.Embed(
-                    title="🔍 عدة نتائج للتاق",
-                    description=f"تم العثور على {len(deletable_tags)} سيرفر يحتوي على التاق `{tag}`\n\nحدد السيرفر المراد حذف التاق منه:",
-                    color=0xffa500
-                )
-                
-                for i, tag_entry in enumerate(deletable_tags[:10], 1):
-                    embed.add_field(
-                        name=f"{i}. {tag_entry['server_name']}",
-                        value=f"**الرابط:** {tag_entry['server_link']}\n**أضافه:** <@{tag_entry['added_by']}>",
-                        inline=False
-                    )
-                
-                embed.set_footer(text="استخدم الأمر مع تحديد رابط السيرفر: /حذف تاق [التاق] [رابط_السيرفر]")
-                await interaction.followup.send(embed=embed)
-                return
-            
-            # Remove the tag(s)
-            removed_count = 0
-            for tag_entry in deletable_tags:
-                if tag_entry in tags_list:
-                    tags_list.remove(tag_entry)
-                    removed_count += 1
-            
-            self.bot.save_tags_data()
-            
-            embed = discord.Embed(
-                title="🗑️ تم حذف التاق بنجاح",
-                description=f"تم حذف {removed_count} تاق بالاسم: `{tag}`",
-                color=0xff6b6b
-            )
-            
-            if removed_count == 1:
-                deleted_tag = deletable_tags[0]
-                embed.add_field(name="السيرفر", value=deleted_tag['server_name'], inline=True)
-                embed.add_field(name="الرابط", value=deleted_tag['server_link'], inline=True)
-            
-            embed.add_field(name="حذفه", value=interaction.user.mention, inline=True)
-            embed.timestamp = datetime.now()
-            
-            await interaction.followup.send(embed=embed)
-            
-        except Exception as e:
-            logger.error(f"Error in remove_tag: {e}")
-            await interaction.followup.send("❌ حدث خطأ أثناء حذف التاق.")
-    
-    @app_commands.command(name="قائمة", description="عرض جميع التاقات المتاحة")
-    @app_commands.describe(
-        filter_tag="فلترة التاقات (اختياري)",
-        show_my_tags="عرض التاقات التي أضفتها أنت فقط"
-    )
-    async def list_tags(self, interaction: discord.Interaction, filter_tag: str | None = None, show_my_tags: bool = False):
-        """List all available tags with optional filtering"""
-        await interaction.response.defer()
-        
-        try:
-            global_server_id = "global_tags"
-            
-            if global_server_id not in self.bot.tags_data or not self.bot.tags_data[global_server_id]["tags"]:
-                embed = discord.Embed(
-                    title="📋 قائمة التاقات",
-                    description="لا توجد تاقات مسجلة في قاعدة البيانات.\n\n💡 استخدم `/اضافة` لإضافة تاق جديد!",
-                    color=0xffa500
-                )
-                await interaction.followup.send(embed=embed)
-                return
-            
-            tags_list = self.bot.tags_data[global_server_id]["tags"]
-            
-            # Apply filters
-            filtered_tags = []
-            user_id = str(interaction.user.id)
-            
-            for tag_entry in tags_list:
-                # Filter by user if requested
-                if show_my_tags and tag_entry.get("added_by") != user_id:
-                    continue
-                
-                # Filter by tag text if provided
-                if filter_tag and filter_tag.lower() not in tag_entry["tag"].lower():
-                    continue
-                
-                filtered_tags.append(tag_entry)
-            
-            if not filtered_tags:
-                filter_desc = ""
-                if show_my_tags:
-                    filter_desc += "التي أضفتها أنت "
-                if filter_tag:
-                    filter_desc += f"التي تحتوي على '{filter_tag}' "
-                
-                embed = discord.Embed(
-                    title="📋 قائمة التاقات",
-                    description=f"لا توجد تاقات {filter_desc}في قاعدة البيانات.",
-                    color=0xffa500
-                )
-                await interaction.followup.send(embed=embed)
-                return
-            
-            # Create pages for tags
-            tags_per_page = 10
-            total_pages = (len(filtered_tags) + tags_per_page - 1) // tags_per_page
-            
-            embed = discord.Embed(
-                title="📋 قائمة التاقات المتاحة",
-                description=f"إجمالي التاقات: **{len(filtered_tags)}** تاق",
-                color=0x57f287
-            )
-            
-            # Show first page
-            page_tags = filtered_tags[:tags_per_page]
-            for i, tag_entry in enumerate(page_tags, 1):
-                tag_name = tag_entry.get("tag", "غير محدد")
-                server_name = tag_entry.get("server_name", "غير محدد")
-                added_by = tag_entry.get("added_by", "غير معروف")
-                
-                embed.add_field(
-                    name=f"{i}. `{tag_name}`",
-                    value=f"**السيرفر:** {server_name}\n**أضافه:** <@{added_by}>",
-                    inline=True
-                )
-            
-            if total_pages > 1:
-                embed.set_footer(text=f"الصفحة 1 من {total_pages} • استخدم /قائمة مع الفلترة لتحديد البحث")
-            else:
-                embed.set_footer(text=f"مجموع التاقات: {len(filtered_tags)}")
-            
-            await interaction.followup.send(embed=embed)
-            
-        except Exception as e:
-            logger.error(f"Error in list_tags: {e}")
-            await interaction.followup.send("❌ حدث خطأ أثناء عرض قائمة التاقات.")
-
-    @app_commands.command(name="setup_tag_search", description="إعداد نظام البحث بالتاقات")
-    @app_commands.describe(channel="القناة التي ستحتوي على نظام البحث")
-    async def setup_tag_search(self, interaction: discord.Interaction, channel: discord.TextChannel):
-        """Setup the tag search system"""
-        if not interaction.guild or not isinstance(interaction.user, discord.Member) or not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message("❌ هذا الأمر متاح للإداريين فقط", ephemeral=True)
-            return
-        
-        try:
-            from utils.button_views import TagSearchView
-            
-            embed = discord.Embed(
-                title="🔍 نظام البحث بالتاقات",
-                description="استخدم الأزرار أدناه للبحث عن السيرفرات أو إضافة تاقات جديدة",
-                color=0x0099ff
-            )
-            
-            embed.add_field(
-                name="🔍 البحث عن تاق",
-                value="ابحث عن سيرفرات باستخدام التاقات",
-                inline=True
-            )
-            
-            embed.add_field(
-                name="➕ إضافة تاق",
-                value="أضف تاق جديد لسيرفر",
-                inline=True
-            )
-            
-            embed.set_footer(text="Qren Tag Search System")
-            
-            view = TagSearchView(self.bot)
-            message = await channel.send(embed=embed, view=view)
-            
-            await interaction.response.send_message(f"✅ تم إعداد نظام البحث بالتاقات في {channel.mention}", ephemeral=True)
-            
-        except Exception as e:
-            logger.error(f"Error setting up tag search: {e}")
-            await interaction.response.send_message("❌ حدث خطأ أثناء إعداد النظام", ephemeral=True)
\ No newline at end of file
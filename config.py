@@ -33,12 +33,147 @@ PATHS = {
     'log_file': 'bot.log'
 }
 
+# Avatar uploads are streamed to a temp file before moving into the blob store
+AVATAR_UPLOAD_CONFIG = {
+    'temp_dir': 'avatars/.incoming',
+    'max_bytes': BOT_CONFIG['max_file_size'],
+    'chunk_size': 64 * 1024,
+    'max_dimension': 4096,  # Longest side in pixels
+}
+
+# /bulk_upload_avatars
+AVATAR_INGEST_CONFIG = {
+    'concurrency': 4,  # Files downloaded and processed at once
+    'max_archive_bytes': 200 * 1024 * 1024,
+    'max_history_messages': 500,
+    'max_files': 500,  # Image entries accepted from one ZIP archive
+}
+
+# Optimized avatar variants (needs Pillow; disabled automatically without it)
+AVATAR_VARIANT_CONFIG = {
+    'workers': 2,
+    'sizes': [512, 1024],
+    'webp_quality': 90,
+    'send_min_px': 512,  # Smallest longest-side that is still sent to users
+}
+
+# /list_avatars gallery; thumbnail grids need Pillow
+AVATAR_GALLERY_CONFIG = {
+    'per_page': 10,
+    'thumbnails': True,
+    'thumb_size': 128,
+    'columns': 5,
+    'cache_dir': 'avatars/.gallery',
+    'max_cached_grids': 200,
+}
+
+# Background reconciliation of avatars/ with the avatar records
+AVATAR_INTEGRITY_CONFIG = {
+    'interval': 21600,  # Seconds between scans
+    'grace_seconds': 3600,  # Unreferenced files younger than this are left alone
+    'verify_budget': 64 * 1024 * 1024,  # Bytes re-hashed per scan (0 disables)
+}
+
+# Avatar download analytics (enabled by FEATURES['avatar_stats_tracking'])
+AVATAR_STATS_CONFIG = {
+    'data_file': 'avatar_stats.json',
+    'flush_interval': 60,  # Seconds between batched writes
+    'retention_days': 90,  # Per-day buckets kept
+    'hll_precision': 10,  # Unique-user sketch of 2^10 bytes per avatar
+}
+
+# Avatar button DMs go through one rate-limited queue
+DM_QUEUE_CONFIG = {
+    'rate': 2,  # Requests per second (DM channel creation and sends share it)
+    'burst': 5,
+    'workers': 3,
+    'max_pending': 200,  # Clicks beyond this are asked to retry later
+    'dm_cache_size': 1000,
+    'notify_position': 5,  # Tell users their queue position beyond this
+}
+
 # Rate limiting (optional - Discord handles most of this)
 RATE_LIMITS = {
     'commands_per_minute': 30,
     'dm_sends_per_minute': 10,
 }
 
+# Bulk /clear jobs
+PURGE_CONFIG = {
+    'max_amount': 10000,
+    'bulk_delete_max_age_days': 14,  # Discord rejects bulk deletes of older messages
+    'single_delete_delay': 1.2,  # Seconds between deletes in the old-message lane
+    'progress_interval': 3,  # Seconds between progress message edits
+}
+
+# Mass kick/ban
+MASS_MODERATION_CONFIG = {
+    'concurrency': 5,
+    'max_targets': 1000,
+}
+
+# Server publishing queue (Discord allows ~5 messages per 5s per channel)
+PUBLISH_QUEUE_CONFIG = {
+    'bucket_size': 5,
+    'bucket_window': 5,
+    'idle_timeout': 300,  # Seconds before an idle channel worker exits
+}
+
+# Published servers history
+PUBLICATION_LOG_CONFIG = {
+    'log_dir': 'publication_logs',
+    'retention_months': 12,  # Raw records older than this are compacted away; 0 keeps everything
+}
+
+# Duplicate publication detection
+INVITE_INDEX_CONFIG = {
+    'data_file': 'invite_index.json',
+    'repost_window': 24 * 3600,  # Seconds before the same server can be published again
+}
+
+# Background re-validation of tag invite links
+INVITE_VALIDATOR_CONFIG = {
+    'requests_per_second': 1,  # Shared budget for all invite lookups
+    'burst': 5,
+    'batch_size': 50,  # Distinct links per pass
+    'interval': 600,  # Seconds between passes
+    'recheck_after': 24 * 3600,  # Seconds before a link is checked again
+    'max_failures': 3,  # Consecutive "Unknown Invite" results before pruning
+    'prune_dead': True,
+}
+
+# Tag listing and per-user limits
+TAG_LIST_CONFIG = {
+    'per_page': 10,
+    'session_ttl': 120,  # Seconds a filtered result set is reused while paging
+    'max_tags_per_user': 200,  # Admins are exempt
+}
+
+# Tag storage: mutations are journaled and folded into the snapshot periodically
+TAG_STORE_CONFIG = {
+    'journal_file': 'tags_journal.jsonl',
+    'compact_after': 500,  # Journaled operations before the snapshot is rewritten
+}
+
+# Cached /بحث results, invalidated whenever the tag store changes
+SEARCH_CACHE_CONFIG = {
+    'max_entries': 256,
+    'ttl': 600,  # Seconds
+}
+
+# Tag parameter autocomplete for /بحث and /حذف
+TAG_AUTOCOMPLETE_CONFIG = {
+    'max_choices': 25,  # Discord's limit
+    'scan_limit': 2000,  # Keys weighed per keystroke
+}
+
+# Admin tag import/export (NDJSON or CSV attachments)
+TAG_TRANSFER_CONFIG = {
+    'batch_size': 500,  # Rows validated between yields to the event loop
+    'max_import_bytes': 25 * 1024 * 1024,
+    'max_reported_errors': 10,
+}
+
 # Environment variables with defaults
 def get_env_var(key: str, default=None):
     """Get environment variable with optional default"""
@@ -22,6 +22,10 @@ setup(
         "requests==2.31.0",
         "trafilatura==1.8.0"
     ],
+    extras_require={
+        "bench": ["pytest", "pytest-benchmark"],
+        "images": ["Pillow"],
+    },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
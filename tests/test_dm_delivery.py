@@ -0,0 +1,65 @@
+import asyncio
+
+from utils.dm_delivery import DMDeliveryQueue, DMJob
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, **kwargs):
+        self.sent.append(kwargs)
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.dm_channel = FakeChannel()
+
+async def deliver(jobs):
+    queue = DMDeliveryQueue(rate=100, burst=10, workers=2)
+    statuses = [queue.enqueue(job) for job in jobs]
+    await queue.queue.join()
+    queue.stop()
+    return queue, statuses
+
+def test_failing_build_message_still_reports_failure():
+    outcomes = []
+
+    async def on_done(outcome):
+        outcomes.append(outcome)
+
+    def build_message():
+        raise FileNotFoundError("avatars/blobs/gone.png")
+
+    queue, _ = asyncio.run(deliver([DMJob(FakeUser(1), "avatar", build_message, on_done)]))
+
+    assert outcomes == ["failed"]
+    assert not queue.pending_keys
+
+def test_failing_callback_does_not_stop_the_worker():
+    outcomes = []
+
+    async def broken_on_done(outcome):
+        raise RuntimeError("interaction token expired")
+
+    async def on_done(outcome):
+        outcomes.append(outcome)
+
+    user = FakeUser(1)
+    jobs = [
+        DMJob(user, "first", lambda: {"content": "1"}, broken_on_done),
+        DMJob(user, "second", lambda: {"content": "2"}, on_done),
+    ]
+    asyncio.run(deliver(jobs))
+
+    assert outcomes == ["sent"]
+    assert [message["content"] for message in user.dm_channel.sent] == ["1", "2"]
+
+def test_duplicate_request_is_not_queued_twice():
+    async def on_done(outcome):
+        pass
+
+    user = FakeUser(1)
+    jobs = [DMJob(user, "avatar", lambda: {}, on_done), DMJob(user, "avatar", lambda: {}, on_done)]
+    _, statuses = asyncio.run(deliver(jobs))
+
+    assert statuses == [("queued", 1), ("duplicate", 0)]
@@ -0,0 +1,50 @@
+import struct
+import zlib
+
+from utils.image_probe import probe_image
+
+def png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+def make_png(width: int, height: int) -> bytes:
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + png_chunk(b'IHDR', header)
+        + png_chunk(b'IDAT', zlib.compress(b'\x00' * (1 + 3 * width) * height))
+        + png_chunk(b'IEND', b'')
+    )
+
+def make_jpeg(width: int, height: int) -> bytes:
+    frame_header = b'\xff\xc0' + struct.pack('>HBHHB', 11, 8, height, width, 1) + b'\x01\x11\x00'
+    scan = b'\xff\xda' + struct.pack('>HB', 8, 1) + b'\x01\x00\x00\x3f\x00' + b'\x12\x34' * 16
+    return b'\xff\xd8' + frame_header + scan + b'\xff\xd9'
+
+def make_webp(width: int, height: int) -> bytes:
+    bits = (width - 1) | ((height - 1) << 14)
+    chunk = b'\x2f' + struct.pack('<I', bits) + b'\x00' * 11
+    body = b'WEBP' + b'VP8L' + struct.pack('<I', len(chunk)) + chunk
+    return b'RIFF' + struct.pack('<I', len(body)) + body
+
+def probe_bytes(tmp_path, data: bytes):
+    path = tmp_path / "upload"
+    path.write_bytes(data)
+    return probe_image(str(path))
+
+def test_complete_images_are_accepted(tmp_path):
+    for image_format, make in (('png', make_png), ('jpeg', make_jpeg), ('webp', make_webp)):
+        info = probe_bytes(tmp_path, make(40, 30))
+        assert info is not None, image_format
+        assert (info['format'], info['width'], info['height']) == (image_format, 40, 30)
+
+def test_truncated_png_is_rejected(tmp_path):
+    assert probe_bytes(tmp_path, make_png(40, 30)[:-12]) is None
+
+def test_truncated_jpeg_is_rejected(tmp_path):
+    assert probe_bytes(tmp_path, make_jpeg(40, 30)[:-10]) is None
+
+def test_jpeg_with_zero_padding_after_eoi_is_accepted(tmp_path):
+    assert probe_bytes(tmp_path, make_jpeg(40, 30) + b'\x00' * 64) is not None
+
+def test_truncated_webp_is_rejected(tmp_path):
+    assert probe_bytes(tmp_path, make_webp(40, 30)[:-4]) is None
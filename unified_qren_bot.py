@@ -9,10 +9,18 @@ from commands.unified_commands import (
     AvatarCommands, 
     ControlCommands, 
     ConsoleCommands, 
-    PublishingCommands, 
-    TagSearchCommands
+    PublishingCommands
 )
+from commands.tag_commands import TagSearchCommands
 from utils.avatar_manager import AvatarManager
+from utils.button_views import RandomAvatarView
+from utils.invite_client import InviteClient
+from utils.avatar_upload import AttachmentDownloader
+from utils.avatar_variants import AvatarProcessor
+from utils.dm_delivery import DMDeliveryQueue
+from utils.avatar_stats import AvatarStats
+from utils.tag_store import TagStore
+from config import INVITE_VALIDATOR_CONFIG, TAG_STORE_CONFIG, AVATAR_UPLOAD_CONFIG, AVATAR_VARIANT_CONFIG, DM_QUEUE_CONFIG, AVATAR_STATS_CONFIG
 # Load configuration
 BOT_CONFIG = {
     'prefix': '!',
@@ -36,8 +44,42 @@ class UnifiedQrenBot(commands.Bot):
         
         # Initialize managers and data
         self.avatar_manager = AvatarManager()
+        self.attachment_downloader = AttachmentDownloader(
+            temp_dir=AVATAR_UPLOAD_CONFIG['temp_dir'],
+            max_bytes=AVATAR_UPLOAD_CONFIG['max_bytes'],
+            chunk_size=AVATAR_UPLOAD_CONFIG['chunk_size']
+        )
+        self.avatar_processor = AvatarProcessor(
+            workers=AVATAR_VARIANT_CONFIG['workers'],
+            sizes=AVATAR_VARIANT_CONFIG['sizes'],
+            webp_quality=AVATAR_VARIANT_CONFIG['webp_quality']
+        )
+        self.dm_queue = DMDeliveryQueue(
+            rate=DM_QUEUE_CONFIG['rate'],
+            burst=DM_QUEUE_CONFIG['burst'],
+            workers=DM_QUEUE_CONFIG['workers'],
+            max_pending=DM_QUEUE_CONFIG['max_pending'],
+            dm_cache_size=DM_QUEUE_CONFIG['dm_cache_size']
+        )
+        self.avatar_stats = AvatarStats(
+            data_file=AVATAR_STATS_CONFIG['data_file'],
+            flush_interval=AVATAR_STATS_CONFIG['flush_interval'],
+            retention_days=AVATAR_STATS_CONFIG['retention_days'],
+            precision=AVATAR_STATS_CONFIG['hll_precision']
+        )
         self.tags_db_path = "tags_data.json"
         self.tags_data = self.load_tags_data()
+        self.tag_store = TagStore(
+            self.tags_data,
+            journal_path=TAG_STORE_CONFIG['journal_file'],
+            compact_after=TAG_STORE_CONFIG['compact_after']
+        )
+        if self.tag_store.snapshot_due:
+            self.save_tags_data()
+        self.invite_client = InviteClient(
+            requests_per_second=INVITE_VALIDATOR_CONFIG['requests_per_second'],
+            burst=INVITE_VALIDATOR_CONFIG['burst']
+        )
         
     def load_tags_data(self):
         """Load tags data from JSON file"""
@@ -51,14 +93,48 @@ class UnifiedQrenBot(commands.Bot):
             logger.error(f"Error loading tags data: {e}")
             return {}
     
+    def _write_tags_snapshot(self, text: str):
+        temp_path = self.tags_db_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, self.tags_db_path)
+    
     def save_tags_data(self):
-        """Save tags data to JSON file"""
+        """Journal pending tag changes, rewriting the JSON snapshot once the journal is long"""
+        began = written = False
         try:
-            with open(self.tags_db_path, 'w', encoding='utf-8') as f:
-                json.dump(self.tags_data, f, ensure_ascii=False, indent=2)
+            if not self.tag_store.flush():
+                return
+            text = json.dumps(self.tags_data, ensure_ascii=False, indent=2)
+            self.tag_store.begin_compaction()
+            began = True
+            self._write_tags_snapshot(text)
+            written = True
             logger.info("Tags data saved successfully")
         except Exception as e:
             logger.error(f"Error saving tags data: {e}")
+        finally:
+            if began:
+                self.tag_store.finish_compaction(written)
+    
+    async def save_tags_data_async(self):
+        """Like ``save_tags_data``, but a snapshot rewrite happens in a worker thread"""
+        began = written = False
+        try:
+            if not self.tag_store.flush():
+                return
+            # Serialized on the loop so the snapshot matches the journal cut-off
+            text = json.dumps(self.tags_data, ensure_ascii=False, indent=2)
+            self.tag_store.begin_compaction()
+            began = True
+            await asyncio.to_thread(self._write_tags_snapshot, text)
+            written = True
+            logger.info("Tags data saved successfully")
+        except Exception as e:
+            logger.error(f"Error saving tags data: {e}")
+        finally:
+            if began:
+                self.tag_store.finish_compaction(written)
         
     async def setup_hook(self):
         """Called when the bot is starting up"""
@@ -72,6 +148,11 @@ class UnifiedQrenBot(commands.Bot):
             
             logger.info("All commands loaded successfully")
             
+            # Re-attach roulette panels posted before a restart, one view per category,
+            # including categories that have since been emptied
+            for category in ["", *self.avatar_manager.panel_categories]:
+                self.add_view(RandomAvatarView(self, category))
+            
             # Sync slash commands
             synced = await self.tree.sync()
             logger.info(f"Synced {len(synced)} command(s)")
@@ -79,6 +160,15 @@ class UnifiedQrenBot(commands.Bot):
         except Exception as e:
             logger.error(f"Error in setup_hook: {e}")
     
+    async def close(self):
+        """Close shared HTTP resources before shutting down"""
+        self.dm_queue.stop()
+        await self.avatar_stats.close()
+        await self.invite_client.close()
+        await self.attachment_downloader.close()
+        self.avatar_processor.close()
+        await super().close()
+    
     async def on_ready(self):
         """Called when the bot is ready"""
         logger.info(f'{self.user} has connected to Discord!')
@@ -0,0 +1,123 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+# Diacritics (tashkeel), Quranic marks and tatweel are dropped; letter
+# variants that users type interchangeably are folded to one form.
+_MARK_RANGES = [
+    (0x0610, 0x061A),  # Honorifics and Quranic marks
+    (0x064B, 0x065F),  # Tashkeel
+    (0x06D6, 0x06DC),  # Quranic annotation signs
+    (0x06DF, 0x06E4),
+    (0x06E7, 0x06E8),
+    (0x06EA, 0x06ED),
+]
+_TRANSLATION = {
+    code: None
+    for start, end in _MARK_RANGES
+    for code in range(start, end + 1)
+}
+_TRANSLATION.update({
+    0x0670: None,  # Superscript alef
+    0x0640: None,  # Tatweel
+    ord('أ'): 'ا',
+    ord('إ'): 'ا',
+    ord('آ'): 'ا',
+    ord('ٱ'): 'ا',
+    ord('ة'): 'ه',
+    ord('ى'): 'ي',
+    ord('ؤ'): 'و',
+    ord('ئ'): 'ي',
+})
+# Arabic-Indic and Persian digits to ASCII
+_TRANSLATION.update({0x0660 + i: str(i) for i in range(10)})
+_TRANSLATION.update({0x06F0 + i: str(i) for i in range(10)})
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_text(text: str) -> str:
+    """Normalize a tag or query so Arabic spelling variants compare equal"""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = text.translate(_TRANSLATION)
+    return _WHITESPACE.sub(' ', text).strip()
+
+def bounded_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or ``limit + 1`` as soon as it must exceed ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+
+    previous = list(range(len(a) + 1))
+    for j, cb in enumerate(b, 1):
+        current = [j] + [0] * len(a)
+        row_min = j
+        for i, ca in enumerate(a, 1):
+            current[i] = min(
+                previous[i] + 1,
+                current[i - 1] + 1,
+                previous[i - 1] + (ca != cb)
+            )
+            row_min = min(row_min, current[i])
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+def max_typos(query: str) -> int:
+    """How many edits to tolerate for a query of this length"""
+    if len(query) <= 3:
+        return 0
+    if len(query) <= 6:
+        return 1
+    return 2
+
+class BKTree:
+    """BK-tree over normalized keys for bounded edit-distance lookups.
+
+    Lookups only descend into children whose edge distance is within the
+    tolerance of the query distance, so most of the tree is never visited.
+    """
+
+    def __init__(self):
+        self.root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        self.size = 0
+
+    def add(self, key: str):
+        """Insert a key (no-op if it is already present)"""
+        if self.root is None:
+            self.root = (key, {})
+            self.size = 1
+            return
+
+        node_key, children = self.root
+        while True:
+            distance = bounded_distance(key, node_key, max(len(key), len(node_key)))
+            if distance == 0:
+                return
+            child = children.get(distance)
+            if child is None:
+                children[distance] = (key, {})
+                self.size += 1
+                return
+            node_key, children = child
+
+    def search(self, query: str, tolerance: int) -> List[Tuple[int, str]]:
+        """Find keys within ``tolerance`` edits, closest first"""
+        if self.root is None:
+            return []
+
+        results = []
+        stack = [self.root]
+        while stack:
+            node_key, children = stack.pop()
+            # The exact distance is needed for the triangle-inequality pruning
+            distance = bounded_distance(query, node_key, max(len(query), len(node_key)))
+            if distance <= tolerance:
+                results.append((distance, node_key))
+            for edge, child in children.items():
+                if distance - tolerance <= edge <= distance + tolerance:
+                    stack.append(child)
+
+        results.sort()
+        return results
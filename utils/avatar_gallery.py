@@ -0,0 +1,157 @@
+import os
+import asyncio
+import hashlib
+import logging
+import discord
+from typing import Dict, List, Optional
+from utils.avatar_variants import pick_send_file
+
+logger = logging.getLogger(__name__)
+
+class ThumbnailGridCache:
+    """Thumbnail grid images for gallery pages, composed once and kept on disk.
+
+    A grid is keyed by the content hashes of the avatars on the page plus the
+    layout, so an unchanged page is served from disk and any change to the
+    page produces a new key. Concurrent requests for the same grid share one
+    render, and the oldest files are pruned past ``max_files``.
+    """
+
+    def __init__(self, processor, cache_dir: str = "avatars/.gallery", thumb_size: int = 128,
+                 columns: int = 5, max_files: int = 200):
+        self.processor = processor
+        self.cache_dir = cache_dir
+        self.thumb_size = thumb_size
+        self.columns = columns
+        self.max_files = max_files
+        self.rendering: Dict[str, asyncio.Task] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor.enabled
+
+    def key_for(self, avatars: List[Dict]) -> str:
+        digest = hashlib.sha256(f"{self.thumb_size}:{self.columns}".encode())
+        for avatar in avatars:
+            digest.update(b"|" + (avatar.get('sha256') or avatar['filepath']).encode())
+        return digest.hexdigest()
+
+    async def get(self, avatars: List[Dict]) -> Optional[str]:
+        """Path to the grid for these avatars, rendering it if needed"""
+        if not self.enabled or not avatars:
+            return None
+        key = self.key_for(avatars)
+        path = os.path.join(self.cache_dir, f"{key}.png")
+        if os.path.exists(path):
+            return path
+
+        task = self.rendering.get(key)
+        if task is None:
+            # The smallest stored variant that still covers a cell
+            sources = [pick_send_file(avatar, self.thumb_size)['path'] for avatar in avatars]
+            task = asyncio.ensure_future(self.processor.render_grid(sources, path, self.thumb_size, self.columns))
+            self.rendering[key] = task
+            task.add_done_callback(lambda _: self.rendering.pop(key, None))
+            task.add_done_callback(lambda _: self.prune())
+        return await asyncio.shield(task)
+
+    def prune(self):
+        """Delete the least recently written grids beyond ``max_files``"""
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                grids = [(entry.stat().st_mtime, entry.path) for entry in entries if entry.name.endswith('.png')]
+            if len(grids) <= self.max_files:
+                return
+            grids.sort()
+            for _, path in grids[:len(grids) - self.max_files]:
+                os.remove(path)
+        except Exception as e:
+            logger.error(f"Error pruning gallery cache: {e}")
+
+class AvatarGalleryView(discord.ui.View):
+    """Paged browser over the avatar manager's sorted name index"""
+
+    def __init__(self, owner_id: int, avatar_manager, per_page: int, grid_cache: Optional[ThumbnailGridCache] = None):
+        super().__init__(timeout=300)
+        self.owner_id = owner_id
+        self.avatar_manager = avatar_manager
+        self.per_page = per_page
+        self.grid_cache = grid_cache
+        self.page_number = 0
+        self.update_buttons()
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, (self.avatar_manager.get_avatar_count() + self.per_page - 1) // self.per_page)
+
+    def update_buttons(self):
+        self.page_number = min(self.page_number, self.total_pages - 1)
+        self.previous_page.disabled = self.page_number == 0
+        self.next_page.disabled = self.page_number >= self.total_pages - 1
+
+    async def render(self) -> Dict:
+        """Embed and attachments for the current page"""
+        avatars = self.avatar_manager.page(self.page_number, self.per_page)
+        total = self.avatar_manager.get_avatar_count()
+
+        embed = discord.Embed(
+            title="📂 الأفاتارات المتاحة",
+            description=f"المجموع: {total} أفتار",
+            color=discord.Color.green()
+        )
+        start = self.page_number * self.per_page
+        for i, avatar in enumerate(avatars, start + 1):
+            value = f"الملف: `{avatar['filename']}`"
+            if 'width' in avatar:
+                # Recorded at upload time, so the file itself is not opened
+                value += f"\n{avatar['format'].upper()} • {avatar['width']}×{avatar['height']}"
+                if avatar.get('frames', 1) > 1:
+                    value += f" • {avatar['frames']} إطار"
+            embed.add_field(name=f"{i}. {avatar['name']}", value=value, inline=False)
+        embed.set_footer(text=f"صفحة {self.page_number + 1} من {self.total_pages}")
+
+        attachments = []
+        if self.grid_cache:
+            grid_path = await self.grid_cache.get(avatars)
+            if grid_path:
+                embed.set_image(url="attachment://gallery.png")
+                attachments.append(discord.File(grid_path, filename="gallery.png"))
+        return {'embed': embed, 'attachments': attachments}
+
+    async def show_page(self, interaction: discord.Interaction, page_number: int):
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("❌ هذه القائمة ليست لك، استخدم /list_avatars", ephemeral=True)
+            return
+
+        # Rendering a new grid can take a moment, so acknowledge first
+        await interaction.response.defer()
+        self.page_number = page_number
+        self.update_buttons()
+        await interaction.edit_original_response(**await self.render(), view=self)
+
+    async def send_error(self, interaction: discord.Interaction):
+        try:
+            # The failure may have happened before or after the defer
+            if interaction.response.is_done():
+                await interaction.followup.send("❌ حدث خطأ أثناء عرض الصفحة", ephemeral=True)
+            else:
+                await interaction.response.send_message("❌ حدث خطأ أثناء عرض الصفحة", ephemeral=True)
+        except discord.HTTPException:
+            pass  # Ignore if we can't send error message
+
+    @discord.ui.button(label="السابق", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        try:
+            await self.show_page(interaction, max(0, self.page_number - 1))
+        except Exception as e:
+            logger.error(f"Error showing previous gallery page: {e}")
+            await self.send_error(interaction)
+
+    @discord.ui.button(label="التالي", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        try:
+            await self.show_page(interaction, self.page_number + 1)
+        except Exception as e:
+            logger.error(f"Error showing next gallery page: {e}")
+            await self.send_error(interaction)
@@ -0,0 +1,182 @@
+import os
+import re
+import uuid
+import asyncio
+import hashlib
+import logging
+import zipfile
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from utils.avatar_upload import UploadTooLarge, InvalidImage
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+class TooManyFiles(Exception):
+    """The archive holds more images than one batch accepts"""
+
+class IngestReport:
+    def __init__(self):
+        self.added: List[Dict] = []
+        # (source, status, detail) for every file, in input order
+        self.results: List[Tuple[str, str, str]] = []
+
+    def count(self, status: str) -> int:
+        return sum(1 for _, result_status, _ in self.results if result_status == status)
+
+def extract_member(archive: zipfile.ZipFile, member: zipfile.ZipInfo, temp_dir: str,
+                   max_bytes: int, chunk_size: int = 64 * 1024) -> Tuple[str, str, int]:
+    """Stream one archive member to a temp file. Returns (temp_path, sha256, size).
+
+    The size limit is enforced on the bytes actually extracted, not only the
+    size declared in the archive, so a crafted member cannot expand past it.
+    """
+    if member.file_size > max_bytes:
+        raise UploadTooLarge(member.file_size)
+
+    temp_path = os.path.join(temp_dir, f"{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with archive.open(member) as source, open(temp_path, 'wb') as target:
+            for chunk in iter(lambda: source.read(chunk_size), b''):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(size)
+                digest.update(chunk)
+                target.write(chunk)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return temp_path, digest.hexdigest(), size
+
+class AvatarIngest:
+    """Bulk avatar import from a ZIP archive or a list of message attachments.
+
+    Files are fetched and processed by at most ``concurrency`` workers at a
+    time. Content already in the collection or seen earlier in the batch is
+    skipped by hash before any processing. New records are collected and
+    added to the ``AvatarManager`` with a single save at the end.
+    """
+
+    def __init__(self, avatar_manager, downloader, store_image: Callable[..., Awaitable[Dict]],
+                 concurrency: int = 4, max_file_bytes: int = 10 * 1024 * 1024, max_files: int = 500):
+        self.avatar_manager = avatar_manager
+        self.downloader = downloader
+        self.store_image = store_image
+        self.concurrency = concurrency
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+
+    def _unique_name(self, source: str, taken: set) -> str:
+        stem = os.path.splitext(os.path.basename(source))[0] or "avatar"
+        name = stem
+        suffix = 2
+        while name in taken or self.avatar_manager.avatar_exists(name):
+            name = f"{stem}_{suffix}"
+            suffix += 1
+        taken.add(name)
+        return name
+
+    async def _run(self, sources: List[Tuple[str, Callable[[], Awaitable[Tuple[str, str, int]]]]],
+                   uploader_id: int) -> IngestReport:
+        report = IngestReport()
+        results: List[Optional[Tuple[str, str, str]]] = [None] * len(sources)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Digest -> future of the name it is stored under, or None if storing it failed
+        seen_hashes: Dict[str, asyncio.Future] = {}
+        taken_names: set = set()
+
+        async def worker(index: int, source: str, fetch):
+            async with semaphore:
+                try:
+                    temp_path, digest, size = await fetch()
+                except UploadTooLarge:
+                    results[index] = (source, 'failed', "حجم الملف كبير جداً")
+                    return
+                except Exception as e:
+                    results[index] = (source, 'failed', f"فشل التحميل: {e}")
+                    return
+
+                existing = self.avatar_manager.find_by_hash(digest)
+                duplicate_of = existing['name'] if existing else None
+                # A copy earlier in the batch only counts once it is stored; if that
+                # fails, one of the waiting copies takes over
+                while not duplicate_of and digest in seen_hashes:
+                    duplicate_of = await seen_hashes[digest]
+                if duplicate_of:
+                    os.remove(temp_path)
+                    results[index] = (source, 'duplicate', duplicate_of)
+                    return
+
+                # Claimed before any await, so two workers never store the same content
+                claim = asyncio.get_running_loop().create_future()
+                seen_hashes[digest] = claim
+                name = self._unique_name(source, taken_names)
+                try:
+                    stored = await self.store_image(temp_path, digest, size)
+                    claim.set_result(name)
+                except Exception as e:
+                    if isinstance(e, InvalidImage):
+                        results[index] = (source, 'failed', str(e))
+                    else:
+                        logger.error(f"Error ingesting {source}: {e}")
+                        results[index] = (source, 'failed', "خطأ أثناء المعالجة")
+                    return
+                finally:
+                    if not claim.done():
+                        del seen_hashes[digest]
+                        taken_names.discard(name)
+                        claim.set_result(None)
+
+                stored.pop('duplicate_of', None)
+                clean_name = re.sub(r'[<>:"/\\|?*]', '_', name).strip('_') or f"avatar_{digest[:8]}"
+                report.added.append({
+                    'name': name,
+                    'clean_name': clean_name,
+                    'filename': f"{clean_name}_{digest[:8]}.{stored['ext']}",
+                    **stored,
+                    'uploader': uploader_id,
+                    'upload_time': datetime.now(timezone.utc).isoformat()
+                })
+                results[index] = (source, 'added', name)
+
+        await asyncio.gather(*(worker(i, source, fetch) for i, (source, fetch) in enumerate(sources)))
+        report.results = [result for result in results if result]
+
+        if report.added:
+            self.avatar_manager.add_avatars(report.added)
+        logger.info(
+            f"Bulk avatar ingest: {report.count('added')} added, {report.count('duplicate')} duplicates, "
+            f"{report.count('failed')} failed"
+        )
+        return report
+
+    async def ingest_zip(self, archive_path: str, uploader_id: int) -> IngestReport:
+        """Import every image in a ZIP archive. Raises TooManyFiles above ``max_files`` images"""
+        temp_dir = self.downloader.temp_dir
+        with zipfile.ZipFile(archive_path) as archive:
+            members = [
+                member for member in archive.infolist()
+                if not member.is_dir()
+                and member.filename.lower().endswith(IMAGE_EXTENSIONS)
+                and not os.path.basename(member.filename).startswith('.')
+            ]
+            if len(members) > self.max_files:
+                raise TooManyFiles(len(members))
+
+            def fetcher(member):
+                return lambda: asyncio.to_thread(extract_member, archive, member, temp_dir, self.max_file_bytes)
+
+            sources = [(member.filename, fetcher(member)) for member in members]
+            return await self._run(sources, uploader_id)
+
+    async def ingest_attachments(self, attachments, uploader_id: int) -> IngestReport:
+        """Import image attachments (e.g. collected from a channel's history)"""
+        def fetcher(attachment):
+            return lambda: self.downloader.download(attachment.url)
+
+        sources = [(attachment.filename, fetcher(attachment)) for attachment in attachments]
+        return await self._run(sources, uploader_id)
@@ -0,0 +1,206 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+from utils.blob_store import hash_file
+
+logger = logging.getLogger(__name__)
+
+TEMP_SUFFIXES = ('.part', '.tmp')
+
+class ScanReport:
+    def __init__(self):
+        self.files_scanned = 0
+        self.orphans: List[str] = []
+        self.stale_temp: List[str] = []
+        self.bytes_freed = 0
+        self.empty_dirs = 0
+        # Avatar names whose image file is gone
+        self.missing: List[str] = []
+        # Avatar name -> variant paths that are gone
+        self.missing_variants: Dict[str, Set[str]] = {}
+        self.verified = 0
+        # Avatar names whose blob no longer matches its SHA-256
+        self.corrupt: List[str] = []
+        self.finished_at: Optional[float] = None
+
+class IntegrityScanner:
+    """Background reconciliation of the files under ``avatars/`` with the avatar records.
+
+    Each run walks the tree once with ``os.scandir``. Files no record points
+    at (blobs, variants, legacy uploads) and leftover ``.part``/``.tmp`` files
+    are deleted once they are older than ``grace_seconds``, so uploads still
+    in progress are never touched. Since records can change while the walk
+    runs, each orphan is deleted through ``AvatarManager.delete_if_unused``,
+    which re-checks the live blob references and recently stored files
+    under the lock ``store_file`` takes. Records whose image is gone are reported;
+    variants that are gone are dropped from their records. Optionally, up to
+    ``verify_budget`` bytes of blobs are re-hashed per run, resuming where the
+    previous run stopped, to catch silent corruption.
+    """
+
+    def __init__(self, avatar_manager, root: str = "avatars", skip_dirs: Tuple[str, ...] = (),
+                 grace_seconds: float = 3600, interval: float = 21600, verify_budget: int = 0):
+        self.avatar_manager = avatar_manager
+        self.root = os.path.normpath(root)
+        self.skip_dirs = {os.path.normpath(path) for path in skip_dirs}
+        self.grace_seconds = grace_seconds
+        self.interval = interval
+        self.verify_budget = verify_budget
+        self.verify_cursor = 0
+        self.last_report: Optional[ScanReport] = None
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background loop"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop the background loop"""
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.scan()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in avatar integrity scan: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _snapshot(self) -> Tuple[Set[str], Dict[str, Tuple[str, str]]]:
+        """Every referenced path, and blob path -> (digest, avatar name)"""
+        referenced: Set[str] = set()
+        blobs: Dict[str, Tuple[str, str]] = {}
+        for name, avatar in self.avatar_manager.avatars.items():
+            path = os.path.normpath(avatar['filepath'])
+            referenced.add(path)
+            if avatar.get('sha256'):
+                blobs[path] = (avatar['sha256'], name)
+            for variant in avatar.get('variants', []):
+                referenced.add(os.path.normpath(variant['path']))
+        return referenced, blobs
+
+    def _walk(self, referenced: Set[str], dry_run: bool, report: ScanReport) -> Set[str]:
+        """Single pass over the tree. Returns the referenced paths that were found"""
+        found: Set[str] = set()
+        cutoff = time.time() - self.grace_seconds
+        # Directories in visiting order, so empty ones can be removed deepest first
+        visited: List[str] = []
+        stack = [self.root]
+
+        while stack:
+            directory = stack.pop()
+            visited.append(directory)
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        path = os.path.normpath(entry.path)
+                        if entry.is_dir(follow_symlinks=False):
+                            if path not in self.skip_dirs:
+                                stack.append(path)
+                            continue
+                        report.files_scanned += 1
+                        if path in referenced:
+                            found.add(path)
+                            continue
+
+                        stat = entry.stat(follow_symlinks=False)
+                        if stat.st_mtime > cutoff:
+                            continue
+                        if entry.name.endswith(TEMP_SUFFIXES):
+                            bucket = report.stale_temp
+                            if not dry_run:
+                                os.remove(path)
+                        else:
+                            bucket = report.orphans
+                            # The snapshot may be stale; the manager re-checks under its file lock
+                            if not self.avatar_manager.delete_if_unused(path, self.grace_seconds, dry_run):
+                                continue
+                        bucket.append(path)
+                        report.bytes_freed += stat.st_size
+            except FileNotFoundError:
+                continue
+
+        if not dry_run:
+            # Top-level directories (blobs, .incoming) stay even when empty
+            for directory in reversed(visited):
+                if directory == self.root or os.path.dirname(directory) == self.root:
+                    continue
+                try:
+                    os.rmdir(directory)
+                    report.empty_dirs += 1
+                except OSError:
+                    pass  # Not empty
+        return found
+
+    def _verify(self, blobs: Dict[str, Tuple[str, str]], report: ScanReport):
+        """Re-hash blobs until the byte budget is spent, continuing from the last run"""
+        paths = sorted(blobs)
+        if not paths:
+            return
+        budget = self.verify_budget
+        for _ in range(len(paths)):
+            if budget <= 0:
+                break
+            self.verify_cursor %= len(paths)
+            path = paths[self.verify_cursor]
+            self.verify_cursor += 1
+            digest, name = blobs[path]
+            try:
+                budget -= os.path.getsize(path)
+                if hash_file(path) != digest:
+                    report.corrupt.append(name)
+                report.verified += 1
+            except FileNotFoundError:
+                continue
+
+    def _scan_files(self, referenced: Set[str], blobs: Dict[str, Tuple[str, str]],
+                    dry_run: bool) -> Tuple[ScanReport, Set[str]]:
+        report = ScanReport()
+        found = self._walk(referenced, dry_run, report)
+        if self.verify_budget > 0:
+            self._verify({path: blob for path, blob in blobs.items() if path in found}, report)
+        return report, found
+
+    async def scan(self, dry_run: bool = False) -> ScanReport:
+        """Run one reconciliation pass"""
+        async with self.lock:
+            referenced, blobs = self._snapshot()
+            report, found = await asyncio.to_thread(self._scan_files, referenced, blobs, dry_run)
+
+            # Records may have changed while the walk ran, so anything not seen is checked directly
+            def gone(path: str) -> bool:
+                path = os.path.normpath(path)
+                return path not in found and not os.path.exists(path)
+
+            for name, avatar in self.avatar_manager.avatars.items():
+                if gone(avatar['filepath']):
+                    report.missing.append(name)
+                missing_variants = {
+                    os.path.normpath(variant['path']) for variant in avatar.get('variants', [])
+                    if gone(variant['path'])
+                }
+                if missing_variants:
+                    report.missing_variants[name] = missing_variants
+
+            if report.missing_variants and not dry_run:
+                self.avatar_manager.remove_variants(report.missing_variants)
+
+            report.finished_at = time.time()
+            self.last_report = report
+
+        if report.orphans or report.stale_temp or report.missing or report.corrupt:
+            logger.warning(
+                f"Avatar integrity scan: {len(report.orphans)} orphan(s), {len(report.stale_temp)} stale temp file(s), "
+                f"{len(report.missing)} missing, {len(report.corrupt)} corrupt"
+            )
+        else:
+            logger.info(f"Avatar integrity scan: {report.files_scanned} file(s) OK, {report.verified} verified")
+        return report
@@ -1,17 +1,77 @@
 import json
 import os
+import re
+import time
+import random
 import logging
-from typing import Dict, List, Optional
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from utils.blob_store import BlobStore, hash_file
 
 logger = logging.getLogger(__name__)
 
+def normalize_category(category: str) -> str:
+    return " ".join(category.split()).lower()
+
+class IndexedNames:
+    """A set of names backed by an array, for O(1) add, remove and random choice"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.positions: Dict[str, int] = {}
+
+    def add(self, name: str):
+        if name not in self.positions:
+            self.positions[name] = len(self.names)
+            self.names.append(name)
+
+    def discard(self, name: str):
+        position = self.positions.pop(name, None)
+        if position is None:
+            return
+        # Move the last name into the freed slot
+        last = self.names.pop()
+        if last != name:
+            self.names[position] = last
+            self.positions[last] = position
+
+    def choice(self) -> Optional[str]:
+        return random.choice(self.names) if self.names else None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
 class AvatarManager:
-    def __init__(self, data_file="avatars_data.json"):
+    def __init__(self, data_file="avatars_data.json", blob_root="avatars/blobs", panels_file="avatar_panels.json"):
         self.data_file = data_file
         self.avatars = self._load_data()
+        # Categories with a roulette panel posted, so the panels can be re-attached on start
+        self.panels_file = panels_file
+        self.panel_categories: List[str] = self._load_panels()
         
         # Create avatars directory if it doesn't exist
         os.makedirs("avatars", exist_ok=True)
+        
+        # Image files are stored once per unique content and shared by name
+        self.blob_store = BlobStore(blob_root)
+        self.blobs = self._count_references()
+        # Held while files are adopted into or deleted from the blob store
+        self.file_lock = threading.Lock()
+        # Blob path -> time it was stored, until an avatar record references it
+        self.pending_files: Dict[str, float] = {}
+        self.migrate_to_blobs()
+        
+        # Bumped on every change; the sorted name index is rebuilt lazily from it
+        self.generation = 0
+        self._sorted_names: List[str] = []
+        self._sorted_generation = -1
+        
+        # Name arrays for random sampling, overall and per category
+        self.all_names = IndexedNames()
+        self.category_index: Dict[str, IndexedNames] = {}
+        for avatar_info in self.avatars.values():
+            self._index(avatar_info)
     
     def _load_data(self) -> Dict:
         """Load avatars data from JSON file"""
@@ -32,17 +92,202 @@ class AvatarManager:
         except Exception as e:
             logger.error(f"Error saving avatars data: {e}")
     
+    def _load_panels(self) -> List[str]:
+        """Load roulette panel categories from JSON file"""
+        try:
+            if os.path.exists(self.panels_file):
+                with open(self.panels_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            return []
+        except Exception as e:
+            logger.error(f"Error loading roulette panels: {e}")
+            return []
+    
+    def remember_panel(self, category: str):
+        """Record that a roulette panel was posted for a category"""
+        category = normalize_category(category)
+        if not category or category in self.panel_categories:
+            return
+        self.panel_categories.append(category)
+        try:
+            with open(self.panels_file, 'w', encoding='utf-8') as f:
+                json.dump(self.panel_categories, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"Error saving roulette panels: {e}")
+    
+    def _count_references(self) -> Dict[str, Dict]:
+        """Map each stored digest to its blob path and the avatars that use it"""
+        blobs = {}
+        for avatar in self.avatars.values():
+            digest = avatar.get('sha256')
+            if digest:
+                blob = blobs.setdefault(digest, {'path': avatar['filepath'], 'refs': 0, 'names': Counter()})
+                blob['refs'] += 1
+                blob['names'][avatar['name']] += 1
+        return blobs
+    
+    def _retain(self, avatar_info: Dict):
+        self.pending_files.pop(os.path.normpath(avatar_info['filepath']), None)
+        digest = avatar_info.get('sha256')
+        if digest:
+            blob = self.blobs.setdefault(digest, {'path': avatar_info['filepath'], 'refs': 0, 'names': Counter()})
+            blob['refs'] += 1
+            # Counted, since a replaced record is released after its successor is retained
+            blob['names'][avatar_info['name']] += 1
+    
+    def _release(self, avatar_info: Dict):
+        """Drop a reference, deleting the blob when it was the last one"""
+        digest = avatar_info.get('sha256')
+        blob = self.blobs.get(digest) if digest else None
+        if not blob:
+            return
+        blob['refs'] -= 1
+        blob['names'][avatar_info['name']] -= 1
+        if blob['names'][avatar_info['name']] <= 0:
+            del blob['names'][avatar_info['name']]
+        if blob['refs'] <= 0:
+            with self.file_lock:
+                del self.blobs[digest]
+                self.blob_store.delete(blob['path'])
+            logger.info(f"Deleted unreferenced avatar blob {digest}")
+    
+    def _index(self, avatar_info: Dict):
+        self.all_names.add(avatar_info['name'])
+        for category in avatar_info.get('categories', []):
+            self.category_index.setdefault(category, IndexedNames()).add(avatar_info['name'])
+    
+    def _unindex(self, avatar_info: Dict):
+        self.all_names.discard(avatar_info['name'])
+        for category in avatar_info.get('categories', []):
+            names = self.category_index.get(category)
+            if names is not None:
+                names.discard(avatar_info['name'])
+                if not names:
+                    del self.category_index[category]
+    
+    def store_file(self, temp_path: str, digest: str, ext: str) -> str:
+        """Move a downloaded temp file into the blob store, returning the blob path.
+
+        If the content is already stored the temp file is discarded. The blob
+        counts as in use until a record references it or ``max_pending_age``
+        passes (see ``delete_if_unused``).
+        """
+        with self.file_lock:
+            if digest in self.blobs:
+                os.remove(temp_path)
+                return self.blobs[digest]['path']
+            _, path = self.blob_store.adopt_file(temp_path, ext, digest)
+            self.pending_files[os.path.normpath(path)] = time.time()
+            return path
+    
+    def delete_if_unused(self, path: str, max_pending_age: float, dry_run: bool = False) -> bool:
+        """Delete a file found unreferenced by a scan, unless a blob or a recent upload claims it.
+
+        Runs under the same lock as ``store_file``, so an upload cannot
+        adopt the file between the check and the delete. With ``dry_run``
+        only reports whether the file would be deleted.
+        """
+        path = os.path.normpath(path)
+        digest = re.split(r'[._]', os.path.basename(path), 1)[0]
+        with self.file_lock:
+            if digest in self.blobs:
+                return False
+            stored_at = self.pending_files.get(path)
+            if stored_at is not None and time.time() - stored_at < max_pending_age:
+                return False
+            if dry_run:
+                return True
+            self.pending_files.pop(path, None)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                return False
+            return True
+    
+    def find_by_hash(self, digest: str) -> Optional[Dict]:
+        """An avatar already using this content, if any"""
+        blob = self.blobs.get(digest)
+        if not blob:
+            return None
+        for name in blob['names']:
+            avatar = self.avatars.get(name)
+            if avatar and avatar.get('sha256') == digest:
+                return avatar
+        return None
+    
+    def migrate_to_blobs(self):
+        """Move pre-existing per-upload files into the blob store"""
+        migrated = 0
+        for avatar in self.avatars.values():
+            if avatar.get('sha256'):
+                continue
+            filepath = avatar.get('filepath', '')
+            if not os.path.exists(filepath):
+                logger.warning(f"Avatar file missing, not migrated: {filepath}")
+                continue
+            try:
+                digest = hash_file(filepath)
+                if digest in self.blobs:
+                    os.remove(filepath)
+                    blob_path = self.blobs[digest]['path']
+                else:
+                    ext = os.path.splitext(filepath)[1] or '.png'
+                    digest, blob_path = self.blob_store.adopt_file(filepath, ext, digest)
+                avatar['sha256'] = digest
+                avatar['filepath'] = blob_path
+                self._retain(avatar)
+                migrated += 1
+            except Exception as e:
+                logger.error(f"Error migrating avatar file {filepath}: {e}")
+        
+        if migrated:
+            self._save_data()
+            logger.info(f"Migrated {migrated} avatar file(s) to the blob store ({len(self.blobs)} unique)")
+    
+    def _store_record(self, avatar_info: Dict):
+        """Put a record in place, replacing any avatar with the same name"""
+        self._retain(avatar_info)
+        previous = self.avatars.get(avatar_info['name'])
+        if previous:
+            self._release(previous)
+            self._unindex(previous)
+            # Replacing the image keeps the avatar in its categories
+            if previous.get('categories') and 'categories' not in avatar_info:
+                avatar_info['categories'] = previous['categories']
+        self.avatars[avatar_info['name']] = avatar_info
+        self._index(avatar_info)
+    
     def add_avatar(self, avatar_info: Dict):
         """Add a new avatar to the collection"""
         try:
             avatar_name = avatar_info['name']
-            self.avatars[avatar_name] = avatar_info
+            self._store_record(avatar_info)
+            self.generation += 1
             self._save_data()
             logger.info(f"Avatar '{avatar_name}' added to collection")
         except Exception as e:
             logger.error(f"Error adding avatar: {e}")
             raise
     
+    def add_avatars(self, avatar_infos: List[Dict]):
+        """Add many avatars with a single save"""
+        for avatar_info in avatar_infos:
+            self._store_record(avatar_info)
+        self.generation += 1
+        self._save_data()
+        logger.info(f"{len(avatar_infos)} avatar(s) added to collection")
+    
+    def remove_variants(self, missing: Dict[str, set]):
+        """Drop variant entries whose files are gone, with a single save"""
+        for avatar_name, paths in missing.items():
+            avatar_info = self.avatars.get(avatar_name)
+            if avatar_info and 'variants' in avatar_info:
+                avatar_info['variants'] = [
+                    variant for variant in avatar_info['variants']
+                    if os.path.normpath(variant['path']) not in paths
+                ]
+        self._save_data()
+    
     def get_avatar(self, avatar_name: str) -> Optional[Dict]:
         """Get avatar information by name"""
         return self.avatars.get(avatar_name)
@@ -51,8 +296,11 @@ class AvatarManager:
         """Remove an avatar from the collection"""
         try:
             if avatar_name in self.avatars:
-                del self.avatars[avatar_name]
+                avatar_info = self.avatars.pop(avatar_name)
+                self._unindex(avatar_info)
+                self.generation += 1
                 self._save_data()
+                self._release(avatar_info)
                 logger.info(f"Avatar '{avatar_name}' removed from collection")
                 return True
             return False
@@ -64,6 +312,43 @@ class AvatarManager:
         """Get list of all avatars"""
         return list(self.avatars.values())
     
+    def sorted_names(self) -> List[str]:
+        """Avatar names in case-insensitive order, re-sorted only after a change"""
+        if self._sorted_generation != self.generation:
+            self._sorted_names = sorted(self.avatars, key=str.casefold)
+            self._sorted_generation = self.generation
+        return self._sorted_names
+    
+    def page(self, number: int, per_page: int) -> List[Dict]:
+        """One page of avatars in name order"""
+        names = self.sorted_names()[number * per_page:(number + 1) * per_page]
+        return [self.avatars[name] for name in names]
+    
+    def set_categories(self, avatar_name: str, categories: Iterable[str]) -> List[str]:
+        """Replace an avatar's categories, returning the normalized list"""
+        avatar_info = self.avatars[avatar_name]
+        normalized = list(dict.fromkeys(filter(None, (normalize_category(c) for c in categories))))
+        self._unindex(avatar_info)
+        avatar_info['categories'] = normalized
+        self._index(avatar_info)
+        self._save_data()
+        return normalized
+    
+    def list_categories(self) -> Dict[str, int]:
+        """Category -> number of avatars in it"""
+        return {category: len(names) for category, names in self.category_index.items()}
+    
+    def category_names(self, category: str) -> List[str]:
+        """Names of the avatars in a category, in case-insensitive order"""
+        names = self.category_index.get(normalize_category(category))
+        return sorted(names.names, key=str.casefold) if names else []
+    
+    def random_avatar(self, category: Optional[str] = None) -> Optional[Dict]:
+        """A uniformly random avatar, optionally from one category"""
+        names = self.category_index.get(normalize_category(category)) if category else self.all_names
+        name = names.choice() if names else None
+        return self.avatars.get(name) if name else None
+    
     def avatar_exists(self, avatar_name: str) -> bool:
         """Check if an avatar exists"""
         return avatar_name in self.avatars
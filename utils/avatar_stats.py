@@ -0,0 +1,175 @@
+import os
+import json
+import math
+import heapq
+import base64
+import asyncio
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+class HyperLogLog:
+    """Approximate distinct counter in ``2 ** precision`` bytes (about 3% error at precision 10)"""
+
+    def __init__(self, precision: int = 10, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.size)
+
+    def add(self, value: str):
+        hashed = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+        index = hashed >> (64 - self.precision)
+        rest = (hashed << self.precision) & 0xFFFFFFFFFFFFFFFF
+        rank = min(64 - rest.bit_length(), 64 - self.precision) + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size * self.size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            # Small-range correction (linear counting)
+            estimate = self.size * math.log(self.size / zeros)
+        return round(estimate)
+
+    def to_string(self) -> str:
+        return base64.b64encode(bytes(self.registers)).decode('ascii')
+
+    @classmethod
+    def from_string(cls, data: str, precision: int) -> "HyperLogLog":
+        registers = base64.b64decode(data)
+        if len(registers) != 1 << precision:
+            # Precision changed in the config; start a fresh sketch
+            return cls(precision)
+        return cls(precision, registers)
+
+class AvatarStats:
+    """Per-avatar download counters, unique users and per-day buckets.
+
+    ``record`` only bumps in-memory deltas, so it is cheap enough for the
+    button path. Every ``flush_interval`` seconds the deltas are folded into
+    the stored totals (user ids go into a HyperLogLog sketch per avatar) and
+    the stats file is rewritten once. Day buckets older than
+    ``retention_days`` are dropped on merge.
+    """
+
+    def __init__(self, data_file: str = "avatar_stats.json", flush_interval: float = 60,
+                 retention_days: int = 90, precision: int = 10):
+        self.data_file = data_file
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.precision = precision
+        self.data = self._load_data()
+        self.sketches: Dict[str, HyperLogLog] = {}
+        self.pending_downloads: Counter = Counter()
+        self.pending_days: Dict[str, Counter] = {}
+        self.pending_users: Dict[str, Set[int]] = {}
+        self.dirty = False
+        self.task: Optional[asyncio.Task] = None
+
+    def _load_data(self) -> Dict:
+        """Load stats from JSON file"""
+        try:
+            if os.path.exists(self.data_file):
+                with open(self.data_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            return {'avatars': {}}
+        except Exception as e:
+            logger.error(f"Error loading avatar stats: {e}")
+            return {'avatars': {}}
+
+    def record(self, avatar_name: str, user_id: int):
+        """Count one download. Only touches in-memory deltas"""
+        day = datetime.now(timezone.utc).date().isoformat()
+        self.pending_downloads[avatar_name] += 1
+        self.pending_days.setdefault(avatar_name, Counter())[day] += 1
+        self.pending_users.setdefault(avatar_name, set()).add(user_id)
+
+    def _sketch(self, avatar_name: str) -> HyperLogLog:
+        sketch = self.sketches.get(avatar_name)
+        if sketch is None:
+            stored = self.data['avatars'].get(avatar_name, {}).get('unique_sketch')
+            sketch = HyperLogLog.from_string(stored, self.precision) if stored else HyperLogLog(self.precision)
+            self.sketches[avatar_name] = sketch
+        return sketch
+
+    def merge_pending(self):
+        """Fold the in-memory deltas into the stored totals"""
+        if not self.pending_downloads:
+            return
+        cutoff = (datetime.now(timezone.utc).date() - timedelta(days=self.retention_days)).isoformat()
+
+        for avatar_name, downloads in self.pending_downloads.items():
+            record = self.data['avatars'].setdefault(avatar_name, {'downloads': 0, 'days': {}})
+            record['downloads'] += downloads
+            for day, count in self.pending_days.get(avatar_name, {}).items():
+                record['days'][day] = record['days'].get(day, 0) + count
+            record['days'] = {day: count for day, count in record['days'].items() if day >= cutoff}
+
+            sketch = self._sketch(avatar_name)
+            for user_id in self.pending_users.get(avatar_name, ()):
+                sketch.add(str(user_id))
+            record['unique_sketch'] = sketch.to_string()
+            record['unique_users'] = sketch.count()
+
+        self.pending_downloads.clear()
+        self.pending_days.clear()
+        self.pending_users.clear()
+        self.dirty = True
+
+    def _write(self, text: str):
+        temp_path = self.data_file + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, self.data_file)
+
+    async def flush(self):
+        """Merge pending deltas and write the stats file if anything changed"""
+        self.merge_pending()
+        if not self.dirty:
+            return
+        try:
+            text = json.dumps(self.data, ensure_ascii=False)
+            self.dirty = False
+            await asyncio.to_thread(self._write, text)
+        except Exception as e:
+            self.dirty = True
+            logger.error(f"Error saving avatar stats: {e}")
+
+    def top(self, limit: int = 10, days: int = 0) -> List[Tuple[str, Dict]]:
+        """The most downloaded avatars, overall or within the last ``days`` days.
+
+        Returns (name, {'downloads', 'unique_users', 'recent'}) pairs.
+        """
+        self.merge_pending()
+        cutoff = (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat() if days else None
+
+        def summarize(item):
+            name, record = item
+            recent = sum(count for day, count in record['days'].items() if day >= cutoff) if cutoff else record['downloads']
+            return name, {'downloads': record['downloads'], 'unique_users': record.get('unique_users', 0), 'recent': recent}
+
+        summaries = map(summarize, self.data['avatars'].items())
+        return [item for item in heapq.nlargest(limit, summaries, key=lambda item: item[1]['recent']) if item[1]['recent']]
+
+    def start(self):
+        """Start the periodic flush loop"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self):
+        """Stop the flush loop and write what is still pending"""
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        await self.flush()
@@ -0,0 +1,74 @@
+import os
+import uuid
+import hashlib
+import logging
+import aiofiles
+import aiohttp
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class UploadTooLarge(Exception):
+    """The attachment is bigger than the configured limit"""
+
+class InvalidImage(Exception):
+    """The file is not an acceptable image; the message is shown to the user"""
+
+class AttachmentDownloader:
+    """Streams attachments to temp files on a pooled HTTP session.
+
+    The body is read in chunks, hashed as it arrives and written to a temp
+    file, so memory use per upload stays at one chunk. Downloads over
+    ``max_bytes`` are aborted as soon as the limit is crossed (or right away
+    when the response declares a larger Content-Length). The temp directory
+    sits next to the blob store so the finished file can be moved into place
+    with an atomic rename.
+    """
+
+    def __init__(self, temp_dir: str = "avatars/.incoming", max_bytes: int = 10 * 1024 * 1024,
+                 chunk_size: int = 64 * 1024):
+        self.temp_dir = temp_dir
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.session: Optional[aiohttp.ClientSession] = None
+        os.makedirs(temp_dir, exist_ok=True)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=10),
+                timeout=aiohttp.ClientTimeout(total=60)
+            )
+        return self.session
+
+    async def download(self, url: str, max_bytes: Optional[int] = None) -> Tuple[str, str, int]:
+        """Download to a temp file. Returns (temp_path, sha256, size)"""
+        max_bytes = max_bytes or self.max_bytes
+        temp_path = os.path.join(self.temp_dir, f"{uuid.uuid4().hex}.part")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with self._get_session().get(url) as response:
+                response.raise_for_status()
+                if response.content_length and response.content_length > max_bytes:
+                    raise UploadTooLarge(response.content_length)
+
+                async with aiofiles.open(temp_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                        size += len(chunk)
+                        if size > max_bytes:
+                            raise UploadTooLarge(size)
+                        digest.update(chunk)
+                        await f.write(chunk)
+        except BaseException:
+            # Never leave partial downloads behind, including on cancellation
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return temp_path, digest.hexdigest(), size
+
+    async def close(self):
+        """Close the underlying session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
@@ -0,0 +1,155 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:
+    # Variants are optional; without Pillow only the original is stored and sent
+    Image = ImageDraw = None
+
+logger = logging.getLogger(__name__)
+
+def _save_atomic(image, path: str, **options):
+    temp_path = path + ".tmp"
+    image.save(temp_path, **options)
+    os.replace(temp_path, path)
+
+def _variant(label: str, path: str, width: int, height: int) -> Dict:
+    return {
+        'label': label,
+        'path': path,
+        'bytes': os.path.getsize(path),
+        'width': width,
+        'height': height
+    }
+
+def render_variants(source_path: str, base_path: str, sizes: Sequence[int], webp_quality: int) -> List[Dict]:
+    """Write optimized variants of an image next to ``base_path``.
+
+    Runs in a worker process. Produces a recompressed PNG and a WebP at full
+    size, plus WebP copies downscaled to each of ``sizes`` that is smaller
+    than the image. Animated images are left alone.
+    """
+    variants = []
+    with Image.open(source_path) as image:
+        if getattr(image, 'is_animated', False):
+            return variants
+        image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+
+        png_path = f"{base_path}_full.png"
+        _save_atomic(image, png_path, format='PNG', optimize=True)
+        variants.append(_variant('png', png_path, image.width, image.height))
+
+        webp_path = f"{base_path}_full.webp"
+        _save_atomic(image, webp_path, format='WEBP', quality=webp_quality, method=6)
+        variants.append(_variant('webp', webp_path, image.width, image.height))
+
+        for size in sorted(sizes):
+            if max(image.width, image.height) <= size:
+                continue
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            resized_path = f"{base_path}_{size}.webp"
+            _save_atomic(resized, resized_path, format='WEBP', quality=webp_quality, method=6)
+            variants.append(_variant(f'webp_{size}', resized_path, resized.width, resized.height))
+
+    return variants
+
+def render_grid(source_paths: Sequence[str], out_path: str, cell: int, columns: int) -> str:
+    """Compose numbered thumbnails of ``source_paths`` into one PNG grid.
+
+    Runs in a worker process. Files that cannot be opened leave an empty cell.
+    """
+    columns = max(1, min(columns, len(source_paths)))
+    rows = (len(source_paths) + columns - 1) // columns
+    grid = Image.new('RGBA', (columns * cell, rows * cell), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(grid)
+
+    for index, path in enumerate(source_paths):
+        left, top = (index % columns) * cell, (index // columns) * cell
+        try:
+            with Image.open(path) as image:
+                image.thumbnail((cell, cell), Image.LANCZOS)
+                thumb = image.convert('RGBA')
+            grid.paste(thumb, (left + (cell - thumb.width) // 2, top + (cell - thumb.height) // 2), thumb)
+        except Exception as e:
+            logger.warning(f"Skipping thumbnail for {path}: {e}")
+        draw.rectangle((left, top, left + 22, top + 14), fill=(0, 0, 0, 180))
+        draw.text((left + 3, top + 2), str(index + 1), fill=(255, 255, 255, 255))
+
+    _save_atomic(grid, out_path, format='PNG', optimize=True)
+    return out_path
+
+class AvatarProcessor:
+    """Renders avatar variants in a process pool so the event loop never blocks"""
+
+    def __init__(self, workers: int = 2, sizes: Sequence[int] = (512, 1024), webp_quality: int = 90):
+        self.sizes = list(sizes)
+        self.webp_quality = webp_quality
+        self.enabled = Image is not None
+        self.pool: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(max_workers=workers) if self.enabled else None
+        if not self.enabled:
+            logger.warning("Pillow is not installed; avatar variants are disabled")
+
+    async def process(self, source_path: str) -> List[Dict]:
+        """Render variants for a stored blob. Returns [] when disabled or on failure"""
+        if not self.enabled:
+            return []
+        base_path = os.path.splitext(source_path)[0]
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self.pool, render_variants, source_path, base_path, self.sizes, self.webp_quality
+            )
+        except Exception as e:
+            logger.error(f"Error rendering variants for {source_path}: {e}")
+            return []
+
+    async def render_grid(self, source_paths: Sequence[str], out_path: str, cell: int, columns: int) -> Optional[str]:
+        """Compose a thumbnail grid. Returns its path, or None when disabled or on failure"""
+        if not self.enabled:
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.pool, render_grid, list(source_paths), out_path, cell, columns)
+        except Exception as e:
+            logger.error(f"Error rendering thumbnail grid {out_path}: {e}")
+            return None
+
+    def close(self):
+        """Shut the worker pool down"""
+        if self.pool:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+
+def pick_send_file(avatar_info: Dict, min_px: int = 512) -> Dict:
+    """The smallest stored file for an avatar whose longest side is at least ``min_px``.
+
+    Returns {'path', 'filename'}; falls back to the original upload.
+    """
+    original = {'path': avatar_info['filepath'], 'filename': avatar_info['filename']}
+    variants = avatar_info.get('variants', [])
+    if not variants:
+        return original
+
+    # Images smaller than min_px are acceptable at their own full size
+    full_size = max(max(variant['width'], variant['height']) for variant in variants)
+    threshold = min(min_px, full_size)
+    candidates = [
+        variant for variant in variants
+        if max(variant['width'], variant['height']) >= threshold and os.path.exists(variant['path'])
+    ]
+    if not candidates:
+        return original
+
+    best = min(candidates, key=lambda variant: variant['bytes'])
+    if os.path.exists(original['path']) and os.path.getsize(original['path']) <= best['bytes']:
+        return original
+
+    stem = os.path.splitext(avatar_info['filename'])[0]
+    return {'path': best['path'], 'filename': f"{stem}{os.path.splitext(best['path'])[1]}"}
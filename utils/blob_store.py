@@ -0,0 +1,85 @@
+import os
+import hashlib
+import logging
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class BlobStore:
+    """Content-addressed file store keyed by SHA-256.
+
+    A blob for digest ``abcdef...`` lives at ``{root}/ab/cd/abcdef....{ext}``
+    so no single directory grows with the number of images. Identical
+    content is stored once; callers keep their own reference counts and
+    call ``delete`` when the last reference goes away.
+    """
+
+    def __init__(self, root: str = "avatars/blobs"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, digest: str, ext: str) -> str:
+        """Where the blob for a digest is stored"""
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.{ext.lstrip('.').lower()}")
+
+    def put_bytes(self, data: bytes, ext: str) -> Tuple[str, str]:
+        """Store bytes, returning (digest, path). Existing blobs are not rewritten"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, ext)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        return digest, path
+
+    def adopt_file(self, source_path: str, ext: str, digest: Optional[str] = None) -> Tuple[str, str]:
+        """Move an existing file into the store, returning (digest, path).
+
+        If the content is already stored the source file is deleted instead.
+        """
+        digest = digest or hash_file(source_path)
+        path = self.path_for(digest, ext)
+        if os.path.exists(path):
+            os.remove(source_path)
+            # Reused content counts as new for age-based cleanup
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(source_path, path)
+        return digest, path
+
+    def delete(self, path: str) -> bool:
+        """Remove a blob, and the variants rendered next to it, once nothing references it"""
+        directory, name = os.path.split(path)
+        derived_prefix = os.path.splitext(name)[0] + "_"
+        deleted = False
+        try:
+            os.remove(path)
+            deleted = True
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error deleting blob {path}: {e}")
+        try:
+            # Fan-out directories hold only a handful of files
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith(derived_prefix):
+                        os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error deleting variants of blob {path}: {e}")
+        return deleted
@@ -3,6 +3,11 @@ from discord.ext import commands
 import logging
 import os
 import asyncio
+import hashlib
+from utils.avatar_variants import pick_send_file
+from utils.avatar_manager import normalize_category
+from utils.dm_delivery import DMJob
+from config import AVATAR_VARIANT_CONFIG, DM_QUEUE_CONFIG, FEATURES
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +24,7 @@ class AvatarButtonView(discord.ui.View):
     async def get_avatar_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handle avatar download button click"""
         try:
-            await interaction.response.defer(ephemeral=True)
+            await interaction.response.defer(ephemeral=True, thinking=True)
             
             # Check if file exists
             if not os.path.exists(self.avatar_info['filepath']):
@@ -27,41 +32,43 @@ class AvatarButtonView(discord.ui.View):
                 logger.error(f"Avatar file not found: {self.avatar_info['filepath']}")
                 return
             
-            # Try to send DM to user first
             user = interaction.user
-            try:
+            avatar_info = self.avatar_info
+            
+            def build_message():
                 # Create embed for DM
                 embed = discord.Embed(
                     title="Qren Avatar",
                     description="",
                     color=discord.Color.green()
                 )
-                
-                # Send avatar file in DM
-                file = discord.File(self.avatar_info['filepath'])
-                embed.set_image(url=f"attachment://{self.avatar_info['filename']}")
-                
-                await user.send(embed=embed, file=file)
-                
-                # Send confirmation message in the same channel
-                await interaction.followup.send(f"✅ تم ارسال الصورة في الخاص {user.mention}", ephemeral=False)
-                logger.info(f"Avatar '{self.avatar_info['name']}' sent to {user} ({user.id})")
-                
-            except discord.Forbidden:
-                # User has DMs disabled
-                await interaction.followup.send(
-                    f"❌ لا يمكن ارسال الصورة لـ {user.mention} لأن الرسائل الخاصة مغلقة",
-                    ephemeral=False
-                )
-                logger.warning(f"Failed to DM {interaction.user} - DMs disabled")
-                
-            except discord.HTTPException as e:
-                # Other Discord API errors
-                await interaction.followup.send(
-                    f"❌ فشل في ارسال الصورة لـ {user.mention}",
-                    ephemeral=False
-                )
-                logger.error(f"Discord HTTP error sending avatar to {interaction.user}: {e}")
+                send_file = pick_send_file(avatar_info, AVATAR_VARIANT_CONFIG['send_min_px'])
+                embed.set_image(url=f"attachment://{send_file['filename']}")
+                return {'embed': embed, 'file': discord.File(send_file['path'], filename=send_file['filename'])}
+            
+            async def on_done(outcome: str):
+                if outcome == 'sent':
+                    if FEATURES['avatar_stats_tracking']:
+                        self.bot.avatar_stats.record(avatar_info['name'], user.id)
+                    await interaction.edit_original_response(content=f"✅ تم ارسال الصورة في الخاص {user.mention}")
+                    logger.info(f"Avatar '{avatar_info['name']}' sent to {user} ({user.id})")
+                elif outcome == 'forbidden':
+                    # User has DMs disabled
+                    await interaction.edit_original_response(content=f"❌ لا يمكن ارسال الصورة لـ {user.mention} لأن الرسائل الخاصة مغلقة")
+                    logger.warning(f"Failed to DM {user} - DMs disabled")
+                else:
+                    await interaction.edit_original_response(content=f"❌ فشل في ارسال الصورة لـ {user.mention}")
+            
+            # Deliveries go through the shared rate-limited DM queue
+            job = DMJob(user, avatar_info['name'], build_message, on_done)
+            status, position = self.bot.dm_queue.enqueue(job)
+            
+            if status == 'duplicate':
+                await interaction.edit_original_response(content="⏳ طلبك لهذه الصورة قيد الإرسال بالفعل")
+            elif status == 'full':
+                await interaction.edit_original_response(content="⏳ الضغط عالي حالياً، حاول مرة أخرى بعد قليل")
+            elif position > DM_QUEUE_CONFIG['notify_position']:
+                await interaction.edit_original_response(content=f"⏳ تم إضافة طلبك لقائمة الانتظار (#{position})")
                 
         except Exception as e:
             logger.error(f"Error in avatar button handler: {e}")
@@ -73,6 +80,58 @@ class AvatarButtonView(discord.ui.View):
             except:
                 pass  # Ignore if we can't send error message
 
+class RandomAvatarView(discord.ui.View):
+    def __init__(self, bot, category: str = ""):
+        super().__init__(timeout=None)  # Persistent view
+        self.bot = bot
+        self.category = normalize_category(category)
+        # One registered view per category, see UnifiedQrenBot.setup_hook. Hashed,
+        # since a custom_id is limited to 100 characters and categories are not
+        if self.category:
+            digest = hashlib.sha256(self.category.encode()).hexdigest()[:16]
+            self.random_avatar_button.custom_id = f"random_avatar:{digest}"
+    
+    @discord.ui.button(
+        label="🎲 أفتار عشوائي",
+        style=discord.ButtonStyle.success,
+        custom_id="random_avatar:"
+    )
+    async def random_avatar_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Show a random avatar privately, with the usual button to get it in DM"""
+        try:
+            # Sampled from the manager's name arrays, so no scan per click
+            avatar_info = self.bot.avatar_manager.random_avatar(self.category or None)
+            if not avatar_info or not os.path.exists(avatar_info['filepath']):
+                await interaction.response.send_message("📭 لا توجد أفاتارات متاحة حالياً!", ephemeral=True)
+                return
+            
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            
+            embed = discord.Embed(
+                title="🎲 Qren Avatar",
+                description=avatar_info['name'],
+                color=discord.Color.blue()
+            )
+            send_file = pick_send_file(avatar_info, AVATAR_VARIANT_CONFIG['send_min_px'])
+            embed.set_image(url=f"attachment://{send_file['filename']}")
+            
+            await interaction.followup.send(
+                embed=embed,
+                file=discord.File(send_file['path'], filename=send_file['filename']),
+                view=AvatarButtonView(avatar_info, self.bot),
+                ephemeral=True
+            )
+            
+        except Exception as e:
+            logger.error(f"Error in random avatar button handler: {e}")
+            try:
+                if interaction.response.is_done():
+                    await interaction.followup.send("❌ An unexpected error occurred. Please try again.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("❌ An unexpected error occurred. Please try again.", ephemeral=True)
+            except:
+                pass  # Ignore if we can't send error message
+
 class ConfirmDeleteView(discord.ui.View):
     def __init__(self, avatar_name: str, callback):
         super().__init__(timeout=30)
@@ -382,3 +382,28 @@ class ControlPanelView(discord.ui.View):
             logger.error(f"Error in control menu selection: {e}")
             await interaction.response.send_message("❌ حدث خطأ أثناء معالجة الطلب", ephemeral=True)
 
+
+class PurgeCancelView(discord.ui.View):
+    def __init__(self, job):
+        super().__init__(timeout=None)
+        self.job = job
+
+    @discord.ui.button(
+        label="إيقاف الحذف",
+        style=discord.ButtonStyle.danger,
+        emoji="⏹️"
+    )
+    async def cancel_purge(self, interaction: discord.Interaction, button: discord.ui.Button):
+        try:
+            is_admin = isinstance(interaction.user, discord.Member) and interaction.user.guild_permissions.administrator
+            if interaction.user.id != self.job.requested_by and not is_admin:
+                await interaction.response.send_message("❌ لا يمكنك إيقاف هذه العملية", ephemeral=True)
+                return
+
+            self.job.cancel()
+            button.disabled = True
+            await interaction.response.edit_message(view=self)
+
+        except Exception as e:
+            logger.error(f"Error cancelling purge job: {e}")
+            await interaction.response.send_message("❌ حدث خطأ أثناء إيقاف العملية", ephemeral=True)
@@ -0,0 +1,111 @@
+import logging
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import discord
+from utils.invite_client import RateBudget
+
+logger = logging.getLogger(__name__)
+
+class DMJob:
+    def __init__(self, user: discord.abc.User, key: str, build_message: Callable[[], Dict],
+                 on_done: Callable[[str], Awaitable[None]]):
+        self.user = user
+        # Repeat requests with the same (user, key) while queued are dropped
+        self.key = key
+        # Called per attempt so every send gets fresh discord.File objects
+        self.build_message = build_message
+        # Receives 'sent', 'forbidden' or 'failed'
+        self.on_done = on_done
+        self.queued_at = time.monotonic()
+
+class DMDeliveryQueue:
+    """Global queue for direct messages with a shared token bucket.
+
+    A few workers drain one queue; every DM-channel creation and every send
+    takes a token, so throughput levels off at the configured rate instead of
+    tripping Discord's global and DM rate limits (discord.py itself retries
+    any 429 that still happens). DM channels are cached per
+    user, a user clicking again while a delivery is pending is not queued
+    twice, and ``enqueue`` refuses new work once ``max_pending`` jobs wait.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: int = 5, workers: int = 3, max_pending: int = 200,
+                 dm_cache_size: int = 1000):
+        self.budget = RateBudget(rate, burst)
+        self.worker_count = workers
+        self.max_pending = max_pending
+        self.dm_cache_size = dm_cache_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+        self.pending_keys: Set[Tuple[int, str]] = set()
+        self.dm_channels: "OrderedDict[int, discord.DMChannel]" = OrderedDict()
+
+    def enqueue(self, job: DMJob) -> Tuple[str, int]:
+        """Queue a job. Returns (status, position); status is 'queued', 'duplicate' or 'full'"""
+        pending_key = (job.user.id, job.key)
+        if pending_key in self.pending_keys:
+            return 'duplicate', 0
+        if len(self.pending_keys) >= self.max_pending:
+            return 'full', 0
+
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+        self.pending_keys.add(pending_key)
+        self.queue.put_nowait(job)
+        self._ensure_workers()
+        return 'queued', len(self.pending_keys)
+
+    def _ensure_workers(self):
+        self.workers = [worker for worker in self.workers if not worker.done()]
+        while len(self.workers) < self.worker_count:
+            self.workers.append(asyncio.create_task(self._worker()))
+
+    async def _dm_channel(self, user: discord.abc.User) -> discord.DMChannel:
+        channel = self.dm_channels.get(user.id) or user.dm_channel
+        if channel is None:
+            await self.budget.acquire()
+            channel = await user.create_dm()
+        self.dm_channels[user.id] = channel
+        self.dm_channels.move_to_end(user.id)
+        while len(self.dm_channels) > self.dm_cache_size:
+            self.dm_channels.popitem(last=False)
+        return channel
+
+    async def _deliver(self, job: DMJob) -> str:
+        """Send one job and return its outcome"""
+        try:
+            channel = await self._dm_channel(job.user)
+            await self.budget.acquire()
+            await channel.send(**job.build_message())
+            return 'sent'
+        except discord.Forbidden:
+            return 'forbidden'
+        except discord.HTTPException as e:
+            logger.error(f"Discord HTTP error sending DM to {job.user} ({job.user.id}): {e}")
+            return 'failed'
+        except Exception as e:
+            # e.g. the avatar file was removed, or a connection error
+            logger.error(f"Error sending DM to {job.user} ({job.user.id}): {e}")
+            return 'failed'
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                outcome = await self._deliver(job)
+                self.pending_keys.discard((job.user.id, job.key))
+                # The callback answers a deferred interaction, so it must always run
+                await job.on_done(outcome)
+            except Exception as e:
+                self.pending_keys.discard((job.user.id, job.key))
+                logger.error(f"Error in DM delivery callback: {e}")
+            finally:
+                self.queue.task_done()
+
+    def stop(self):
+        """Cancel the workers"""
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
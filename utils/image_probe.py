@@ -0,0 +1,184 @@
+import struct
+import logging
+from typing import BinaryIO, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Format name -> (extension, MIME type)
+FORMATS = {
+    'png': ('png', 'image/png'),
+    'gif': ('gif', 'image/gif'),
+    'jpeg': ('jpg', 'image/jpeg'),
+    'webp': ('webp', 'image/webp'),
+}
+
+class ProbeError(Exception):
+    """The file is truncated or its structure is invalid"""
+
+def _read(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ProbeError("unexpected end of file")
+    return data
+
+def _probe_png(f: BinaryIO) -> Dict:
+    length, chunk_type = struct.unpack('>I4s', _read(f, 8))
+    if chunk_type != b'IHDR' or length != 13:
+        raise ProbeError("missing IHDR")
+    width, height = struct.unpack('>II', _read(f, 8))
+    f.seek(length - 8 + 4, 1)  # Rest of IHDR and its CRC
+
+    # An APNG declares its frame count in acTL, which must precede IDAT
+    frames = 1
+    while True:
+        length, chunk_type = struct.unpack('>I4s', _read(f, 8))
+        if chunk_type == b'acTL':
+            frames = struct.unpack('>I', _read(f, 4))[0]
+            f.seek(length - 4 + 4, 1)
+        elif chunk_type in (b'IDAT', b'IEND'):
+            break
+        else:
+            f.seek(length + 4, 1)
+
+    # A cut-off upload is missing the trailing IEND chunk
+    f.seek(-12, 2)
+    if _read(f, 12)[4:8] != b'IEND':
+        raise ProbeError("missing IEND")
+    return {'width': width, 'height': height, 'frames': frames}
+
+def _skip_sub_blocks(f: BinaryIO):
+    while True:
+        size = _read(f, 1)[0]
+        if size == 0:
+            return
+        f.seek(size, 1)
+
+def _probe_gif(f: BinaryIO) -> Dict:
+    width, height, packed = struct.unpack('<HHB', _read(f, 5))
+    f.seek(2, 1)  # Background color index and aspect ratio
+    if packed & 0x80:
+        f.seek(3 * (2 ** ((packed & 0x07) + 1)), 1)
+
+    # Walk the block structure, counting image descriptors without decoding them
+    frames = 0
+    while True:
+        block = _read(f, 1)[0]
+        if block == 0x2C:
+            frames += 1
+            descriptor = _read(f, 9)
+            if descriptor[8] & 0x80:
+                f.seek(3 * (2 ** ((descriptor[8] & 0x07) + 1)), 1)
+            f.seek(1, 1)  # LZW minimum code size
+            _skip_sub_blocks(f)
+        elif block == 0x21:
+            f.seek(1, 1)  # Extension label
+            _skip_sub_blocks(f)
+        elif block == 0x3B:
+            break
+        else:
+            raise ProbeError(f"unknown GIF block 0x{block:02x}")
+    if not frames:
+        raise ProbeError("GIF has no frames")
+    return {'width': width, 'height': height, 'frames': frames}
+
+# Start-of-frame markers carry the dimensions (C4, C8 and CC are not SOF)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def _probe_jpeg(f: BinaryIO) -> Dict:
+    while True:
+        if _read(f, 1) != b'\xff':
+            raise ProbeError("expected JPEG marker")
+        marker = _read(f, 1)[0]
+        while marker == 0xFF:
+            marker = _read(f, 1)[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            continue  # Markers without a length
+        if marker in (0xD9, 0xDA):
+            raise ProbeError("no frame header before image data")
+        length = struct.unpack('>H', _read(f, 2))[0]
+        if marker in _JPEG_SOF:
+            _, height, width = struct.unpack('>BHH', _read(f, 5))
+            break
+        f.seek(length - 2, 1)
+
+    # A cut-off upload is missing the trailing EOI marker (zero padding after it is allowed)
+    end = f.seek(0, 2)
+    f.seek(max(0, end - 1024))
+    if not f.read().rstrip(b'\x00').endswith(b'\xff\xd9'):
+        raise ProbeError("missing EOI")
+    return {'width': width, 'height': height, 'frames': 1}
+
+def _probe_webp(f: BinaryIO) -> Dict:
+    # The RIFF header gives the exact file size, so a cut-off upload is caught here
+    f.seek(4)
+    riff_size = struct.unpack('<I', _read(f, 4))[0]
+    file_size = f.seek(0, 2)
+    if riff_size + 8 != file_size:
+        raise ProbeError(f"RIFF size {riff_size + 8} does not match file size {file_size}")
+    f.seek(12)
+    fourcc, size = struct.unpack('<4sI', _read(f, 8))
+    if fourcc == b'VP8 ':
+        frame = _read(f, 10)
+        if frame[3:6] != b'\x9d\x01\x2a':
+            raise ProbeError("bad VP8 start code")
+        width, height = struct.unpack('<HH', frame[6:10])
+        return {'width': width & 0x3FFF, 'height': height & 0x3FFF, 'frames': 1}
+    if fourcc == b'VP8L':
+        header = _read(f, 5)
+        if header[0] != 0x2F:
+            raise ProbeError("bad VP8L signature")
+        bits = struct.unpack('<I', header[1:5])[0]
+        return {'width': (bits & 0x3FFF) + 1, 'height': ((bits >> 14) & 0x3FFF) + 1, 'frames': 1}
+    if fourcc == b'VP8X':
+        header = _read(f, 10)
+        width = int.from_bytes(header[4:7], 'little') + 1
+        height = int.from_bytes(header[7:10], 'little') + 1
+        frames = 1
+        if header[0] & 0x02:
+            # Animated: count ANMF chunks by walking chunk headers only
+            f.seek(size - 10 + (size & 1), 1)
+            frames = 0
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    break
+                chunk_type, chunk_size = struct.unpack('<4sI', chunk)
+                if chunk_type == b'ANMF':
+                    frames += 1
+                f.seek(chunk_size + (chunk_size & 1), 1)
+            if not frames:
+                raise ProbeError("animated WebP has no frames")
+        return {'width': width, 'height': height, 'frames': frames}
+    raise ProbeError(f"unknown WebP chunk {fourcc!r}")
+
+def probe_image(path: str) -> Optional[Dict]:
+    """Identify an image by its magic bytes and read its dimensions and frame count.
+
+    Only headers and block boundaries are read; pixel data is never decoded.
+    Returns {'format', 'ext', 'mime', 'width', 'height', 'frames'}, or None
+    for unsupported, truncated or malformed files.
+    """
+    try:
+        with open(path, 'rb') as f:
+            magic = f.read(12)
+            if magic.startswith(b'\x89PNG\r\n\x1a\n'):
+                f.seek(8)
+                image_format, info = 'png', _probe_png(f)
+            elif magic[:6] in (b'GIF87a', b'GIF89a'):
+                f.seek(6)
+                image_format, info = 'gif', _probe_gif(f)
+            elif magic.startswith(b'\xff\xd8'):
+                f.seek(2)
+                image_format, info = 'jpeg', _probe_jpeg(f)
+            elif magic[:4] == b'RIFF' and magic[8:12] == b'WEBP':
+                image_format, info = 'webp', _probe_webp(f)
+            else:
+                return None
+    except (ProbeError, struct.error, OSError) as e:
+        logger.warning(f"Rejected image {path}: {e}")
+        return None
+
+    if info['width'] <= 0 or info['height'] <= 0:
+        return None
+    ext, mime = FORMATS[image_format]
+    return {'format': image_format, 'ext': ext, 'mime': mime, **info}
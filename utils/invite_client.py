@@ -0,0 +1,96 @@
+import logging
+import asyncio
+import time
+import aiohttp
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class RateBudget:
+    """Token bucket: ``rate`` requests per second with bursts up to ``burst``"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request may be made"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def drain(self, seconds: float):
+        """Spend the budget for the next ``seconds`` (used after a 429)"""
+        self.tokens = -seconds * self.rate
+        self.updated = time.monotonic()
+
+class InviteClient:
+    """Shared HTTP client for Discord invite lookups.
+
+    One ``aiohttp.ClientSession`` (and its connection pool) is reused for all
+    lookups instead of opening a new session per request.
+    """
+
+    API_URL = "https://discord.com/api/v10/invites/{code}?with_counts=true"
+
+    def __init__(self, requests_per_second: float = 1.0, burst: int = 5):
+        self.budget = RateBudget(requests_per_second, burst)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=10),
+                timeout=aiohttp.ClientTimeout(total=15),
+                headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+            )
+        return self.session
+
+    async def fetch_invite(self, invite_code: str) -> Tuple[int, Optional[Dict]]:
+        """Look up an invite. Returns (status, data); status is 0 on network errors"""
+        clean_invite = invite_code.strip().split('/')[-1].split('?')[0]
+        await self.budget.acquire()
+        try:
+            async with self._get_session().get(self.API_URL.format(code=clean_invite)) as response:
+                if response.status == 429:
+                    retry_after = float(response.headers.get('Retry-After', 5))
+                    self.budget.drain(retry_after)
+                    logger.warning(f"Invite lookups rate limited for {retry_after}s")
+                    return response.status, None
+                if response.status == 200:
+                    return response.status, await response.json()
+                return response.status, None
+        except Exception as e:
+            logger.error(f"Error fetching invite {clean_invite}: {e}")
+            return 0, None
+
+    async def get_server_info(self, invite_code: str) -> Optional[Dict]:
+        """Get server information from an invite code"""
+        status, data = await self.fetch_invite(invite_code)
+        if status != 200 or not data:
+            if status:
+                logger.warning(f"Failed to fetch server info, status: {status}")
+            return None
+
+        guild_info = data.get('guild', {})
+        return {
+            'name': guild_info.get('name'),
+            'icon': guild_info.get('icon'),
+            'member_count': data.get('approximate_member_count', 0),
+            'online_count': data.get('approximate_presence_count', 0),
+            'guild_id': guild_info.get('id')
+        }
+
+    async def close(self):
+        """Close the underlying session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
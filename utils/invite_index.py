@@ -0,0 +1,74 @@
+import json
+import os
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class InviteIndex:
+    """Tracks which guilds were published recently, across all guilds and types.
+
+    ``codes`` maps a normalized invite code to the guild ID it resolved to, so
+    a repeated invite is recognized without another lookup. ``guilds`` maps
+    the resolved guild ID to its last publication time, so different invites
+    to the same server are also caught. Invites that could not be resolved
+    are tracked under an ``invite:<code>`` key instead.
+    """
+
+    def __init__(self, data_file="invite_index.json", repost_window: int = 86400):
+        self.data_file = data_file
+        self.repost_window = repost_window
+        data = self._load_data()
+        self.codes: Dict[str, str] = data.get("codes", {})
+        self.guilds: Dict[str, float] = data.get("guilds", {})
+
+    def _load_data(self) -> Dict:
+        """Load invite index from JSON file"""
+        try:
+            if os.path.exists(self.data_file):
+                with open(self.data_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            return {}
+        except Exception as e:
+            logger.error(f"Error loading invite index: {e}")
+            return {}
+
+    def _save_data(self):
+        """Save invite index to JSON file, dropping expired guilds and their codes"""
+        try:
+            cutoff = time.time() - self.repost_window
+            self.guilds = {guild_id: ts for guild_id, ts in self.guilds.items() if ts >= cutoff}
+            # A code only matters while its guild is inside the repost window
+            self.codes = {code: guild_id for code, guild_id in self.codes.items() if guild_id in self.guilds}
+            with open(self.data_file, 'w', encoding='utf-8') as f:
+                json.dump({"codes": self.codes, "guilds": self.guilds}, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"Error saving invite index: {e}")
+
+    def resolved_guild(self, code: str) -> Optional[str]:
+        """Get the guild ID a code resolved to before, if known"""
+        return self.codes.get(code)
+
+    def remaining(self, guild_id: Optional[str]) -> int:
+        """Seconds until the guild may be published again (0 if allowed now)"""
+        if not guild_id or guild_id not in self.guilds:
+            return 0
+        elapsed = time.time() - self.guilds[guild_id]
+        return max(0, int(self.repost_window - elapsed))
+
+    def check_code(self, code: str) -> int:
+        """Duplicate check by invite code alone, without any HTTP call"""
+        return self.remaining(self.resolved_guild(code))
+
+    def remember(self, code: str, guild_id: Optional[str]):
+        """Cache the code -> guild resolution in memory; it is persisted once the guild is recorded"""
+        if guild_id:
+            self.codes[code] = guild_id
+
+    def record(self, code: str, guild_id: Optional[str]):
+        """Record a successful publication"""
+        guild_id = guild_id or f"invite:{code}"
+        self.codes[code] = guild_id
+        self.guilds[guild_id] = time.time()
+        self._save_data()
@@ -0,0 +1,124 @@
+import logging
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from utils.tag_ranking import static_score
+from utils.tag_store import invite_code
+
+logger = logging.getLogger(__name__)
+
+# Entry fields that change search results; last_checked alone only moves the
+# freshness bonus, which cached results pick up when their TTL runs out
+RANKING_FIELDS = ("alive", "member_count", "base_score")
+
+class InviteValidator:
+    """Background task that re-checks tag invite links in small batches.
+
+    Each pass picks the entries that were checked longest ago, looks every
+    distinct link up once through the shared ``InviteClient`` and writes
+    ``last_checked``, ``alive``, ``member_count`` and ``failures`` back onto
+    the entries, along with the time-invariant part of the ranking score
+    (``base_score``). Links that keep failing are demoted (``alive: False``)
+    and, after ``max_failures`` consecutive misses, pruned.
+    """
+
+    def __init__(self, bot, client, batch_size: int = 50, interval: float = 600,
+                 recheck_after: float = 86400, max_failures: int = 3, prune_dead: bool = True):
+        self.bot = bot
+        self.client = client
+        self.batch_size = batch_size
+        self.interval = interval
+        self.recheck_after = timedelta(seconds=recheck_after)
+        self.max_failures = max_failures
+        self.prune_dead = prune_dead
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background loop"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop the background loop"""
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                await self.run_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in invite validator: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _due_links(self) -> Dict[str, List[Dict]]:
+        """Group stale entries by link, oldest checks first, up to one batch"""
+        cutoff = (datetime.now() - self.recheck_after).isoformat()
+        stale = [entry for entry in self.bot.tag_store.entries.values() if entry.get("last_checked", "") < cutoff]
+        stale.sort(key=lambda entry: entry.get("last_checked", ""))
+
+        links: Dict[str, List[Dict]] = {}
+        for entry in stale:
+            link = entry.get("server_link", "")
+            if not invite_code(link):
+                # Not a Discord invite, so there is nothing to look up
+                continue
+            if link not in links and len(links) >= self.batch_size:
+                continue
+            links.setdefault(link, []).append(entry)
+        return links
+
+    async def run_batch(self) -> int:
+        """Validate one batch of links. Returns the number of links checked"""
+        links = self._due_links()
+        if not links:
+            return 0
+
+        checked_at = datetime.now().isoformat()
+        dead_entries = []
+        ranking_changed = False
+
+        for link, entries in links.items():
+            status, data = await self.client.fetch_invite(invite_code(link))
+            if status == 429:
+                break
+            if status == 200 and data:
+                update = {
+                    "alive": True,
+                    "failures": 0,
+                    "member_count": data.get("approximate_member_count", 0)
+                }
+            elif status == 404:
+                failures = entries[0].get("failures", 0) + 1
+                update = {"alive": False, "failures": failures}
+                if self.prune_dead and failures >= self.max_failures:
+                    dead_entries.extend(entries)
+            else:
+                # Network errors and 5xx say nothing about the invite itself
+                update = {}
+
+            for entry in entries:
+                before = [entry.get(field) for field in RANKING_FIELDS]
+                entry.update(update)
+                entry["last_checked"] = checked_at
+                entry["base_score"] = static_score(entry)
+                entry.pop("static_score", None)
+                if [entry.get(field) for field in RANKING_FIELDS] != before:
+                    ranking_changed = True
+                self.bot.tag_store.touch(entry, invalidate=False)
+
+        if ranking_changed:
+            # One invalidation of cached searches for the whole batch
+            self.bot.tag_store.generation += 1
+
+        if dead_entries:
+            for entry in dead_entries:
+                self.bot.tag_store.remove(entry)
+            logger.info(f"Pruned {len(dead_entries)} tag(s) with dead invites")
+
+        await self.bot.save_tags_data_async()
+        return len(links)
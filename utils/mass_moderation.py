@@ -0,0 +1,99 @@
+import discord
+import logging
+import asyncio
+import re
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class MassModerationReport:
+    def __init__(self, action: str, total: int):
+        self.action = action
+        self.total = total
+        self.succeeded = 0
+        self.failed: List[Tuple[discord.Member, str]] = []
+        self.skipped_hierarchy: List[discord.Member] = []
+
+class MassModerator:
+    """Kick or ban many members at once under a bounded semaphore.
+
+    The semaphore keeps the batch to a few requests in flight; rate limits
+    are left to discord.py, which waits out 429s per route bucket.
+    """
+
+    def __init__(self, concurrency: int = 5):
+        self.concurrency = concurrency
+
+    def select_targets(self, guild: discord.Guild, joined_within_minutes: Optional[int] = None,
+                       name_pattern: Optional[str] = None) -> List[discord.Member]:
+        """Select members from the cache by join time and/or name pattern.
+
+        Raises ``re.error`` if ``name_pattern`` is not a valid regex.
+        """
+        regex = re.compile(name_pattern, re.IGNORECASE) if name_pattern else None
+        joined_after = None
+        if joined_within_minutes:
+            joined_after = discord.utils.utcnow() - timedelta(minutes=joined_within_minutes)
+
+        targets = []
+        for member in guild.members:
+            if member.id == guild.owner_id:
+                continue
+            if joined_after and (not member.joined_at or member.joined_at < joined_after):
+                continue
+            if regex and not (regex.search(member.name) or regex.search(member.display_name)):
+                continue
+            targets.append(member)
+        return targets
+
+    def check_hierarchy(self, targets: List[discord.Member], actor: discord.Member,
+                        me: discord.Member) -> Tuple[List[discord.Member], List[discord.Member]]:
+        """Split targets into (allowed, skipped) using one pass over the role positions"""
+        # A member can only be acted on if both the moderator and the bot outrank them
+        ceiling = min(actor.top_role.position, me.top_role.position)
+        if actor.id == actor.guild.owner_id:
+            ceiling = me.top_role.position
+
+        allowed, skipped = [], []
+        for member in targets:
+            if member.id in (actor.id, me.id) or member.top_role.position >= ceiling:
+                skipped.append(member)
+            else:
+                allowed.append(member)
+        return allowed, skipped
+
+    async def execute(self, action: str, targets: List[discord.Member], reason: str,
+                      report: MassModerationReport) -> MassModerationReport:
+        """Run the action against every target and fill in the report"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(member: discord.Member):
+            async with semaphore:
+                error = await self._apply(action, member, reason)
+                if error:
+                    report.failed.append((member, error))
+                else:
+                    report.succeeded += 1
+
+        await asyncio.gather(*(worker(member) for member in targets))
+        logger.info(
+            f"Mass {action} finished: {report.succeeded} succeeded, {len(report.failed)} failed, "
+            f"{len(report.skipped_hierarchy)} skipped"
+        )
+        return report
+
+    async def _apply(self, action: str, member: discord.Member, reason: str) -> Optional[str]:
+        """Apply the action to one member, returning an error string on failure"""
+        try:
+            if action == "ban":
+                await member.ban(reason=reason, delete_message_seconds=0)
+            else:
+                await member.kick(reason=reason)
+            return None
+        except discord.NotFound:
+            return "not found"
+        except discord.Forbidden:
+            return "forbidden"
+        except discord.HTTPException as e:
+            return str(e.status)
@@ -0,0 +1,207 @@
+import json
+import os
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+class PublicationLog:
+    """Append-only store for published servers, segmented by month.
+
+    Records go to ``{log_dir}/{guild_id}/{YYYY-MM}.jsonl`` one line each, so
+    publishing never rewrites history. Per-guild counters are kept alongside
+    in ``counters.json`` so stats don't need to read the segments at all.
+
+    The counters also record how many bytes of each segment they cover. A
+    segment is appended before the counters are saved, so on load any bytes
+    past that point (or a segment the counters don't list) are counted from
+    disk and the two are brought back in line.
+    """
+
+    def __init__(self, log_dir="publication_logs"):
+        self.log_dir = log_dir
+        self.counters_file = os.path.join(log_dir, "counters.json")
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.counters = self._load_counters()
+        self._reconcile()
+
+    def _load_counters(self) -> Dict:
+        """Load running counters from JSON file"""
+        try:
+            if os.path.exists(self.counters_file):
+                with open(self.counters_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            return {}
+        except Exception as e:
+            logger.error(f"Error loading publication counters: {e}")
+            return {}
+
+    def _save_counters(self):
+        """Save running counters to JSON file"""
+        try:
+            temp_path = self.counters_file + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.counters, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, self.counters_file)
+        except Exception as e:
+            logger.error(f"Error saving publication counters: {e}")
+
+    def _count(self, guild_counters: Dict, month: str, record: Dict):
+        segment = guild_counters["segments"].setdefault(month, {})
+        server_type = record.get('type', 'server')
+        segment[server_type] = segment.get(server_type, 0) + 1
+        guild_counters["totals"][server_type] = guild_counters["totals"].get(server_type, 0) + 1
+
+    def _reconcile(self):
+        """Rebuild segment membership from the files on disk"""
+        changed = False
+        for guild_id in os.listdir(self.log_dir):
+            guild_dir = os.path.join(self.log_dir, guild_id)
+            if not os.path.isdir(guild_dir):
+                continue
+            guild_counters = self._guild_counters(guild_id)
+            if "sizes" not in guild_counters:
+                # Counters from before sizes were tracked cover their listed segments fully
+                guild_counters["sizes"] = {
+                    month: os.path.getsize(self._segment_path(guild_id, month))
+                    for month in guild_counters["segments"]
+                    if os.path.exists(self._segment_path(guild_id, month))
+                }
+                changed = True
+
+            months = {name[:-len(".jsonl")] for name in os.listdir(guild_dir) if name.endswith(".jsonl")}
+            for month in sorted(months):
+                try:
+                    changed |= self._count_tail(guild_id, guild_counters, month)
+                except Exception as e:
+                    logger.error(f"Error reconciling publication segment {guild_id}/{month}: {e}")
+            for month in [m for m in guild_counters["segments"] if m not in months]:
+                # Removed by compaction before the counters were saved; totals are kept
+                del guild_counters["segments"][month]
+                guild_counters["sizes"].pop(month, None)
+                changed = True
+
+        if changed:
+            self._save_counters()
+
+    def _count_tail(self, guild_id: str, guild_counters: Dict, month: str) -> bool:
+        """Count records appended to a segment after the counters were last saved"""
+        offset = guild_counters["sizes"].get(month, 0) if month in guild_counters["segments"] else 0
+        with open(self._segment_path(guild_id, month), 'rb') as f:
+            f.seek(offset)
+            tail = f.read()
+        # An unterminated final line is not a complete record
+        end = tail.rfind(b"\n") + 1
+        known = month in guild_counters["segments"] and month in guild_counters["sizes"]
+        if known and not end:
+            return False
+        recovered = 0
+        for line in tail[:end].splitlines():
+            if line.strip():
+                try:
+                    self._count(guild_counters, month, json.loads(line))
+                    recovered += 1
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable line in publication segment {guild_id}/{month}")
+        guild_counters["segments"].setdefault(month, {})
+        guild_counters["sizes"][month] = offset + end
+        if recovered:
+            logger.info(f"Recovered {recovered} uncounted publication record(s) for guild {guild_id} ({month})")
+        return True
+
+    def _segment_path(self, guild_id: str, month: str) -> str:
+        return os.path.join(self.log_dir, guild_id, f"{month}.jsonl")
+
+    def _guild_counters(self, guild_id: str) -> Dict:
+        if guild_id not in self.counters:
+            self.counters[guild_id] = {"totals": {}, "segments": {}, "sizes": {}}
+        return self.counters[guild_id]
+
+    def _write(self, guild_id: str, records: List[Dict]):
+        """Append records to their month segments and bump the counters"""
+        by_month: Dict[str, List[Dict]] = {}
+        for record in records:
+            month = record.get('published_at', datetime.now().isoformat())[:7]
+            by_month.setdefault(month, []).append(record)
+
+        os.makedirs(os.path.join(self.log_dir, guild_id), exist_ok=True)
+        guild_counters = self._guild_counters(guild_id)
+
+        for month, month_records in by_month.items():
+            path = self._segment_path(guild_id, month)
+            with open(path, 'a', encoding='utf-8') as f:
+                for record in month_records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+            for record in month_records:
+                self._count(guild_counters, month, record)
+            guild_counters.setdefault("sizes", {})[month] = os.path.getsize(path)
+
+    def append(self, guild_id: str, record: Dict):
+        """Append a single publication record"""
+        try:
+            self._write(guild_id, [record])
+            self._save_counters()
+        except Exception as e:
+            logger.error(f"Error appending publication record: {e}")
+
+    def import_legacy(self, guild_id: str, records: List[Dict]):
+        """Move an old in-config ``published_servers`` list into the log.
+
+        Records already in the log (same link and publish time) are skipped, so
+        re-running after an interrupted migration does not duplicate them.
+        """
+        if not records:
+            return
+        existing = {(record.get('link'), record.get('published_at')) for record in self.iter_records(guild_id)}
+        records = [record for record in records if (record.get('link'), record.get('published_at')) not in existing]
+        if not records:
+            return
+        self._write(guild_id, records)
+        self._save_counters()
+        logger.info(f"Migrated {len(records)} publication records for guild {guild_id}")
+
+    def get_counts(self, guild_id: str) -> Dict[str, int]:
+        """Get lifetime publication counts by type for a guild"""
+        return dict(self.counters.get(guild_id, {}).get("totals", {}))
+
+    def iter_records(self, guild_id: str) -> Iterator[Dict]:
+        """Iterate over retained records for a guild, oldest month first"""
+        for month in sorted(self.counters.get(guild_id, {}).get("segments", {})):
+            path = self._segment_path(guild_id, month)
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def compact(self, retention_months: int):
+        """Drop month segments older than the retention window.
+
+        Lifetime totals are kept, only the raw records are removed.
+        """
+        if not retention_months:
+            return
+
+        now = datetime.now()
+        month_index = now.year * 12 + now.month - 1 - retention_months
+        cutoff = f"{month_index // 12:04d}-{month_index % 12 + 1:02d}"
+
+        removed = 0
+        for guild_id, guild_counters in self.counters.items():
+            for month in [m for m in guild_counters.get("segments", {}) if m < cutoff]:
+                path = self._segment_path(guild_id, month)
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                    del guild_counters["segments"][month]
+                    guild_counters.get("sizes", {}).pop(month, None)
+                    removed += 1
+                except Exception as e:
+                    logger.error(f"Error compacting publication segment {path}: {e}")
+
+        if removed:
+            self._save_counters()
+            logger.info(f"Compacted {removed} publication log segment(s) older than {cutoff}")
@@ -0,0 +1,87 @@
+import logging
+import asyncio
+import time
+from collections import deque
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+class PublishJob:
+    def __init__(self, interaction, channel, server_link: str, server_type: str):
+        self.interaction = interaction
+        self.channel = channel
+        self.server_link = server_link
+        self.server_type = server_type
+        self.invite_code = None
+        self.queued_at = time.monotonic()
+
+class PublishQueue:
+    """Serializes publications per target channel.
+
+    Each channel gets its own worker that sends at most ``bucket_size``
+    messages per ``bucket_window`` seconds, matching Discord's per-channel
+    message bucket, so concurrent publishers queue up instead of hitting 429s.
+    Workers exit after ``idle_timeout`` seconds without work.
+    """
+
+    def __init__(self, handler, bucket_size: int = 5, bucket_window: float = 5.0, idle_timeout: float = 300.0):
+        self.handler = handler
+        self.bucket_size = bucket_size
+        self.bucket_window = bucket_window
+        self.idle_timeout = idle_timeout
+        self.queues: Dict[int, asyncio.Queue] = {}
+        self.workers: Dict[int, asyncio.Task] = {}
+        self.in_flight: Dict[int, int] = {}
+
+    def enqueue(self, job: PublishJob) -> int:
+        """Queue a job for its channel and return its 1-based position"""
+        channel_id = job.channel.id
+        queue = self.queues.get(channel_id)
+        if queue is None:
+            queue = self.queues[channel_id] = asyncio.Queue()
+
+        queue.put_nowait(job)
+
+        worker = self.workers.get(channel_id)
+        if worker is None or worker.done():
+            self.workers[channel_id] = asyncio.create_task(self._worker(channel_id, queue))
+
+        return queue.qsize() + self.in_flight.get(channel_id, 0)
+
+    def pending(self, channel_id: int) -> int:
+        """Number of jobs waiting or being sent for a channel"""
+        queue = self.queues.get(channel_id)
+        return (queue.qsize() if queue else 0) + self.in_flight.get(channel_id, 0)
+
+    async def _worker(self, channel_id: int, queue: asyncio.Queue):
+        """Send queued publications for one channel, pacing by its bucket"""
+        sent_times = deque(maxlen=self.bucket_size)
+        try:
+            while True:
+                try:
+                    job = await asyncio.wait_for(queue.get(), timeout=self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if queue.empty():
+                        break
+                    continue
+
+                # Wait until the oldest send in the window has expired
+                if len(sent_times) == self.bucket_size:
+                    wait = self.bucket_window - (time.monotonic() - sent_times[0])
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+
+                self.in_flight[channel_id] = 1
+                try:
+                    await self.handler(job)
+                except Exception as e:
+                    logger.error(f"Error delivering publication to channel {channel_id}: {e}")
+                finally:
+                    self.in_flight[channel_id] = 0
+                    sent_times.append(time.monotonic())
+                    queue.task_done()
+        finally:
+            self.workers.pop(channel_id, None)
+            self.in_flight.pop(channel_id, None)
+            if queue.empty():
+                self.queues.pop(channel_id, None)
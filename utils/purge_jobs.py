@@ -0,0 +1,145 @@
+import discord
+import logging
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class PurgeJob:
+    def __init__(self, channel: discord.abc.Messageable, amount: int, requested_by: int):
+        self.channel = channel
+        self.amount = amount
+        self.requested_by = requested_by
+        self.scanned = 0
+        self.bulk_deleted = 0
+        self.single_deleted = 0
+        self.failed = 0
+        self.cancelled = False
+        self.finished = False
+        self.started_at = datetime.now()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def deleted(self) -> int:
+        """Total number of messages deleted so far"""
+        return self.bulk_deleted + self.single_deleted
+
+    def cancel(self):
+        """Ask the job to stop after the current request"""
+        self.cancelled = True
+
+class PurgeJobManager:
+    """Runs large channel purges as background jobs, one per channel.
+
+    Messages younger than the bulk-delete cutoff are removed 100 at a time
+    with ``delete_messages``; older ones can only be deleted one by one, so
+    they go through a throttled lane instead.
+    """
+
+    def __init__(self, bulk_max_age_days: int = 14, single_delete_delay: float = 1.2,
+                 progress_interval: float = 3.0):
+        self.jobs: Dict[int, PurgeJob] = {}
+        self.bulk_max_age = timedelta(days=bulk_max_age_days)
+        self.single_delete_delay = single_delete_delay
+        self.progress_interval = progress_interval
+
+    def get_job(self, channel_id: int) -> Optional[PurgeJob]:
+        """Get the running job for a channel, if any"""
+        job = self.jobs.get(channel_id)
+        if job and not job.finished:
+            return job
+        return None
+
+    def start_job(self, channel, amount: int, requested_by: int, before=None,
+                  progress_callback=None) -> PurgeJob:
+        """Create a purge job for a channel and schedule it on the loop"""
+        job = PurgeJob(channel, amount, requested_by)
+        self.jobs[channel.id] = job
+        job.task = asyncio.create_task(self._run(job, before, progress_callback))
+        return job
+
+    async def _run(self, job: PurgeJob, before, progress_callback):
+        """Page through channel history and delete until the amount is reached"""
+        last_report = 0.0
+        try:
+            cursor = before
+            while not job.cancelled and job.scanned < job.amount:
+                page_size = min(100, job.amount - job.scanned)
+                page = [message async for message in job.channel.history(limit=page_size, before=cursor)]
+                if not page:
+                    break
+
+                cursor = page[-1]
+                job.scanned += len(page)
+
+                # Bulk delete is rejected by Discord for messages older than 14 days
+                cutoff = discord.utils.utcnow() - self.bulk_max_age + timedelta(minutes=1)
+                recent = [m for m in page if m.created_at > cutoff]
+                old = [m for m in page if m.created_at <= cutoff]
+
+                await self._bulk_delete(job, recent)
+                await self._single_delete(job, old, progress_callback)
+
+                if progress_callback and time.monotonic() - last_report >= self.progress_interval:
+                    last_report = time.monotonic()
+                    await self._report(job, progress_callback)
+        except Exception as e:
+            logger.error(f"Error in purge job for channel {job.channel.id}: {e}")
+        finally:
+            job.finished = True
+            # The final state removes the Cancel button, so it gets a second try
+            if progress_callback and not await self._report(job, progress_callback):
+                await asyncio.sleep(self.progress_interval)
+                await self._report(job, progress_callback)
+            logger.info(
+                f"Purge job in channel {job.channel.id} finished: {job.deleted} deleted, "
+                f"{job.failed} failed, cancelled={job.cancelled}"
+            )
+
+    async def _bulk_delete(self, job: PurgeJob, messages: List[discord.Message]):
+        """Delete recent messages in a single bulk request"""
+        if job.cancelled or not messages:
+            return
+        try:
+            if len(messages) == 1:
+                await messages[0].delete()
+            else:
+                await job.channel.delete_messages(messages)
+            job.bulk_deleted += len(messages)
+        except discord.NotFound:
+            # Someone else already removed part of the batch; retry one by one
+            await self._single_delete(job, messages, None)
+        except discord.HTTPException as e:
+            job.failed += len(messages)
+            logger.warning(f"Bulk delete failed in channel {job.channel.id}: {e}")
+
+    async def _single_delete(self, job: PurgeJob, messages: List[discord.Message], progress_callback):
+        """Delete old messages one at a time, pacing the requests"""
+        last_report = time.monotonic()
+        for message in messages:
+            if job.cancelled:
+                return
+            try:
+                await message.delete()
+                job.single_deleted += 1
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                job.failed += 1
+                logger.warning(f"Failed to delete message {message.id}: {e}")
+            await asyncio.sleep(self.single_delete_delay)
+
+            if progress_callback and time.monotonic() - last_report >= self.progress_interval:
+                last_report = time.monotonic()
+                await self._report(job, progress_callback)
+
+    async def _report(self, job: PurgeJob, progress_callback) -> bool:
+        """Forward progress to the caller without letting it break the job"""
+        try:
+            await progress_callback(job)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to report purge progress: {e}")
+            return False
@@ -0,0 +1,51 @@
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+class SearchCache:
+    """LRU cache of search results tagged with the store generation.
+
+    A hit is only served when it was computed at the store's current
+    generation, so any add/remove invalidates every cached query at once
+    without having to work out which queries it affected.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, generation: int) -> Optional[Any]:
+        """Cached value for ``key`` at ``generation``, or None"""
+        cached = self.entries.get(key)
+        if cached is not None:
+            cached_generation, expires_at, value = cached
+            if cached_generation == generation and expires_at > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, generation: int, value: Any):
+        """Store a value computed at ``generation``, evicting the least recently used"""
+        self.entries[key] = (generation, time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and the hit rate since startup"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries)
+        }
@@ -0,0 +1,86 @@
+import heapq
+import math
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# How well the tag text matches the query
+MATCH_SCORES = {
+    'exact': 100.0,
+    'prefix': 60.0,
+    'substring': 30.0,
+    'fuzzy': 20.0,
+}
+
+# Weight of the query-independent part of the score
+MEMBER_WEIGHT = 8.0  # Per order of magnitude of members
+FRESH_BONUS = 15.0  # Link verified alive within FRESH_DAYS
+FRESH_DAYS = 7
+UNCHECKED_PENALTY = -5.0
+
+def match_score(entry_tag: str, query: str) -> Optional[float]:
+    """Score how the (already normalized) tag matches the query, None if it doesn't"""
+    if entry_tag == query:
+        return MATCH_SCORES['exact']
+    if entry_tag.startswith(query):
+        return MATCH_SCORES['prefix']
+    if query in entry_tag:
+        return MATCH_SCORES['substring']
+    return None
+
+def static_score(entry: Dict) -> float:
+    """Query-independent, time-invariant score from the cached member count.
+
+    This only changes when the invite validator updates the entry, so it is
+    stored on the entry as ``base_score`` instead of recomputed per search.
+    The freshness bonus decays with time and is added at query time by
+    ``freshness_score``.
+    """
+    score = MEMBER_WEIGHT * math.log10(entry.get('member_count', 0) + 1)
+    if not entry.get('last_checked'):
+        score += UNCHECKED_PENALTY
+    return score
+
+def freshness_score(entry: Dict, now: datetime) -> float:
+    """Bonus for a link verified alive recently, fading to zero over FRESH_DAYS"""
+    last_checked = entry.get('last_checked')
+    if not last_checked or not entry.get('alive'):
+        return 0.0
+    try:
+        age_days = (now - datetime.fromisoformat(last_checked)).total_seconds() / 86400
+    except ValueError:
+        return 0.0
+    if age_days > FRESH_DAYS:
+        return 0.0
+    return FRESH_BONUS * (1 - max(age_days, 0) / FRESH_DAYS)
+
+def top_k(entries: Iterable[Tuple[str, Dict]], query: str, k: int,
+          fuzzy: bool = False) -> Tuple[List[Dict], int]:
+    """Pick the best k entries for a query, one per server link.
+
+    ``entries`` yields (normalized_tag, entry) pairs. With ``fuzzy`` set,
+    entries that don't contain the query (typo matches) still score as
+    fuzzy matches. Returns the ranked entries and the number of distinct
+    links that matched.
+    """
+    now = datetime.now()
+    best_per_link: Dict[str, Tuple[float, Dict]] = {}
+    for entry_tag, entry in entries:
+        score = match_score(entry_tag, query)
+        if score is None:
+            if not fuzzy:
+                continue
+            score = MATCH_SCORES['fuzzy']
+        # Older entries carry a ``static_score`` with the bonus baked in; it is ignored
+        if 'base_score' in entry:
+            score += entry['base_score']
+        else:
+            score += static_score(entry)
+        score += freshness_score(entry, now)
+
+        link = entry.get('server_link', '')
+        current = best_per_link.get(link)
+        if current is None or score > current[0]:
+            best_per_link[link] = (score, entry)
+
+    ranked = heapq.nlargest(k, best_per_link.values(), key=lambda item: item[0])
+    return [entry for _, entry in ranked], len(best_per_link)
@@ -0,0 +1,368 @@
+import json
+import os
+import re
+import uuid
+import logging
+import bisect
+import heapq
+import itertools
+from typing import Dict, Iterator, List, Optional, Tuple
+from utils.arabic_text import normalize_text, max_typos, BKTree
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_TAGS_ID = "global_tags"
+
+_INVITE_CODE = re.compile(r'(?:discord\.gg|discord(?:app)?\.com/invite)/([A-Za-z0-9-]+)', re.IGNORECASE)
+
+def invite_code(link: str) -> Optional[str]:
+    """The invite code in a Discord invite link, or None for any other link"""
+    match = _INVITE_CODE.search(link)
+    return match.group(1) if match else None
+
+def normalize_link(link: str) -> str:
+    """Canonical form of a server link; invite codes are case-sensitive and kept as-is"""
+    match = _INVITE_CODE.search(link)
+    if match:
+        return f"discord.gg/{match.group(1)}"
+    return link.strip().rstrip('/').casefold()
+
+def _remove_id(index: Dict[str, Dict[str, Dict]], key: str, entry_id: str):
+    """Remove ``entry_id`` from ``index[key]``, dropping empty buckets"""
+    bucket = index.get(key)
+    if bucket is None:
+        return
+    bucket.pop(entry_id, None)
+    if not bucket:
+        del index[key]
+
+class TagStore:
+    """Keyed storage and in-memory indexes for the global tags in ``bot.tags_data``.
+
+    Entries live in ``tags_data["global_tags"]["entries"]``, a dict keyed by
+    a stable ``id``, so inserts and deletes don't shift or rescan a list;
+    the legacy ``tags`` list is migrated on load. A second key on
+    (normalized tag, normalized link) makes the duplicate check a single
+    lookup.
+
+    Every entry is indexed under its normalized tag (see ``normalize_text``),
+    and the distinct normalized tags are kept both sorted (for paging) and in
+    a BK-tree for typo-tolerant lookups. A posting list per ``added_by`` user
+    makes per-user queries proportional to that user's own tags. Buckets are
+    keyed by entry id, so removal is a dict pop; keys left without entries
+    stay in ``sorted_keys`` and the BK-tree and are skipped on read until the
+    next rebuild. Mutations must go through ``add``/``remove``/``touch`` to
+    keep the indexes in sync.
+
+    With a ``journal_path``, mutations are also queued as JSON lines and
+    appended by ``flush``; the full snapshot only needs rewriting once the
+    journal grows past ``compact_after`` operations. While a snapshot is
+    being written, the journal it covers is set aside as ``.compacting`` so
+    new operations keep going to a fresh journal.
+    """
+
+    def __init__(self, tags_data: Dict, journal_path: Optional[str] = None, compact_after: int = 500):
+        self.tags_data = tags_data
+        self.journal_path = journal_path
+        self.compact_after = compact_after
+        self.pending_ops: List[Dict] = []
+        self.journal_ops = 0
+        # Set when the on-disk snapshot is outdated regardless of the journal
+        self.snapshot_due = False
+        self.compacting = False
+        # Bumped on every mutation so cached query results can be invalidated
+        self.generation = 0
+        self._migrate()
+        self._replay_journal()
+        self.rebuild()
+
+    @property
+    def entries(self) -> Dict[str, Dict]:
+        """Entries keyed by id, created on first use"""
+        if GLOBAL_TAGS_ID not in self.tags_data:
+            self.tags_data[GLOBAL_TAGS_ID] = {
+                "server_name": "Global Tags Database",
+                "entries": {}
+            }
+        return self.tags_data[GLOBAL_TAGS_ID].setdefault("entries", {})
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _migrate(self):
+        """Move a legacy ``tags`` list into the keyed ``entries`` dict"""
+        global_tags = self.tags_data.get(GLOBAL_TAGS_ID)
+        if not global_tags or "tags" not in global_tags:
+            return
+        entries = self.entries
+        for entry in global_tags.pop("tags"):
+            entry.setdefault("id", uuid.uuid4().hex)
+            entries[entry["id"]] = entry
+        self.snapshot_due = True
+        logger.info(f"Migrated {len(entries)} tags to keyed storage")
+
+    @property
+    def compacting_path(self) -> str:
+        return self.journal_path + ".compacting"
+
+    def _replay_journal(self):
+        """Apply journaled operations written since the last snapshot"""
+        if not self.journal_path:
+            return
+        if os.path.exists(self.compacting_path):
+            # An interrupted snapshot write; its operations come first
+            self.snapshot_due = True
+        entries = self.entries
+        for path in (self.compacting_path, self.journal_path):
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            op = json.loads(line)
+                        except json.JSONDecodeError:
+                            # A torn final line from an interrupted append
+                            logger.warning(f"Skipping unreadable line in {path}")
+                            continue
+                        if op["op"] == "remove":
+                            entries.pop(op["id"], None)
+                        else:
+                            entries[op["entry"]["id"]] = op["entry"]
+                        self.journal_ops += 1
+            except Exception as e:
+                logger.error(f"Error replaying tag journal {path}: {e}")
+
+    def rebuild(self):
+        """Rebuild all indexes from the stored entries"""
+        self.by_key: Dict[str, Dict[str, Dict]] = {}
+        self.by_pair: Dict[Tuple[str, str], Dict] = {}
+        self.by_user: Dict[str, Dict[str, Dict]] = {}
+        self.fuzzy_index = BKTree()
+        for entry in self.entries.values():
+            self._index(entry, keep_sorted=False)
+        self.sorted_keys: List[str] = sorted(self.by_key)
+        self.stale_keys = 0
+
+    @staticmethod
+    def pair_key(tag: str, server_link: str) -> Tuple[str, str]:
+        """The (normalized tag, normalized link) key used for duplicate checks"""
+        return normalize_text(tag), normalize_link(server_link)
+
+    def _index(self, entry: Dict, keep_sorted: bool = True):
+        key = normalize_text(entry.get("tag", ""))
+        bucket = self.by_key.get(key)
+        if bucket is None:
+            bucket = self.by_key[key] = {}
+            self.fuzzy_index.add(key)
+            if keep_sorted:
+                i = bisect.bisect_left(self.sorted_keys, key)
+                if i < len(self.sorted_keys) and self.sorted_keys[i] == key:
+                    # A stale key left by an earlier removal is live again
+                    self.stale_keys -= 1
+                else:
+                    self.sorted_keys.insert(i, key)
+        bucket[entry["id"]] = entry
+        self.by_pair.setdefault(self.pair_key(entry.get("tag", ""), entry.get("server_link", "")), entry)
+        self.by_user.setdefault(entry.get("added_by", ""), {})[entry["id"]] = entry
+
+    def _unindex(self, entry: Dict):
+        pair = self.pair_key(entry.get("tag", ""), entry.get("server_link", ""))
+        if self.by_pair.get(pair) is entry:
+            del self.by_pair[pair]
+        _remove_id(self.by_user, entry.get("added_by", ""), entry["id"])
+
+        key = normalize_text(entry.get("tag", ""))
+        _remove_id(self.by_key, key, entry["id"])
+        if key not in self.by_key:
+            # The key stays in sorted_keys and the BK-tree; readers skip it
+            self.stale_keys += 1
+            if self.stale_keys > len(self.sorted_keys) // 2:
+                self.sorted_keys = sorted(self.by_key)
+                self.stale_keys = 0
+
+    def add(self, entry: Dict) -> Dict:
+        """Store an entry under a new id and index it"""
+        entry.setdefault("id", uuid.uuid4().hex)
+        self.entries[entry["id"]] = entry
+        self._index(entry)
+        self.generation += 1
+        self._queue({"op": "add", "entry": entry})
+        return entry
+
+    def remove(self, entry: Dict) -> bool:
+        """Remove an entry from storage and its indexes"""
+        entry_id = entry.get("id")
+        if self.entries.get(entry_id) is not entry:
+            return False
+        del self.entries[entry_id]
+        self._unindex(entry)
+        self.generation += 1
+        self._queue({"op": "remove", "id": entry_id})
+        return True
+
+    def touch(self, entry: Dict, invalidate: bool = True):
+        """Record an in-place update of an entry's non-indexed fields.
+
+        Pass ``invalidate=False`` when the change cannot affect search
+        results, or when the caller bumps ``generation`` once for a batch.
+        """
+        if self.entries.get(entry.get("id")) is entry:
+            if invalidate:
+                self.generation += 1
+            self._queue({"op": "update", "entry": entry})
+
+    def get(self, entry_id: str) -> Optional[Dict]:
+        """Entry by id"""
+        return self.entries.get(entry_id)
+
+    def find_pair(self, tag: str, server_link: str) -> Optional[Dict]:
+        """The entry with this tag on this server link, if any"""
+        return self.by_pair.get(self.pair_key(tag, server_link))
+
+    def _queue(self, op: Dict):
+        if self.journal_path:
+            self.pending_ops.append(op)
+
+    def flush(self) -> bool:
+        """Append queued operations to the journal.
+
+        Returns True when the journal has grown enough that the caller should
+        write a full snapshot, bracketed by ``begin_compaction`` and
+        ``finish_compaction``.
+        """
+        if not self.journal_path:
+            return True
+        if self.pending_ops:
+            # Entries are serialized here, so several updates to one entry
+            # before a flush all carry its latest state
+            lines = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in self.pending_ops)
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            self.journal_ops += len(self.pending_ops)
+            self.pending_ops = []
+        if self.compacting:
+            return False
+        return self.snapshot_due or self.journal_ops >= self.compact_after
+
+    def begin_compaction(self):
+        """Set the journal aside before a snapshot of the current state is written.
+
+        Call right after serializing the snapshot, with no mutation in
+        between; later operations go to a fresh journal.
+        """
+        self.compacting = True
+        self.journal_ops = 0
+        self.snapshot_due = False
+        if not self.journal_path or not os.path.exists(self.journal_path):
+            return
+        if os.path.exists(self.compacting_path):
+            # A previous snapshot write failed; keep its operations too
+            with open(self.journal_path, 'r', encoding='utf-8') as source, \
+                    open(self.compacting_path, 'a', encoding='utf-8') as target:
+                target.write(source.read())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self.compacting_path)
+
+    def finish_compaction(self, written: bool = True):
+        """Drop the set-aside journal once the snapshot is on disk"""
+        self.compacting = False
+        if not written:
+            self.snapshot_due = True
+            return
+        if self.journal_path and os.path.exists(self.compacting_path):
+            os.remove(self.compacting_path)
+
+    def find(self, tag: str) -> List[Dict]:
+        """Entries whose normalized tag equals the normalized query"""
+        return list(self.by_key.get(normalize_text(tag), {}).values())
+
+    def user_tags(self, user_id: str) -> List[Dict]:
+        """Entries added by a user"""
+        return list(self.by_user.get(user_id, {}).values())
+
+    def count_user_tags(self, user_id: str) -> int:
+        """Number of entries added by a user"""
+        return len(self.by_user.get(user_id, {}))
+
+    def iter_normalized(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (normalized_tag, entry) pairs"""
+        for key, entries in self.by_key.items():
+            for entry in entries.values():
+                yield key, entry
+
+    def iter_fuzzy(self, query: str) -> Iterator[Tuple[str, Dict]]:
+        """Yield (normalized_tag, entry) pairs within the typo budget of the query"""
+        query = normalize_text(query)
+        tolerance = max_typos(query)
+        if not tolerance:
+            return
+        for _, key in self.fuzzy_index.search(query, tolerance):
+            for entry in self.by_key.get(key, {}).values():
+                yield key, entry
+
+    def suggest(self, prefix: str, limit: int = 25, popularity: Optional[Dict[str, int]] = None,
+                scan_limit: int = 2000) -> List[str]:
+        """Tags starting with the normalized prefix, most used first.
+
+        Candidates come from a bisect into ``sorted_keys`` and at most
+        ``scan_limit`` keys are weighed, so the cost is bounded no matter how
+        many tags share a short prefix. A key's weight is how many entries
+        use it plus how often it was searched (``popularity``).
+        """
+        popularity = popularity or {}
+        prefix = normalize_text(prefix)
+        if prefix:
+            start = bisect.bisect_left(self.sorted_keys, prefix)
+            candidates = []
+            for key in self.sorted_keys[start:start + scan_limit]:
+                if not key.startswith(prefix):
+                    break
+                if key in self.by_key:
+                    candidates.append(key)
+        else:
+            # Nothing typed yet: offer the most searched tags
+            candidates = [key for key in popularity if key in self.by_key]
+
+        ranked = heapq.nlargest(
+            limit, candidates,
+            key=lambda key: len(self.by_key[key]) + popularity.get(key, 0)
+        )
+        # Show the spelling of the first entry rather than the normalized key
+        return [next(iter(self.by_key[key].values())).get("tag", key) for key in ranked]
+
+    def page_after(self, cursor: Optional[Tuple[str, int]], limit: int) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+        """Read up to ``limit`` entries in tag order starting at ``cursor``.
+
+        A cursor is (normalized_tag, offset_within_tag); ``None`` starts at the
+        beginning. Returns the entries and the cursor for the next page, or
+        ``None`` when the end is reached. Only the keys on the page are visited.
+        """
+        key, offset = cursor if cursor else ("", 0)
+        i = bisect.bisect_left(self.sorted_keys, key)
+        if i < len(self.sorted_keys) and self.sorted_keys[i] != key:
+            offset = 0
+
+        page = []
+        while i < len(self.sorted_keys):
+            current_key = self.sorted_keys[i]
+            bucket = self.by_key.get(current_key)
+            if not bucket:
+                # Stale key whose entries were all removed
+                i += 1
+                offset = 0
+                continue
+            take = list(itertools.islice(bucket.values(), offset, offset + limit - len(page)))
+            page.extend(take)
+            offset += len(take)
+            if len(page) == limit:
+                if offset < len(bucket):
+                    return page, (current_key, offset)
+                i += 1
+                while i < len(self.sorted_keys) and self.sorted_keys[i] not in self.by_key:
+                    i += 1
+                return page, (self.sorted_keys[i], 0) if i < len(self.sorted_keys) else None
+            i += 1
+            offset = 0
+        return page, None
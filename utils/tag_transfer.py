@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+import logging
+from typing import Dict, IO, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = [
+    "id", "tag", "server_link", "server_name", "description",
+    "added_by", "added_at", "added_from_guild"
+]
+
+def detect_format(filename: str) -> Optional[str]:
+    """'csv' or 'ndjson' from a file name, None if unsupported"""
+    name = filename.lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    return None
+
+def export_tags(entries: Iterable[Dict], fp: IO[bytes], fmt: str) -> int:
+    """Write entries to a binary file one row at a time. Returns the row count"""
+    text = io.TextIOWrapper(fp, encoding="utf-8", newline="", write_through=True)
+    count = 0
+    try:
+        if fmt == "csv":
+            writer = csv.DictWriter(text, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for entry in entries:
+                writer.writerow(entry)
+                count += 1
+        else:
+            for entry in entries:
+                row = {field: entry[field] for field in EXPORT_FIELDS if field in entry}
+                text.write(json.dumps(row, ensure_ascii=False) + "\n")
+                count += 1
+    finally:
+        # Leave the underlying file open for the caller to upload
+        text.detach()
+    return count
+
+def iter_import_rows(fp: IO[str], fmt: str) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Yield (line_number, row, error) for each record of an import file"""
+    if fmt == "csv":
+        reader = csv.DictReader(fp)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for line_number, line in enumerate(fp, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"JSON غير صالح: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "السطر ليس كائن JSON"
+            continue
+        yield line_number, row, None
+
+def validate_row(row: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+    """Clean an imported row with the same rules as /اضافة. Returns (entry, error)"""
+    tag = str(row.get("tag") or "").strip()
+    if len(tag) < 2 or len(tag) > 50:
+        return None, "طول التاق يجب أن يكون بين 2 و 50 حرف"
+
+    server_link = str(row.get("server_link") or "").strip()
+    if not (server_link.startswith("https://discord.gg/") or server_link.startswith("discord.gg/")):
+        return None, "رابط سيرفر غير صحيح"
+    if not server_link.startswith("https://"):
+        server_link = "https://" + server_link
+
+    entry = {
+        "tag": tag,
+        "server_link": server_link,
+        "server_name": str(row.get("server_name") or "غير محدد"),
+        "description": str(row.get("description") or ""),
+    }
+    for field in ("id", "added_by", "added_at", "added_from_guild"):
+        if row.get(field):
+            entry[field] = str(row[field])
+    return entry, None
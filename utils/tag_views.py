@@ -0,0 +1,96 @@
+import discord
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class SortedIndexPager:
+    """Pages through the whole tag store using index cursors"""
+
+    def __init__(self, tag_store, per_page: int):
+        self.tag_store = tag_store
+        self.per_page = per_page
+        # Start cursor of every page visited so far; Prev/Next only move by one
+        self.cursors: List[Optional[Tuple[str, int]]] = [None]
+
+    @property
+    def total(self) -> int:
+        # Read live, since tags can be added or removed while a list is open
+        return len(self.tag_store)
+
+    def clamp(self, number: int) -> int:
+        """The nearest page at or before ``number`` that has a recorded cursor"""
+        number = min(number, len(self.cursors) - 1, max(0, (self.total - 1) // self.per_page))
+        # A None cursor past page 0 marks the end of the store, not a start
+        while number > 0 and self.cursors[number] is None:
+            number -= 1
+        return max(0, number)
+
+    def page(self, number: int) -> List[Dict]:
+        number = self.clamp(number)
+        entries, next_cursor = self.tag_store.page_after(self.cursors[number], self.per_page)
+        del self.cursors[number + 1:]
+        self.cursors.append(next_cursor)
+        return entries
+
+class ListPager:
+    """Pages through an already filtered result list"""
+
+    def __init__(self, entries: List[Dict], per_page: int):
+        self.entries = entries
+        self.per_page = per_page
+        self.total = len(entries)
+
+    def clamp(self, number: int) -> int:
+        return min(max(0, number), max(0, (self.total - 1) // self.per_page))
+
+    def page(self, number: int) -> List[Dict]:
+        start = self.clamp(number) * self.per_page
+        return self.entries[start:start + self.per_page]
+
+class TagListView(discord.ui.View):
+    def __init__(self, owner_id: int, pager, build_embed):
+        super().__init__(timeout=300)
+        self.owner_id = owner_id
+        self.pager = pager
+        self.build_embed = build_embed
+        self.page_number = 0
+        self.update_buttons()
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, (self.pager.total + self.pager.per_page - 1) // self.pager.per_page)
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.page_number == 0
+        self.next_page.disabled = self.page_number >= self.total_pages - 1
+
+    def current_embed(self) -> discord.Embed:
+        self.page_number = self.pager.clamp(self.page_number)
+        entries = self.pager.page(self.page_number)
+        self.update_buttons()
+        return self.build_embed(entries, self.page_number, self.total_pages, self.pager.total)
+
+    async def show_page(self, interaction: discord.Interaction, page_number: int):
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("❌ هذه القائمة ليست لك، استخدم /قائمة", ephemeral=True)
+            return
+
+        self.page_number = page_number
+        await interaction.response.edit_message(embed=self.current_embed(), view=self)
+
+    @discord.ui.button(label="السابق", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        try:
+            await self.show_page(interaction, max(0, self.page_number - 1))
+        except Exception as e:
+            logger.error(f"Error showing previous tag page: {e}")
+            await interaction.response.send_message("❌ حدث خطأ أثناء عرض الصفحة", ephemeral=True)
+
+    @discord.ui.button(label="التالي", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        try:
+            await self.show_page(interaction, self.page_number + 1)
+        except Exception as e:
+            logger.error(f"Error showing next tag page: {e}")
+            await interaction.response.send_message("❌ حدث خطأ أثناء عرض الصفحة", ephemeral=True)